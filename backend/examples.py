@@ -34,6 +34,16 @@ class LegalDocumentClient:
         response = requests.post(f"{self.base_url}/draft-document", json=request_data)
         return response.json()
 
+    def draft_documents(
+        self, items: list, max_parallel: int = None, archive: bool = False
+    ) -> Dict[str, Any]:
+        """Draft several legal documents in one batch request"""
+        payload = {"items": items, "archive": archive}
+        if max_parallel:
+            payload["max_parallel"] = max_parallel
+        response = requests.post(f"{self.base_url}/draft-documents", json=payload)
+        return response.json()
+
     def download_document(self, filename: str, save_path: str) -> bool:
         """Download a generated document"""
         try:
@@ -88,7 +98,7 @@ def example_loan_agreement():
             print(f"  Download URL: {response['download_url']}")
 
             # Download the document
-            filename = response["file_path"].split("/")[-1]
+            filename = response["download_url"].split("/")[-1]
             if client.download_document(filename, f"./outputs/{filename}"):
                 print(f"  ✓ Downloaded to: ./outputs/{filename}")
 
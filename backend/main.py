@@ -3,21 +3,45 @@ FastAPI Application for Legal Document Drafting
 Main entry point for the LLM-based legal document generation system
 """
 
+import io
+import os
+import json
+import uuid
+import asyncio
 import logging
 import sys
+import time
+import zipfile
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Literal, NamedTuple, Tuple, Union
 from pathlib import Path
 
-from fastapi import FastAPI, HTTPException, File, UploadFile
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, File, UploadFile, Depends
+from fastapi.responses import (
+    FileResponse,
+    HTMLResponse,
+    JSONResponse,
+    Response,
+    StreamingResponse,
+)
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 import uvicorn
 
-from src.llm_config import initialize_llm
+from src.llm_config import get_llm_pool, LLMBackend
 from src.rag_pipeline import RAGPipeline
-from src.prompt_templates import get_prompt_templates
+from src.prompt_templates import get_prompt_templates, format_reference_clauses
 from src.document_generator import DocumentGenerator
+from src.document_export import EXPORT_EXTENSIONS, EXPORT_MEDIA_TYPES, RenderedDocument
+from src.document_store import StoredDocument
+from src.retention import RetentionManager
+from src.response_cache import get_response_cache
+from src.single_flight import SingleFlight
+from src.resilience import ResilientLLM, CircuitOpenError, RETRYABLE_EXCEPTIONS
+from src.admission import AdmissionController, AdmissionRejected
+from src.job_queue import JobStore, JobQueue, JobFailed, JobRetry, RETRYABLE_STATUS_CODES
+from src.section_generator import SectionParallelGenerator, DEFAULT_GROUP_SIZE
+from src.template_registry import get_template_registry, coerce_details
 
 # Configure logging
 logging.basicConfig(
@@ -31,11 +55,36 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create and warm long-lived resources on startup"""
+    try:
+        get_llm_pool().warm()
+        logger.info("LLM client pool warmed")
+    except Exception as e:
+        # Keep serving health/template endpoints; drafting reports the error
+        logger.warning(f"LLM client pool warm-up failed: {str(e)}")
+    template_registry.start_watching()
+    # Files saved flat in ./outputs before the store get indexed and aged too
+    await asyncio.to_thread(doc_generator.store.import_legacy)
+    output_retention.start()
+    await job_queue.start(_run_job)
+    yield
+    await job_queue.stop()
+    template_registry.stop_watching()
+    await doc_generator.flush_writes()
+    doc_generator.shutdown()
+    output_retention.stop()
+    get_llm_pool().clear()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Legal Document Drafting Engine",
     description="LLM-based system for generating legal documents",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -46,12 +95,55 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Metadata of inline DOCX responses travels in headers
+    expose_headers=[
+        "Content-Disposition",
+        "X-Document-Id",
+        "X-Document-Type",
+        "X-Download-Url",
+        "X-Preview-Url",
+        "X-Cached",
+    ],
 )
 
+DOWNLOAD_MEDIA_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".zip": "application/zip",
+}
+INLINE_CHUNK_SIZE = 64 * 1024
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+BATCH_MAX_PARALLEL = int(os.getenv("BATCH_MAX_PARALLEL", "4"))
+BATCH_ADMISSION_RETRIES = int(os.getenv("BATCH_ADMISSION_RETRIES", "3"))
+
 # Global instances
-rag_pipeline = RAGPipeline()
-prompt_templates = get_prompt_templates()
+template_registry = get_template_registry()
+rag_pipeline = RAGPipeline(registry=template_registry)
+prompt_templates = get_prompt_templates(template_registry)
 doc_generator = DocumentGenerator("./outputs")
+output_retention = RetentionManager.from_env(doc_generator.store)
+response_cache = get_response_cache()
+single_flight = SingleFlight()
+llm_admission = AdmissionController.from_env()
+resilient_llm = ResilientLLM.from_env(llm_admission)
+section_generator = SectionParallelGenerator(rag_pipeline.template_db)
+job_queue = JobQueue(
+    JobStore(os.getenv("JOB_DB_PATH", "./jobs/jobs.sqlite")),
+    workers=int(os.getenv("JOB_WORKERS", "4")),
+    max_attempts=int(os.getenv("JOB_MAX_ATTEMPTS", "5")),
+    retry_base_delay=float(os.getenv("JOB_RETRY_BASE_SECONDS", "1")),
+)
+
+
+def get_llm_client() -> LLMBackend:
+    """FastAPI dependency returning the pooled default LLM client"""
+    try:
+        return get_llm_pool().get()
+    except ValueError as e:
+        logger.error(f"LLM client unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate document content: {str(e)}",
+        )
 
 
 class DocumentRequest(BaseModel):
@@ -69,6 +161,25 @@ class DocumentRequest(BaseModel):
     include_metadata: Optional[bool] = Field(
         True, description="Include metadata in footer"
     )
+    bypass_cache: Optional[bool] = Field(
+        False, description="Skip the LLM response cache and regenerate"
+    )
+    parallel_sections: Optional[bool] = Field(
+        False, description="Draft groups of template sections concurrently"
+    )
+    section_group_size: Optional[int] = Field(
+        None, ge=1, description="Sections per concurrent LLM call (parallel mode)"
+    )
+    renderer: Optional[Literal["python-docx", "ooxml"]] = Field(
+        None, description="DOCX renderer (defaults to DOCX_RENDERER)"
+    )
+    response_format: Optional[Literal["json", "docx"]] = Field(
+        "json",
+        description="Return JSON with a download URL, or the DOCX itself (/draft-document only)",
+    )
+    persist: Optional[bool] = Field(
+        True, description="Also save an inline DOCX to the outputs directory, in the background"
+    )
 
     @field_validator("prompt")
     @classmethod
@@ -101,11 +212,95 @@ class DocumentResponse(BaseModel):
     success: bool
     message: str
     document_type: str
-    file_path: str
-    download_url: str
+    file_path: Optional[str] = None
+    download_url: Optional[str] = None
+    document_id: Optional[str] = None
+    preview_url: Optional[str] = None
+    cached: bool = False
     metadata: Optional[Dict[str, Any]] = None
 
 
+class InlineDocument(NamedTuple):
+    """DOCX rendered in memory, with the response describing it"""
+
+    response: DocumentResponse
+    filename: str
+    data: bytes
+
+
+class BatchDocumentRequest(BaseModel):
+    """Request model for batch document drafting"""
+
+    items: List[DocumentRequest] = Field(
+        ..., min_length=1, max_length=BATCH_MAX_ITEMS, description="Documents to draft"
+    )
+    max_parallel: Optional[int] = Field(
+        None, ge=1, le=64, description="Maximum documents drafted at once"
+    )
+    archive: Optional[bool] = Field(
+        False, description="Also bundle all generated files into one ZIP archive"
+    )
+
+
+class BatchItemResult(BaseModel):
+    """Result of one item in a batch"""
+
+    index: int
+    success: bool
+    document: Optional[DocumentResponse] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchDocumentResponse(BaseModel):
+    """Response model for batch document drafting"""
+
+    success: bool
+    message: str
+    total: int
+    succeeded: int
+    failed: int
+    results: List[BatchItemResult]
+    archive_url: Optional[str] = None
+
+
+class JobSubmitResponse(BaseModel):
+    """Response model for job submission"""
+
+    success: bool = True
+    job_id: str
+    status: str
+    status_url: str
+    result_url: str
+
+
+class JobStatusResponse(BaseModel):
+    """Response model for job status"""
+
+    job_id: str
+    status: str
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    timings: Optional[Dict[str, float]] = None
+    attempts: int = 0
+    result: Optional[DocumentResponse] = None
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ClauseSearchRequest(BaseModel):
+    """Request model for clause similarity search"""
+
+    texts: List[str] = Field(
+        ..., min_length=1, max_length=256, description="Query texts, searched as one batch"
+    )
+    k: Optional[int] = Field(5, ge=1, le=50, description="Clauses per query text")
+    document_type: Optional[str] = Field(
+        None, description="Only clauses applicable to this document type"
+    )
+
+
 class ErrorResponse(BaseModel):
     """Error response model"""
 
@@ -132,7 +327,12 @@ async def root():
         "endpoints": {
             "health": "/health",
             "draft": "/draft-document",
+            "draft_stream": "/draft-document/stream",
+            "draft_batch": "/draft-documents",
+            "jobs": "/jobs",
+            "clause_search": "/clauses/search",
             "list_templates": "/templates",
+            "metrics": "/metrics",
         },
     }
 
@@ -158,85 +358,360 @@ async def list_templates():
         raise HTTPException(status_code=500, detail="Failed to list templates")
 
 
+@app.post("/clauses/search", tags=["Info"])
+async def search_clauses(request: ClauseSearchRequest):
+    """
+    Find vetted clauses similar to each query text
+    
+    Args:
+        request: ClauseSearchRequest with the query texts
+        
+    Returns:
+        Per query text, the most similar clauses with cosine scores
+    """
+    document_type = request.document_type.lower() if request.document_type else None
+    # Embedding and scoring are CPU-bound numpy work
+    results = await asyncio.to_thread(
+        rag_pipeline.find_similar_clauses, request.texts, request.k, document_type
+    )
+    return {
+        "success": True,
+        "results": [
+            [{**clause.to_dict(), "score": score} for clause, score in matches]
+            for matches in results
+        ],
+    }
+
+
 @app.post("/draft-document", response_model=DocumentResponse, tags=["Drafting"])
-async def draft_document(request: DocumentRequest) -> DocumentResponse:
+async def draft_document(
+    request: DocumentRequest, llm: LLMBackend = Depends(get_llm_client)
+) -> Union[DocumentResponse, StreamingResponse]:
     """
     Main endpoint for drafting legal documents
     
+    With ``response_format="docx"`` the document is rendered in memory and
+    streamed back as the response body, so the client needs no second
+    request to ``/download``.
+    
     Args:
         request: DocumentRequest with prompt and optional details
+        llm: Pooled LLM client
         
     Returns:
-        DocumentResponse with generated document path
+        DocumentResponse with generated document path, or the DOCX itself
     """
     try:
         logger.info(f"Received draft request: {request.prompt[:100]}...")
+        if request.response_format == "docx":
+            return _inline_docx_response(await _draft(request, llm, inline=True))
+        return await _draft(request, llm)
 
-        # Step 1: Identify document type and retrieve context
-        if request.document_type:
-            doc_type = request.document_type.lower()
-        else:
-            rag_context = rag_pipeline.prepare_rag_context(request.prompt)
-            if "error" in rag_context:
-                raise ValueError("Could not identify document type from prompt")
-            doc_type = rag_context.get("document_type")
+    except HTTPException:
+        raise
+    except ValueError as ve:
+        logger.error(f"Validation error: {str(ve)}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Unexpected error in draft_document: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500, detail=f"Failed to generate document: {str(e)}"
+        )
+
+
+@app.post(
+    "/draft-documents", response_model=BatchDocumentResponse, tags=["Drafting"]
+)
+async def draft_documents(
+    batch: BatchDocumentRequest, llm: LLMBackend = Depends(get_llm_client)
+) -> BatchDocumentResponse:
+    """
+    Draft several legal documents with bounded parallelism
+    
+    Args:
+        batch: BatchDocumentRequest with the items to draft
+        llm: Pooled LLM client
+        
+    Returns:
+        BatchDocumentResponse with per-item results and optional archive URL
+    """
+    logger.info(f"Received batch draft request with {len(batch.items)} items")
+    # More items in flight than admission can hold or queue would be shed with 429s
+    capacity = llm_admission.max_concurrency + llm_admission.max_queue
+    limit = asyncio.Semaphore(min(batch.max_parallel or BATCH_MAX_PARALLEL, capacity))
 
-        logger.info(f"Document type identified: {doc_type}")
+    async def draft_item(item: DocumentRequest) -> DocumentResponse:
+        # Other traffic can still fill the admission queue; wait it out
+        for attempt in range(BATCH_ADMISSION_RETRIES + 1):
+            try:
+                return await _draft(item, llm)
+            except HTTPException as he:
+                if he.status_code != 429 or attempt == BATCH_ADMISSION_RETRIES:
+                    raise
+                await asyncio.sleep(float((he.headers or {}).get("Retry-After", 1)))
 
-        # Step 2: Prepare prompt with template and details
-        template = prompt_templates.get_template(doc_type)
-        if not template:
-            raise ValueError(f"Template not found for document type: {doc_type}")
+    async def run_item(index: int, item: DocumentRequest) -> BatchItemResult:
+        async with limit:
+            try:
+                document = await draft_item(item)
+                return BatchItemResult(index=index, success=True, document=document)
+            except HTTPException as he:
+                status_code, error = he.status_code, str(he.detail)
+            except ValueError as ve:
+                status_code, error = 400, str(ve)
+            except Exception as e:
+                logger.error(f"Batch item {index} failed: {str(e)}", exc_info=True)
+                status_code, error = 500, f"Failed to generate document: {str(e)}"
+            return BatchItemResult(
+                index=index, success=False, status_code=status_code, error=error
+            )
 
-        # Merge provided details with defaults
-        template_vars = _prepare_template_variables(doc_type, request.details)
+    results = await asyncio.gather(
+        *(run_item(index, item) for index, item in enumerate(batch.items))
+    )
+    succeeded = [r for r in results if r.success]
 
-        # Format the prompt for LLM
-        formatted_prompt = template.format(**template_vars)
-        logger.info(f"Formatted prompt prepared for {doc_type}")
+    archive_url = None
+    if batch.archive and succeeded:
+        archive = await asyncio.to_thread(
+            _write_archive, [r.document for r in succeeded]
+        )
+        archive_url = f"/download/{archive.filename}"
 
-        # Step 3: Generate content using LLM
-        logger.info("Calling LLM for document generation...")
-        llm = initialize_llm()
+    return BatchDocumentResponse(
+        success=len(succeeded) == len(results),
+        message=f"Generated {len(succeeded)} of {len(results)} documents",
+        total=len(results),
+        succeeded=len(succeeded),
+        failed=len(results) - len(succeeded),
+        results=list(results),
+        archive_url=archive_url,
+    )
 
-        try:
-            response = llm.invoke(formatted_prompt)
-            content = response.content
-            logger.info(f"LLM response received ({len(content)} characters)")
-        except Exception as llm_error:
-            logger.error(f"LLM error: {str(llm_error)}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Failed to generate document content: {str(llm_error)}",
-            )
 
-        # Step 4: Generate DOCX document
-        metadata = {
-            "document_type": doc_type,
-            "generated_at": datetime.now().isoformat(),
-        } if request.include_metadata else None
+@app.post(
+    "/jobs", response_model=JobSubmitResponse, status_code=202, tags=["Jobs"]
+)
+async def submit_job(request: DocumentRequest) -> JobSubmitResponse:
+    """
+    Queue a draft request and return immediately
+    
+    Args:
+        request: DocumentRequest with prompt and optional details
+        
+    Returns:
+        JobSubmitResponse with the job id and polling URLs
+    """
+    job_id = await job_queue.submit(request.model_dump(mode="json"))
+    logger.info(f"Queued draft job {job_id}: {request.prompt[:100]}...")
+    return JobSubmitResponse(
+        job_id=job_id,
+        status="queued",
+        status_url=f"/jobs/{job_id}",
+        result_url=f"/jobs/{job_id}/result",
+    )
 
-        file_path = doc_generator.generate_document(content, doc_type, metadata)
-        logger.info(f"Document generated: {file_path}")
 
-        # Prepare response
-        return DocumentResponse(
-            success=True,
-            message=f"Document successfully generated",
-            document_type=doc_type,
-            file_path=file_path,
-            download_url=f"/download/{Path(file_path).name}",
-            metadata=metadata,
-        )
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse, tags=["Jobs"])
+async def get_job(job_id: str) -> JobStatusResponse:
+    """
+    Report job status and per-stage timings
+    
+    Args:
+        job_id: Job id returned by POST /jobs
+        
+    Returns:
+        JobStatusResponse
+    """
+    job = await asyncio.to_thread(job_queue.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    return JobStatusResponse(
+        job_id=job["id"],
+        status=job["status"],
+        created_at=job["created_at"],
+        started_at=job["started_at"],
+        finished_at=job["finished_at"],
+        timings=job["timings"],
+        attempts=job["attempts"],
+        result=job["result"],
+        status_code=job["status_code"],
+        error=job["error"],
+    )
+
+
+@app.get("/jobs/{job_id}/result", response_model=DocumentResponse, tags=["Jobs"])
+async def get_job_result(job_id: str):
+    """
+    Fetch the result of a finished job
+    
+    Args:
+        job_id: Job id returned by POST /jobs
+        
+    Returns:
+        DocumentResponse when the job succeeded; 202 with the status while it
+        is pending; the job's error status when it failed
+    """
+    job = await asyncio.to_thread(job_queue.store.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
 
+    if job["status"] == "succeeded":
+        return DocumentResponse(**job["result"])
+    if job["status"] == "failed":
+        raise HTTPException(status_code=job["status_code"] or 500, detail=job["error"])
+    return JSONResponse(
+        status_code=202,
+        content={"job_id": job_id, "status": job["status"]},
+        headers={"Retry-After": "2"},
+    )
+
+
+@app.post("/draft-document/stream", tags=["Drafting"])
+async def draft_document_stream(
+    request: DocumentRequest, llm: LLMBackend = Depends(get_llm_client)
+) -> StreamingResponse:
+    """
+    Draft a legal document and stream the markdown as Server-Sent Events
+    
+    Emits ``start``, then ``chunk`` events as the model produces text, and
+    finally ``complete`` with the DOCX download URL (or ``error``).
+    
+    Args:
+        request: DocumentRequest with prompt and optional details
+        llm: Pooled LLM client
+        
+    Returns:
+        StreamingResponse with ``text/event-stream`` body
+    """
+    logger.info(f"Received streaming draft request: {request.prompt[:100]}...")
+
+    # Validation errors are reported as a normal 400 before streaming starts
+    try:
+        rag_context = _resolve_context(request)
+        doc_type = rag_context["document_type"]
+        template_vars = _prepare_template_variables(doc_type, request.details)
+        formatted_prompt = _build_prompt(
+            doc_type, template_vars, rag_context.get("clauses")
+        )
     except ValueError as ve:
         logger.error(f"Validation error: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
-    except Exception as e:
-        logger.error(f"Unexpected error in draft_document: {str(e)}", exc_info=True)
-        raise HTTPException(
-            status_code=500, detail=f"Failed to generate document: {str(e)}"
-        )
+
+    async def event_stream():
+        yield _sse_event("start", {"document_type": doc_type})
+        try:
+            cache_key = _cache_key(llm, formatted_prompt)
+            content = (
+                None if request.bypass_cache else await response_cache.aget(cache_key)
+            )
+            cached = content is not None
+
+            if cached:
+                logger.info("LLM response served from cache")
+                yield _sse_event("chunk", {"text": content})
+            else:
+                chunks = []
+                async with llm_admission.slot():
+                    async for text in resilient_llm.astream(
+                        llm, formatted_prompt, doc_type
+                    ):
+                        chunks.append(text)
+                        yield _sse_event("chunk", {"text": text})
+
+                content = "".join(chunks).strip()
+                await response_cache.aset(cache_key, content)
+                logger.info(f"LLM stream finished ({len(content)} characters)")
+
+            metadata = _build_metadata(doc_type, request.include_metadata)
+            stored = await doc_generator.agenerate_document(
+                content, doc_type, metadata, request.renderer
+            )
+            logger.info(f"Document generated: {stored.document_id}")
+
+            yield _sse_event(
+                "complete",
+                _stored_response(stored, doc_type, cached, metadata).model_dump(),
+            )
+        except (AdmissionRejected, CircuitOpenError) as overload:
+            logger.warning(f"Streaming draft rejected: {str(overload)}")
+            status_code = getattr(overload, "status_code", 503)
+            yield _sse_event(
+                "error",
+                {
+                    "success": False,
+                    "status_code": status_code,
+                    "detail": str(overload),
+                    "retry_after": int(overload.retry_after),
+                },
+            )
+        except Exception as e:
+            logger.error(f"Error in streaming draft: {str(e)}", exc_info=True)
+            yield _sse_event(
+                "error",
+                {"success": False, "detail": f"Failed to generate document: {str(e)}"},
+            )
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics", tags=["Health"])
+async def metrics():
+    """Runtime metrics for caches and pooled resources"""
+    # Job counts and storage stats query SQLite; keep them off the event loop
+    jobs, docx = await asyncio.gather(
+        asyncio.to_thread(job_queue.stats), asyncio.to_thread(doc_generator.stats)
+    )
+    return {
+        "llm_cache": response_cache.stats(),
+        "llm_pool": {"clients": get_llm_pool().size()},
+        "single_flight": single_flight.stats(),
+        "llm_resilience": resilient_llm.stats(),
+        "llm_admission": llm_admission.stats(),
+        "jobs": jobs,
+        "docx": docx,
+        "output_retention": output_retention.stats(),
+        "templates": template_registry.stats(),
+        "clause_index": rag_pipeline.clause_index.stats(),
+        "clause_vectors": rag_pipeline.clause_vectors.index.stats(),
+    }
+
+
+def _inline_docx_response(inline: InlineDocument) -> StreamingResponse:
+    """
+    Stream an in-memory DOCX with its metadata in headers
+    
+    Args:
+        inline: Rendered document and its response model
+        
+    Returns:
+        StreamingResponse with the DOCX body
+    """
+    response = inline.response
+    data = memoryview(inline.data)
+
+    def chunks():
+        for start in range(0, len(data), INLINE_CHUNK_SIZE):
+            yield data[start : start + INLINE_CHUNK_SIZE]
+
+    headers = {
+        "Content-Disposition": f'attachment; filename="{inline.filename}"',
+        "Content-Length": str(len(data)),
+        "X-Document-Id": response.document_id,
+        "X-Document-Type": response.document_type,
+        "X-Preview-Url": response.preview_url,
+        "X-Cached": str(response.cached).lower(),
+    }
+    if response.download_url:
+        headers["X-Download-Url"] = response.download_url
+    return StreamingResponse(
+        chunks(), media_type=DOWNLOAD_MEDIA_TYPES[".docx"], headers=headers
+    )
 
 
 @app.get("/download/{filename}", tags=["Download"])
@@ -251,24 +726,92 @@ async def download_document(filename: str):
         FileResponse with the DOCX file
     """
     try:
-        file_path = Path("./outputs") / filename
+        # Documents and archives resolve through the store index; flat files
+        # the startup import skipped are still looked up by name
+        stored = await asyncio.to_thread(doc_generator.store.get, Path(filename).stem)
+        file_path = Path(stored.path) if stored else doc_generator.output_dir / filename
 
         if not file_path.exists():
             logger.warning(f"File not found: {file_path}")
             raise HTTPException(status_code=404, detail="Document not found")
+        if stored:
+            # Recency for least-recently-downloaded eviction
+            await asyncio.to_thread(doc_generator.store.touch, stored.digest)
 
         logger.info(f"Downloading file: {file_path}")
         return FileResponse(
             path=file_path,
             filename=filename,
-            media_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            media_type=DOWNLOAD_MEDIA_TYPES.get(
+                file_path.suffix, "application/octet-stream"
+            ),
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error downloading file: {str(e)}")
         raise HTTPException(status_code=500, detail="Failed to download document")
 
 
+@app.get("/documents/{document_id}/preview", tags=["Download"])
+async def preview_document(document_id: str):
+    """
+    HTML preview of a generated document, without building or sending a DOCX
+    
+    Args:
+        document_id: Id returned with the draft
+        
+    Returns:
+        HTMLResponse rendered from the cached document
+    """
+    document = _get_cached_document(document_id)
+    html = await asyncio.to_thread(document.export, "html")
+    return HTMLResponse(html)
+
+
+@app.get("/documents/{document_id}/export/{fmt}", tags=["Download"])
+async def export_document(document_id: str, fmt: Literal["docx", "html", "markdown", "text"]):
+    """
+    Export a generated document as DOCX, HTML, sanitized markdown or plain text
+    
+    Args:
+        document_id: Id returned with the draft
+        fmt: Export format
+        
+    Returns:
+        The document as an attachment
+    """
+    document = _get_cached_document(document_id)
+    if fmt == "docx":
+        if not document.file_path or not Path(document.file_path).exists():
+            raise HTTPException(status_code=404, detail="Document not found")
+        return FileResponse(
+            path=document.file_path,
+            filename=f"{document_id}.docx",
+            media_type=DOWNLOAD_MEDIA_TYPES[".docx"],
+        )
+
+    body = await asyncio.to_thread(document.export, fmt)
+    filename = f"{document_id}{EXPORT_EXTENSIONS[fmt]}"
+    return Response(
+        content=body,
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _get_cached_document(document_id: str) -> RenderedDocument:
+    """Look up a recently generated document or raise 404"""
+    document = doc_generator.get_document(document_id)
+    if document is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Document not found or no longer cached; download the DOCX instead",
+        )
+    return document
+
+
 @app.exception_handler(ValueError)
 async def value_error_handler(request, exc):
     """Custom exception handler for ValueError"""
@@ -292,104 +835,370 @@ async def general_exception_handler(request, exc):
     )
 
 
-def _prepare_template_variables(doc_type: str, user_details: Dict[str, Any]) -> Dict[str, str]:
+def _resolve_context(request: DocumentRequest) -> Dict[str, Any]:
     """
-    Prepare template variables with defaults
+    Determine the document type and retrieve reference clauses
+    
+    Args:
+        request: Incoming draft request
+        
+    Returns:
+        RAG context with at least ``document_type`` and ``clauses``
+    """
+    if request.document_type:
+        doc_type = request.document_type.lower()
+        rag_context = rag_pipeline.retrieve_relevant_context(request.prompt, doc_type)
+    else:
+        rag_context = rag_pipeline.prepare_rag_context(request.prompt)
+        if "error" in rag_context:
+            raise ValueError("Could not identify document type from prompt")
+        doc_type = rag_context.get("document_type")
+
+    logger.info(f"Document type identified: {doc_type}")
+    return {"document_type": doc_type, "clauses": rag_context.get("clauses", {})}
+
+
+def _build_prompt(
+    doc_type: str,
+    template_vars: Dict[str, Any],
+    clauses: Optional[Dict[str, List[Dict]]] = None,
+) -> str:
+    """
+    Format the LLM prompt for a document type
     
     Args:
         doc_type: Type of document
-        user_details: User-provided details
+        template_vars: Template variables merged with defaults
+        clauses: Optional retrieved clauses per section to include
         
     Returns:
-        Dictionary of template variables
-    """
-    defaults = {
-        "loan_agreement": {
-            "lender_name": "Lender",
-            "borrower_name": "Borrower",
-            "loan_amount": "Amount to be specified",
-            "currency": "INR",
-            "interest_rate": "0",
-            "tenure": "12",
-            "repayment_frequency": "Monthly",
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "jurisdiction": "India",
-            "additional_details": "As per mutual agreement",
-        },
-        "rental_agreement": {
-            "landlord_name": "Landlord",
-            "tenant_name": "Tenant",
-            "property_address": "Property Address",
-            "property_type": "Residential",
-            "rent_amount": "Amount to be specified",
-            "currency": "INR",
-            "lease_duration": "12",
-            "deposit_amount": "Amount to be specified",
-            "start_date": datetime.now().strftime("%Y-%m-%d"),
-            "jurisdiction": "India",
-            "additional_details": "As per mutual agreement",
-        },
-        "nda": {
-            "disclosing_party": "Party A",
-            "receiving_party": "Party B",
-            "purpose": "Business evaluation",
-            "info_type": "Confidential Information",
-            "term_duration": "24",
-            "jurisdiction": "India",
-            "additional_details": "As per mutual agreement",
-        },
-        "service_agreement": {
-            "service_provider": "Service Provider",
-            "service_client": "Client",
-            "service_description": "Services to be specified",
-            "service_fees": "Amount to be specified",
-            "currency": "INR",
-            "payment_schedule": "As per invoice",
-            "term_duration": "12",
-            "jurisdiction": "India",
-            "additional_details": "As per mutual agreement",
-        },
-        "employment_contract": {
-            "employee_name": "Employee",
-            "employer_name": "Employer",
-            "position": "Position Title",
-            "department": "Department",
-            "salary": "Amount to be specified",
-            "currency": "INR",
-            "employment_type": "Full-time",
-            "start_date": datetime.now().strftime("%Y-%m-%d"),
-            "jurisdiction": "India",
-            "additional_details": "As per mutual agreement",
-        },
-        "partnership_deed": {
-            "partner_names": "Partner 1, Partner 2",
-            "business_name": "Business Name",
-            "business_description": "Business Description",
-            "place_of_business": "Location",
-            "capital_contributions": "Amount to be specified",
-            "profit_sharing_ratio": "Equal",
-            "management_rights": "Equal",
-            "jurisdiction": "India",
-            "additional_details": "As per mutual agreement",
-        },
-        "affidavit": {
-            "affiant_name": "Affiant Name",
-            "affiant_address": "Affiant Address",
-            "date": datetime.now().strftime("%Y-%m-%d"),
-            "purpose": "Statement of facts",
-            "statement_content": "Facts to be specified",
-            "jurisdiction": "India",
-            "additional_details": "As per requirement",
-        },
+        Formatted prompt string
+    """
+    template = prompt_templates.get_template(doc_type)
+    if not template:
+        raise ValueError(f"Template not found for document type: {doc_type}")
+
+    formatted_prompt = template.render(template_vars) + format_reference_clauses(
+        clauses
+    )
+    logger.info(f"Formatted prompt prepared for {doc_type}")
+    return formatted_prompt
+
+
+async def _draft(
+    request: DocumentRequest,
+    llm: LLMBackend,
+    timings: Optional[Dict[str, float]] = None,
+    inline: bool = False,
+) -> Union[DocumentResponse, InlineDocument]:
+    """
+    Run the full drafting pipeline for one request
+    
+    Args:
+        request: Draft request
+        llm: LLM client
+        timings: Optional dict filled with per-stage durations in seconds
+        inline: Render the DOCX in memory and return its bytes
+        
+    Returns:
+        DocumentResponse for the generated document, or an InlineDocument
+    """
+    timings = {} if timings is None else timings
+
+    # Step 1-2: Identify document type, retrieve clauses and prepare the prompt
+    started = time.perf_counter()
+    rag_context = _resolve_context(request)
+    doc_type = rag_context["document_type"]
+    timings["retrieval_seconds"] = _elapsed(started)
+
+    started = time.perf_counter()
+    template_vars = _prepare_template_variables(doc_type, request.details)
+    formatted_prompt = _build_prompt(doc_type, template_vars, rag_context["clauses"])
+    timings["prompt_seconds"] = _elapsed(started)
+
+    # Step 3-4: Generate content and DOCX, shared with identical in-flight requests
+    clause_ids = [
+        clause["id"] for clauses in rag_context["clauses"].values() for clause in clauses
+    ]
+    flight_key = single_flight.make_key(
+        doc_type,
+        template_vars,
+        clause_ids,
+        request.include_metadata,
+        request.parallel_sections,
+        request.section_group_size,
+        request.renderer,
+        request.bypass_cache,
+        inline,
+        inline and request.persist is not False,
+    )
+
+    async def generate() -> Tuple[Union[DocumentResponse, InlineDocument], Dict[str, float]]:
+        # The flight owns its timings so callers joining it can copy them
+        flight_timings: Dict[str, float] = {}
+        result = await _generate_document_response(
+            llm, doc_type, formatted_prompt, request, flight_timings, inline
+        )
+        return result, flight_timings
+
+    result, flight_timings = await single_flight.do(flight_key, generate)
+    timings.update(flight_timings)
+    return result
+
+
+async def _generate_document_response(
+    llm: LLMBackend,
+    doc_type: str,
+    formatted_prompt: str,
+    request: DocumentRequest,
+    timings: Optional[Dict[str, float]] = None,
+    inline: bool = False,
+) -> Union[DocumentResponse, InlineDocument]:
+    """
+    Run the generation steps: LLM content, then DOCX rendering
+    
+    Args:
+        llm: LLM client
+        doc_type: Type of document
+        formatted_prompt: Fully formatted prompt
+        request: Draft request carrying generation options
+        timings: Optional dict filled with per-stage durations in seconds
+        inline: Render the DOCX in memory; saving it (if ``request.persist``)
+            happens in the background
+        
+    Returns:
+        DocumentResponse for the generated document, or an InlineDocument
+    """
+    timings = {} if timings is None else timings
+
+    # Step 3: Generate content using LLM
+    logger.info("Calling LLM for document generation...")
+    started = time.perf_counter()
+
+    async def invoke(prompt: str) -> Tuple[str, bool]:
+        return await _generate_content(llm, prompt, doc_type, request.bypass_cache)
+
+    try:
+        if request.parallel_sections:
+            content, cached = await section_generator.generate(
+                doc_type,
+                formatted_prompt,
+                invoke,
+                request.section_group_size or DEFAULT_GROUP_SIZE,
+            )
+        else:
+            content, cached = await invoke(formatted_prompt)
+    except ValueError:
+        raise
+    except AdmissionRejected as rejected:
+        logger.warning(f"LLM call rejected: {str(rejected)}")
+        raise HTTPException(
+            status_code=rejected.status_code,
+            detail=str(rejected),
+            headers={"Retry-After": str(rejected.retry_after)},
+        )
+    except CircuitOpenError as open_error:
+        logger.warning(str(open_error))
+        raise HTTPException(
+            status_code=503,
+            detail=str(open_error),
+            headers={"Retry-After": str(int(open_error.retry_after))},
+        )
+    except asyncio.TimeoutError:
+        logger.error("LLM call timed out")
+        raise HTTPException(status_code=504, detail="LLM call timed out")
+    except RETRYABLE_EXCEPTIONS as transient:
+        # Still failing after the resilience layer's retries
+        logger.error(f"LLM unavailable: {str(transient)}")
+        raise HTTPException(
+            status_code=503, detail=f"LLM temporarily unavailable: {str(transient)}"
+        )
+    except Exception as llm_error:
+        logger.error(f"LLM error: {str(llm_error)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to generate document content: {str(llm_error)}",
+        )
+
+    timings["llm_seconds"] = _elapsed(started)
+
+    # Step 4: Generate DOCX document
+    started = time.perf_counter()
+    metadata = _build_metadata(doc_type, request.include_metadata)
+    if inline:
+        filename, data = await doc_generator.arender_document(
+            content, doc_type, metadata, request.renderer
+        )
+        timings["docx_seconds"] = _elapsed(started)
+        logger.info(f"Document rendered in memory: {filename} ({len(data)} bytes)")
+
+        persisted = request.persist is not False
+        if persisted:
+            doc_generator.persist_in_background(filename, data, doc_type)
+        document_id = Path(filename).stem
+        response = DocumentResponse(
+            success=True,
+            message="Document successfully generated",
+            document_type=doc_type,
+            download_url=f"/download/{filename}" if persisted else None,
+            document_id=document_id,
+            preview_url=f"/documents/{document_id}/preview",
+            cached=cached,
+            metadata=metadata,
+        )
+        return InlineDocument(response, filename, data)
+
+    stored = await doc_generator.agenerate_document(
+        content, doc_type, metadata, request.renderer
+    )
+    timings["docx_seconds"] = _elapsed(started)
+    logger.info(f"Document generated: {stored.document_id}")
+
+    return _stored_response(stored, doc_type, cached, metadata)
+
+
+def _stored_response(
+    stored: StoredDocument,
+    doc_type: str,
+    cached: bool,
+    metadata: Optional[Dict[str, Any]],
+) -> DocumentResponse:
+    """Response for a document saved to the store"""
+    return DocumentResponse(
+        success=True,
+        message="Document successfully generated",
+        document_type=doc_type,
+        file_path=stored.path,
+        download_url=f"/download/{stored.filename}",
+        document_id=stored.document_id,
+        preview_url=f"/documents/{stored.document_id}/preview",
+        cached=cached,
+        metadata=metadata,
+    )
+
+
+def _cache_key(llm: LLMBackend, formatted_prompt: str) -> str:
+    """Response cache key for a prompt rendered against an LLM client"""
+    return response_cache.make_key(
+        formatted_prompt, llm.model_name, llm.temperature, llm.max_tokens
+    )
+
+
+async def _generate_content(
+    llm: LLMBackend, formatted_prompt: str, doc_type: str, bypass_cache: bool = False
+) -> Tuple[str, bool]:
+    """
+    Generate document content, consulting the response cache first
+    
+    Args:
+        llm: LLM client
+        formatted_prompt: Fully formatted prompt
+        doc_type: Document type (selects the resilience policy)
+        bypass_cache: Skip the cache lookup (the fresh result is still stored)
+        
+    Returns:
+        Tuple of (content, served_from_cache)
+    """
+    cache_key = _cache_key(llm, formatted_prompt)
+    if not bypass_cache:
+        content = await response_cache.aget(cache_key)
+        if content is not None:
+            logger.info("LLM response served from cache")
+            return content, True
+
+    async with llm_admission.slot():
+        response = await resilient_llm.ainvoke(llm, formatted_prompt, doc_type)
+    content = response.content
+    logger.info(f"LLM response received ({len(content)} characters)")
+    await response_cache.aset(cache_key, content)
+    return content, False
+
+
+def _build_metadata(doc_type: str, include_metadata: bool) -> Optional[Dict[str, Any]]:
+    """Build footer metadata for a generated document"""
+    if not include_metadata:
+        return None
+    return {
+        "document_type": doc_type,
+        "generated_at": datetime.now().isoformat(),
     }
 
-    # Get defaults for document type
-    template_vars = defaults.get(doc_type, {})
 
-    # Override with user-provided details
-    template_vars.update(user_details)
+def _elapsed(started: float) -> float:
+    """Seconds since a perf_counter() reading, rounded for reporting"""
+    return round(time.perf_counter() - started, 4)
+
+
+async def _run_job(payload: Dict[str, Any], timings: Dict[str, float]) -> Dict[str, Any]:
+    """
+    Job queue handler running the drafting pipeline for a stored request
+    
+    Args:
+        payload: Serialized DocumentRequest
+        timings: Dict filled with per-stage durations
+        
+    Returns:
+        Serialized DocumentResponse
+    """
+    try:
+        request = DocumentRequest(**payload)
+        response = await _draft(request, get_llm_pool().get(), timings)
+    except HTTPException as he:
+        if he.status_code in RETRYABLE_STATUS_CODES:
+            # Shed load, an open circuit, an unavailable or timed-out LLM;
+            # validation errors and other failures end the job
+            retry_after = float((he.headers or {}).get("Retry-After", 0))
+            raise JobRetry(he.status_code, str(he.detail), retry_after)
+        raise JobFailed(he.status_code, str(he.detail))
+    except ValueError as ve:
+        raise JobFailed(400, str(ve))
+    return response.model_dump(mode="json")
 
-    return template_vars
+
+def _write_archive(documents: List[DocumentResponse]) -> StoredDocument:
+    """
+    Bundle generated documents into a ZIP archive in the document store
+    
+    Args:
+        documents: Responses of the generated documents
+        
+    Returns:
+        StoredDocument of the archive, subject to output retention
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"Batch_{timestamp}_{uuid.uuid4().hex[:8]}.zip"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        # Name members by download name; the blob is named by content hash
+        files = {Path(d.download_url).name: d.file_path for d in documents}
+        for arcname, file_path in files.items():
+            archive.write(file_path, arcname=arcname)
+    stored = doc_generator.store.put(filename, buffer.getvalue(), "batch")
+    logger.info(f"Batch archive written: {stored.document_id} -> {stored.path}")
+    return stored
+
+
+def _sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Encode a Server-Sent Event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _prepare_template_variables(doc_type: str, user_details: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Prepare template variables with defaults
+    
+    Args:
+        doc_type: Type of document
+        user_details: User-provided details
+        
+    Returns:
+        New dictionary of string template variables
+    """
+    # Merge user details over the type's precomputed defaults into a new dict
+    defaults = template_registry.snapshot.defaults.get(doc_type)
+    if defaults is None:
+        return coerce_details(user_details)
+    return defaults.merge(user_details)
 
 
 if __name__ == "__main__":
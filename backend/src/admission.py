@@ -0,0 +1,169 @@
+"""
+Admission Control Module
+Bounds concurrent LLM calls with a FIFO wait queue and fast rejection
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Deque, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionRejected(Exception):
+    """Raised when a call cannot be admitted (queue full or wait too long)"""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """Concurrency limiter with a bounded wait queue"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_queue: int = 32,
+        max_queue_seconds: float = 10.0,
+    ):
+        """
+        Initialize admission controller
+
+        Args:
+            max_concurrency: Maximum calls running at once
+            max_queue: Maximum calls waiting for a slot (429 beyond this)
+            max_queue_seconds: Maximum time a call may wait (503 beyond this)
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queue_seconds = max_queue_seconds
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._wait_times: Deque[float] = deque(maxlen=500)
+        self._hold_times: Deque[float] = deque(maxlen=500)
+        self._counters = {
+            "admitted": 0,
+            "rejected_queue_full": 0,
+            "rejected_timeout": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        """Create a controller from LLM_MAX_* environment variables"""
+        return cls(
+            max_concurrency=int(os.getenv("LLM_MAX_CONCURRENCY", "8")),
+            max_queue=int(os.getenv("LLM_MAX_QUEUE", "32")),
+            max_queue_seconds=float(os.getenv("LLM_MAX_QUEUE_SECONDS", "10")),
+        )
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold a concurrency slot for the duration of the block
+
+        Raises:
+            AdmissionRejected: 429 when the queue is full, 503 on queue timeout
+        """
+        await self.acquire()
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._hold_times.append(time.monotonic() - started)
+            self.release()
+
+    async def acquire(self) -> None:
+        """Acquire a slot, waiting in FIFO order if none is free"""
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self._admit(0.0)
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._counters["rejected_queue_full"] += 1
+            raise AdmissionRejected(
+                429, "Too many drafting requests queued", self._retry_after()
+            )
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        queued_at = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter, timeout=self.max_queue_seconds)
+        except asyncio.TimeoutError:
+            self._counters["rejected_timeout"] += 1
+            raise AdmissionRejected(
+                503, "Timed out waiting for LLM capacity", self._retry_after()
+            )
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we were cancelled
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+
+        self._admit(time.monotonic() - queued_at)
+
+    def try_acquire(self) -> bool:
+        """
+        Take a slot only if one is free right now, never queueing
+
+        Returns:
+            True if a slot was taken (the caller must release it)
+        """
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self._admit(0.0)
+            return True
+        return False
+
+    def release(self) -> None:
+        """Release a slot, handing it to the oldest live waiter"""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def _admit(self, waited: float) -> None:
+        self._counters["admitted"] += 1
+        self._wait_times.append(waited)
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until capacity frees up"""
+        if not self._hold_times:
+            return 1
+        average_hold = sum(self._hold_times) / len(self._hold_times)
+        backlog = (len(self._waiters) + 1) / self.max_concurrency
+        return max(1, math.ceil(average_hold * backlog))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get admission metrics
+
+        Returns:
+            Dictionary with active calls, queue depth, wait times and counters
+        """
+        waits = sorted(self._wait_times)
+        return {
+            "active": self._active,
+            "queue_depth": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            **self._counters,
+            "wait_seconds_avg": round(sum(waits) / len(waits), 4) if waits else 0.0,
+            "wait_seconds_p95": round(waits[int(0.95 * (len(waits) - 1))], 4)
+            if waits
+            else 0.0,
+            "wait_seconds_max": round(waits[-1], 4) if waits else 0.0,
+        }
@@ -0,0 +1,305 @@
+"""
+Clause Index Module
+Loads the vetted clause corpus and ranks clauses with BM25
+"""
+
+import os
+import json
+import math
+import time
+import logging
+from array import array
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.doc_classifier import tokenize
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CORPUS_DIR = os.getenv("CLAUSE_CORPUS_DIR", "./clauses")
+ALL_DOCUMENT_TYPES = "*"
+
+# Function words carry no ranking signal and would dominate the postings
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or shall "
+    "that the this to was which will with".split()
+)
+
+
+class Clause:
+    """A vetted clause from the corpus"""
+
+    __slots__ = ("clause_id", "title", "text", "section", "doc_types", "source")
+
+    def __init__(
+        self,
+        clause_id: str,
+        title: str,
+        text: str,
+        section: str,
+        doc_types: Iterable[str],
+        source: str = "",
+    ):
+        self.clause_id = clause_id
+        self.title = title
+        self.text = text
+        self.section = section
+        self.doc_types = tuple(doc_types) or (ALL_DOCUMENT_TYPES,)
+        self.source = source
+
+    def applies_to(self, doc_type: str) -> bool:
+        """Whether the clause may be used for a document type"""
+        return ALL_DOCUMENT_TYPES in self.doc_types or doc_type in self.doc_types
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "id": self.clause_id,
+            "title": self.title,
+            "text": self.text,
+            "section": self.section,
+            "doc_types": list(self.doc_types),
+        }
+
+
+def load_corpus(corpus_dir: str) -> List[Clause]:
+    """
+    Load clauses from JSON and markdown files under a directory
+
+    JSON files hold ``{"doc_types": [...], "clauses": [{"id", "section",
+    "title", "text"}, ...]}``; a clause may override ``doc_types``. Markdown
+    files hold one clause: ``key: value`` header lines (``id``, ``section``,
+    ``doc_types``), a blank line, a ``# Title`` line and the clause text.
+
+    Args:
+        corpus_dir: Corpus directory
+
+    Returns:
+        Clauses in file name order
+    """
+    root = Path(corpus_dir)
+    if not root.is_dir():
+        logger.warning(f"Clause corpus directory not found: {corpus_dir}")
+        return []
+
+    clauses: List[Clause] = []
+    for path in sorted(root.rglob("*")):
+        if path.suffix == ".json":
+            clauses.extend(_load_json(path))
+        elif path.suffix == ".md":
+            clauses.append(_load_markdown(path))
+
+    ids = [clause.clause_id for clause in clauses]
+    if len(ids) != len(set(ids)):
+        duplicates = sorted({i for i in ids if ids.count(i) > 1})
+        raise ValueError(f"Duplicate clause ids in corpus: {', '.join(duplicates)}")
+    return clauses
+
+
+def _load_json(path: Path) -> List[Clause]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    file_doc_types = data.get("doc_types", [])
+    clauses = []
+    for entry in data.get("clauses", []):
+        missing = [key for key in ("id", "section", "text") if not entry.get(key)]
+        if missing:
+            raise ValueError(f"Clause in {path} is missing: {', '.join(missing)}")
+        clauses.append(
+            Clause(
+                clause_id=entry["id"],
+                title=entry.get("title") or _section_title(entry["section"]),
+                text=entry["text"].strip(),
+                section=entry["section"],
+                doc_types=entry.get("doc_types", file_doc_types),
+                source=path.name,
+            )
+        )
+    return clauses
+
+
+def _load_markdown(path: Path) -> Clause:
+    header, _, body = path.read_text(encoding="utf-8").partition("\n\n")
+    fields = {}
+    for line in header.splitlines():
+        key, _, value = line.partition(":")
+        fields[key.strip().lower()] = value.strip()
+    if not fields.get("section"):
+        raise ValueError(f"Clause file {path} is missing a section header")
+
+    body = body.strip()
+    title = _section_title(fields["section"])
+    if body.startswith("# "):
+        title_line, _, body = body.partition("\n")
+        title = title_line[2:].strip()
+
+    doc_types = [t.strip() for t in fields.get("doc_types", "").split(",") if t.strip()]
+    return Clause(
+        clause_id=fields.get("id") or path.stem,
+        title=title,
+        text=body.strip(),
+        section=fields["section"],
+        doc_types=doc_types,
+        source=path.name,
+    )
+
+
+def analyze(text: str) -> List[str]:
+    """Index terms for a text: lowercase tokens without stopwords"""
+    return [token for token in tokenize(text) if token not in STOPWORDS]
+
+
+class ClauseIndex:
+    """BM25 inverted index over the clause corpus
+
+    Postings are stored as flat ``array`` columns addressed by per-term
+    offsets (CSR layout), so the index costs a few bytes per posting and
+    scoring touches only the postings of the query terms.
+    """
+
+    def __init__(self, clauses: List[Clause], k1: float = 1.2, b: float = 0.75):
+        """
+        Build the index
+
+        Args:
+            clauses: Clause corpus
+            k1: BM25 term-frequency saturation
+            b: BM25 length normalization
+        """
+        self.clauses = clauses
+        self.k1 = k1
+        self.b = b
+
+        term_postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._doc_lengths = array("I")
+        for doc_id, clause in enumerate(clauses):
+            # The title is indexed with the text so headings match queries
+            terms = analyze(f"{clause.title} {clause.text}")
+            self._doc_lengths.append(len(terms))
+            counts: Dict[str, int] = {}
+            for term in terms:
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                term_postings.setdefault(term, []).append((doc_id, count))
+
+        self._vocabulary: Dict[str, int] = {}
+        self._offsets = array("I", [0])
+        self._posting_docs = array("I")
+        self._posting_freqs = array("H")
+        self._idf = array("d")
+        doc_count = len(clauses)
+        for term_id, (term, postings) in enumerate(sorted(term_postings.items())):
+            self._vocabulary[term] = term_id
+            for doc_id, count in postings:
+                self._posting_docs.append(doc_id)
+                self._posting_freqs.append(min(count, 0xFFFF))
+            self._offsets.append(len(self._posting_docs))
+            df = len(postings)
+            self._idf.append(math.log(1 + (doc_count - df + 0.5) / (df + 0.5)))
+
+        self._average_length = (
+            sum(self._doc_lengths) / doc_count if doc_count else 0.0
+        )
+
+        # Candidate clause ids per (document type, section), in corpus order
+        self._by_section: Dict[Tuple[str, str], Tuple[int, ...]] = {}
+        grouped: Dict[Tuple[str, str], List[int]] = {}
+        for doc_id, clause in enumerate(clauses):
+            for doc_type in clause.doc_types:
+                grouped.setdefault((doc_type, clause.section), []).append(doc_id)
+        for key, doc_ids in grouped.items():
+            self._by_section[key] = tuple(doc_ids)
+
+        logger.info(
+            f"Clause index built: {doc_count} clauses, {len(self._vocabulary)} terms, "
+            f"{len(self._posting_docs)} postings"
+        )
+
+    @classmethod
+    def from_directory(cls, corpus_dir: str = DEFAULT_CORPUS_DIR) -> "ClauseIndex":
+        """Load a corpus directory and index it"""
+        return cls(load_corpus(corpus_dir))
+
+    def __len__(self) -> int:
+        return len(self.clauses)
+
+    def candidates(self, doc_type: str, section: str) -> Tuple[int, ...]:
+        """Clause ids tagged for a section of a document type (or all types)"""
+        specific = self._by_section.get((doc_type, section), ())
+        generic = self._by_section.get((ALL_DOCUMENT_TYPES, section), ())
+        return specific + generic
+
+    def search(
+        self,
+        query: str,
+        k: int = 3,
+        doc_type: Optional[str] = None,
+        section: Optional[str] = None,
+        deadline: Optional[float] = None,
+    ) -> List[Tuple[Clause, float]]:
+        """
+        Rank clauses against a query
+
+        Query terms are scored rarest first; when ``deadline`` (a
+        ``time.perf_counter()`` value) passes, the remaining common terms are
+        skipped and the best clauses found so far are returned.
+
+        Args:
+            query: Free-text query
+            k: Number of clauses to return
+            doc_type: Only clauses applicable to this document type
+            section: Only clauses tagged with this section; unmatched
+                section clauses fill the result with score 0
+            deadline: Optional perf_counter deadline
+
+        Returns:
+            List of (clause, score), best first
+        """
+        allowed: Optional[frozenset] = None
+        if section is not None:
+            allowed = frozenset(self.candidates(doc_type or "", section))
+            if not allowed:
+                return []
+        elif doc_type is not None:
+            allowed = frozenset(
+                i for i, clause in enumerate(self.clauses) if clause.applies_to(doc_type)
+            )
+
+        term_ids = {self._vocabulary[t] for t in analyze(query) if t in self._vocabulary}
+        scores: Dict[int, float] = {}
+        k1, b, average = self.k1, self.b, self._average_length or 1.0
+        for term_id in sorted(term_ids, key=lambda t: -self._idf[t]):
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+            idf = self._idf[term_id]
+            for position in range(self._offsets[term_id], self._offsets[term_id + 1]):
+                doc_id = self._posting_docs[position]
+                if allowed is not None and doc_id not in allowed:
+                    continue
+                tf = self._posting_freqs[position]
+                norm = k1 * (1 - b + b * self._doc_lengths[doc_id] / average)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        if section is not None and len(ranked) < k:
+            # Vetted clauses for the section are useful even without overlap
+            seen = {doc_id for doc_id, _ in ranked}
+            for doc_id in self.candidates(doc_type or "", section):
+                if len(ranked) >= k:
+                    break
+                if doc_id not in seen:
+                    ranked.append((doc_id, 0.0))
+                    seen.add(doc_id)
+
+        return [(self.clauses[doc_id], round(score, 4)) for doc_id, score in ranked]
+
+    def stats(self) -> Dict[str, int]:
+        """Corpus and index sizes"""
+        return {
+            "clauses": len(self.clauses),
+            "terms": len(self._vocabulary),
+            "postings": len(self._posting_docs),
+        }
+
+
+def _section_title(section: str) -> str:
+    """Human-readable title for a section key"""
+    return section.replace("_", " ").title()
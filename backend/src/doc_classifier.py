@@ -0,0 +1,210 @@
+"""
+Document Type Classifier Module
+Weighted multi-keyword scoring of prompts against document types
+"""
+
+import re
+import logging
+from typing import Dict, List, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:[-'][a-z0-9]+)*")
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_SIBILANT_ENDINGS = ("sses", "xes", "zes", "ches", "shes")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (hyphenated words stay whole)"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def normalize(token: str) -> str:
+    """
+    Fold spelling variants of a token onto one lookup key
+
+    Hyphens and apostrophes are dropped (``non-disclosure`` and
+    ``nondisclosure`` match) and plural endings are stripped (``tenants``,
+    ``parties``, ``businesses``). Keywords and prompts go through the same
+    folding, so it only has to be consistent, not linguistically exact.
+
+    Args:
+        token: Lowercase token from ``tokenize``
+
+    Returns:
+        Lookup key
+    """
+    token = token.replace("-", "").replace("'", "")
+    if len(token) <= 3:
+        return token
+    if token.endswith("ies") and len(token) > 4:
+        return token[:-3] + "y"
+    if token.endswith(_SIBILANT_ENDINGS):
+        return token[:-2]
+    if token.endswith("s") and not token.endswith(("ss", "us", "is")):
+        return token[:-1]
+    return token
+
+
+class DocumentTypeClassifier:
+    """Precompiled keyword classifier returning per-type confidence scores
+
+    All keywords are compiled into a single phrase table keyed by normalized
+    token n-grams. Classifying a prompt is one tokenizer pass plus one hash
+    lookup per n-gram, so per-prompt cost depends on prompt length, not on
+    how many document types or keywords are registered.
+
+    Prompts with no token match fall back to matching keywords as word
+    prefixes (``confidentiality`` starts with ``confidential``), close to
+    the substring rule of the original first-match scan, so inflected
+    forms it accepted are still classified. The fallback is a hash lookup
+    of each word's prefixes at the lengths keywords have, so it does not
+    grow with the keyword count either.
+    """
+
+    def __init__(self, keywords: Mapping[str, Mapping[str, float]]):
+        """
+        Compile the classifier
+
+        Distinctive terms should weigh more than generic ones, so that e.g.
+        "service" in a loan prompt cannot outvote "loan".
+
+        Args:
+            keywords: Mapping of document type to {keyword or phrase: weight}
+        """
+        self.document_types: Tuple[str, ...] = tuple(keywords)
+
+        # Phrases are keyed by their space-joined tokens; multi-word phrases
+        # are only probed at tokens that start one
+        table: Dict[str, List[Tuple[int, float]]] = {}
+        phrase_lengths: Dict[str, set] = {}
+        for type_index, doc_type in enumerate(self.document_types):
+            for phrase, weight in keywords[doc_type].items():
+                tokens = [normalize(token) for token in tokenize(phrase)]
+                if not tokens:
+                    raise ValueError(f"Empty keyword for document type: {doc_type}")
+                table.setdefault(" ".join(tokens), []).append((type_index, float(weight)))
+                if len(tokens) > 1:
+                    phrase_lengths.setdefault(tokens[0], set()).add(len(tokens))
+
+        self._phrases: Dict[str, Tuple[Tuple[int, float], ...]] = {
+            key: tuple(hits) for key, hits in table.items()
+        }
+        self._phrase_lengths: Dict[str, Tuple[int, ...]] = {
+            token: tuple(sorted(lengths)) for token, lengths in phrase_lengths.items()
+        }
+
+        # Prefix fallback: keywords as word sequences whose last word may be
+        # a prefix, e.g. ("employment", "contract") matches "employment contracts"
+        prefixes: Dict[Tuple[str, ...], List[Tuple[int, float]]] = {}
+        prefix_words: Dict[str, set] = {}
+        prefix_lengths = set()
+        for type_index, doc_type in enumerate(self.document_types):
+            for phrase, weight in keywords[doc_type].items():
+                words = tuple(_WORD_RE.findall(phrase.lower()))
+                prefixes.setdefault(words, []).append((type_index, float(weight)))
+                if len(words) > 1:
+                    prefix_words.setdefault(words[0], set()).add(len(words))
+                prefix_lengths.add(len(words[-1]))
+        self._prefixes: Dict[Tuple[str, ...], Tuple[Tuple[int, float], ...]] = {
+            key: tuple(hits) for key, hits in prefixes.items()
+        }
+        self._prefix_words: Dict[str, Tuple[int, ...]] = {
+            word: tuple(sorted(counts, reverse=True)) for word, counts in prefix_words.items()
+        }
+        self._prefix_lengths: Tuple[int, ...] = tuple(sorted(prefix_lengths, reverse=True))
+        logger.info(
+            f"Document classifier compiled: {len(self.document_types)} types, "
+            f"{len(self._phrases)} keywords"
+        )
+
+    def _raw_scores(self, prompt: str) -> Dict[int, float]:
+        """Sum keyword weights per matched document type index"""
+        tokens = [normalize(token) for token in tokenize(prompt)]
+        phrases = self._phrases
+        phrase_lengths = self._phrase_lengths
+        scores: Dict[int, float] = {}
+        for start, token in enumerate(tokens):
+            keys = [token]
+            for length in phrase_lengths.get(token, ()):
+                if start + length <= len(tokens):
+                    keys.append(" ".join(tokens[start : start + length]))
+            for key in keys:
+                hits = phrases.get(key)
+                if hits:
+                    for type_index, weight in hits:
+                        scores[type_index] = scores.get(type_index, 0.0) + weight
+        if not scores:
+            self._prefix_scores(_WORD_RE.findall(prompt.lower()), scores)
+        return scores
+
+    def _prefix_scores(self, words: List[str], scores: Dict[int, float]) -> None:
+        """Add weights of keywords matching at word starts, longest match first"""
+        prefixes = self._prefixes
+        start = 0
+        while start < len(words):
+            matched = 0
+            # Longer phrases first, then longer prefixes of the last word
+            for count in self._prefix_words.get(words[start], ()) + (1,):
+                if start + count > len(words):
+                    continue
+                head = tuple(words[start : start + count - 1])
+                last = words[start + count - 1]
+                for length in self._prefix_lengths:
+                    if length > len(last):
+                        continue
+                    hits = prefixes.get(head + (last[:length],))
+                    if hits:
+                        for type_index, weight in hits:
+                            scores[type_index] = scores.get(type_index, 0.0) + weight
+                        matched = count
+                        break
+                if matched:
+                    break
+            start += matched or 1
+
+    def top_k(self, prompt: str, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        Most likely document types for a prompt
+
+        Args:
+            prompt: User prompt
+            k: Number of candidates to return
+
+        Returns:
+            List of (document type, confidence) for matched types, best first
+        """
+        scores = self._raw_scores(prompt)
+        total = sum(scores.values())
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [
+            (self.document_types[type_index], round(score / total, 4))
+            for type_index, score in ranked
+        ]
+
+    def scores(self, prompt: str) -> Dict[str, float]:
+        """
+        Confidence for every document type
+
+        Args:
+            prompt: User prompt
+
+        Returns:
+            Mapping of document type to confidence (0-1, summing to 1 when any match)
+        """
+        confidences = dict.fromkeys(self.document_types, 0.0)
+        confidences.update(self.top_k(prompt, k=len(self.document_types)))
+        return confidences
+
+    def predict(self, prompt: str) -> Optional[Tuple[str, float]]:
+        """
+        Best document type for a prompt
+
+        Args:
+            prompt: User prompt
+
+        Returns:
+            (document type, confidence) or None when no keyword matches
+        """
+        best = self.top_k(prompt, k=1)
+        return best[0] if best else None
@@ -0,0 +1,411 @@
+"""
+Document Export Module
+Exports the parsed document AST to HTML, markdown and plain text, cached per document
+"""
+
+import os
+import re
+import html
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from src.markdown_ast import (
+    Block,
+    Heading,
+    Inlines,
+    ListItem,
+    SignatureBlock,
+    Table,
+    parse_markdown,
+    plain_text,
+)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = ("html", "markdown", "text")
+EXPORT_MEDIA_TYPES = {
+    "html": "text/html; charset=utf-8",
+    "markdown": "text/markdown; charset=utf-8",
+    "text": "text/plain; charset=utf-8",
+}
+EXPORT_EXTENSIONS = {"html": ".html", "markdown": ".md", "text": ".txt"}
+DEFAULT_DOCUMENT_CACHE_SIZE = int(os.getenv("DOCUMENT_CACHE_SIZE", "256"))
+
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f]")
+_SIGNATURE_PARTIES = ("Party A", "Party B")
+
+# Mirrors the named DOCX styles so the preview reads like the download
+_HTML_STYLE = """
+body { margin: 0; background: #f4f4f4; }
+.legal-document { max-width: 8.5in; margin: 24px auto; padding: 1in; background: #fff;
+  font: 11pt/1.15 "Times New Roman", serif; color: #000; }
+.legal-document h1, .legal-document h2, .legal-document h3 { font-family: Arial, sans-serif; }
+.legal-document h1 { font-size: 16pt; text-align: center; }
+.legal-document p, .legal-document li { margin: 0 0 6pt; }
+.legal-document table { border-collapse: collapse; margin: 6pt 0; width: 100%; }
+.legal-document td, .legal-document th { border: 1px solid #000; padding: 4px 6px; text-align: left; }
+.legal-document table.signature-block td { border: none; padding-top: 36pt; width: 50%; }
+.legal-document footer { margin-top: 24pt; font-size: 8pt; text-align: center; }
+""".strip()
+
+
+def to_html(blocks: List[Block], title: str = "", footer: str = "") -> str:
+    """
+    Render blocks as a standalone HTML page
+
+    All text is HTML-escaped; the only markup is generated from the AST.
+
+    Args:
+        blocks: Parsed document
+        title: Page title
+        footer: Optional footer line
+
+    Returns:
+        HTML document
+    """
+    out = [
+        '<!DOCTYPE html><html><head><meta charset="utf-8">',
+        f"<title>{_html_text(title)}</title><style>{_HTML_STYLE}</style></head>",
+        '<body><article class="legal-document">',
+    ]
+    lists: List[bool] = []
+
+    for block in blocks:
+        if isinstance(block, ListItem):
+            # Flat items carry their level; open and close lists to match
+            while len(lists) > block.level:
+                out.append(f"</li></{_list_tag(lists.pop())}>")
+            if lists and len(lists) == block.level:
+                if lists[-1] != block.ordered:
+                    out.append(f"</li></{_list_tag(lists.pop())}>")
+                else:
+                    out.append("</li>")
+            while len(lists) < block.level:
+                out.append(f"<{_list_tag(block.ordered)}>")
+                lists.append(block.ordered)
+            out.append(f"<li>{_html_inlines(block.inlines)}")
+            continue
+
+        while lists:
+            out.append(f"</li></{_list_tag(lists.pop())}>")
+        if isinstance(block, Heading):
+            out.append(f"<h{block.level}>{_html_inlines(block.inlines)}</h{block.level}>")
+        elif isinstance(block, Table):
+            out.append(_html_table(block))
+        elif isinstance(block, SignatureBlock):
+            cells = "".join(
+                f"<td><strong>__________________________</strong><br>Signed by ({party})"
+                "<br>Date: _____________</td>"
+                for party in _SIGNATURE_PARTIES
+            )
+            out.append(f'<table class="signature-block"><tr>{cells}</tr></table>')
+        else:
+            out.append(f"<p>{_html_inlines(block.inlines)}</p>")
+
+    while lists:
+        out.append(f"</li></{_list_tag(lists.pop())}>")
+    if footer:
+        out.append(f"<footer>{_html_text(footer)}</footer>")
+    out.append("</article></body></html>")
+    return "".join(out)
+
+
+def to_markdown(blocks: List[Block]) -> str:
+    """
+    Render blocks as normalized, sanitized markdown
+
+    Control characters are dropped and ``&``, ``<`` and ``>`` are written as
+    entities, so no raw HTML survives. Lists use ``-`` and ``1.`` with two
+    spaces per level; tables always get a rule row.
+
+    Args:
+        blocks: Parsed document
+
+    Returns:
+        Markdown text
+    """
+    lines: List[str] = []
+    previous: Optional[Block] = None
+    counters: List[int] = []
+
+    for block in blocks:
+        # Blank line between blocks, except inside a run of list items
+        if previous is not None and not (
+            isinstance(previous, ListItem) and isinstance(block, ListItem)
+        ):
+            lines.append("")
+        previous = block
+
+        if isinstance(block, ListItem):
+            marker = _list_marker(counters, block)
+            lines.append(f"{'  ' * (block.level - 1)}{marker} {_md_inlines(block.inlines)}")
+            continue
+        counters = []
+        if isinstance(block, Heading):
+            lines.append(f"{'#' * block.level} {_md_inlines(block.inlines)}")
+        elif isinstance(block, Table):
+            rows = _table_rows(block)
+            columns = max((len(row) for row in rows), default=0)
+            for index, row in enumerate(rows):
+                cells = [_md_inlines(cell).replace("|", "\\|") for cell in row]
+                cells += [""] * (columns - len(cells))
+                lines.append(f"| {' | '.join(cells)} |")
+                if index == 0 and block.header is not None:
+                    lines.append(f"|{'---|' * columns}")
+        elif isinstance(block, SignatureBlock):
+            lines.append("[SIGNATURE_BLOCK]")
+        else:
+            lines.append(_md_inlines(block.inlines))
+
+    return "\n".join(lines) + "\n"
+
+
+def to_text(blocks: List[Block], footer: str = "") -> str:
+    """
+    Render blocks as plain text
+
+    Args:
+        blocks: Parsed document
+        footer: Optional footer line
+
+    Returns:
+        Text with list markers and tables flattened to ``|``-separated rows
+    """
+    lines: List[str] = []
+    counters: List[int] = []
+
+    def blank() -> None:
+        if lines and lines[-1]:
+            lines.append("")
+
+    for block in blocks:
+        if isinstance(block, ListItem):
+            marker = _list_marker(counters, block)
+            lines.append(f"{'  ' * (block.level - 1)}{marker} {_text(block.inlines)}")
+            continue
+        counters = []
+        if isinstance(block, Heading):
+            text = _text(block.inlines)
+            blank()
+            lines.extend([text.upper() if block.level == 1 else text, ""])
+        elif isinstance(block, Table):
+            blank()
+            lines.extend(" | ".join(_text(cell) for cell in row) for row in _table_rows(block))
+            lines.append("")
+        elif isinstance(block, SignatureBlock):
+            for party in _SIGNATURE_PARTIES:
+                blank()
+                lines.extend(
+                    ["__________________________", f"Signed by ({party})", "Date: _____________"]
+                )
+        else:
+            lines.append(_text(block.inlines))
+
+    if footer:
+        blank()
+        lines.append(footer)
+    return "\n".join(lines).strip("\n") + "\n"
+
+
+class RenderedDocument:
+    """One generated document: its source, lazily parsed AST and exports"""
+
+    __slots__ = (
+        "document_id",
+        "document_type",
+        "file_path",
+        "footer",
+        "content",
+        "_blocks",
+        "_exports",
+        "_lock",
+    )
+
+    def __init__(
+        self,
+        document_id: str,
+        document_type: str,
+        content: str,
+        file_path: Optional[str] = None,
+        footer: str = "",
+        blocks: Optional[List[Block]] = None,
+    ):
+        self.document_id = document_id
+        self.document_type = document_type
+        self.file_path = file_path
+        self.footer = footer
+        self.content = content
+        self._blocks = blocks
+        self._exports: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def blocks(self) -> List[Block]:
+        """The document AST, parsed on first use when not handed over"""
+        if self._blocks is None:
+            self._blocks = parse_markdown(self.content)
+        return self._blocks
+
+    def export(self, fmt: str) -> str:
+        """
+        Export the document, rendering each format at most once
+
+        Args:
+            fmt: One of EXPORT_FORMATS
+
+        Returns:
+            Exported document
+
+        Raises:
+            ValueError: If the format is unknown
+        """
+        cached = self._exports.get(fmt)
+        if cached is not None:
+            return cached
+        renderers: Dict[str, Callable[[], str]] = {
+            "html": lambda: to_html(self.blocks, self.document_id, self.footer),
+            "markdown": lambda: to_markdown(self.blocks),
+            "text": lambda: to_text(self.blocks, self.footer),
+        }
+        if fmt not in renderers:
+            raise ValueError(f"format must be one of: {', '.join(EXPORT_FORMATS)}")
+        with self._lock:
+            if fmt not in self._exports:
+                self._exports[fmt] = renderers[fmt]()
+            return self._exports[fmt]
+
+
+class DocumentExportCache:
+    """LRU of recently generated documents, keyed by document id"""
+
+    def __init__(self, max_documents: int = DEFAULT_DOCUMENT_CACHE_SIZE):
+        """
+        Initialize the cache
+
+        Args:
+            max_documents: Documents kept; the least recently used are dropped
+        """
+        self.max_documents = max_documents
+        self._documents: "OrderedDict[str, RenderedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def put(self, document: RenderedDocument) -> None:
+        """Remember a generated document"""
+        if self.max_documents <= 0:
+            return
+        with self._lock:
+            self._documents[document.document_id] = document
+            self._documents.move_to_end(document.document_id)
+            while len(self._documents) > self.max_documents:
+                self._documents.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def get(self, document_id: str) -> Optional[RenderedDocument]:
+        """
+        Look up a document
+
+        Args:
+            document_id: Id returned with the draft
+
+        Returns:
+            RenderedDocument or None if unknown or evicted
+        """
+        with self._lock:
+            document = self._documents.get(document_id)
+            if document is None:
+                self._counters["misses"] += 1
+                return None
+            self._documents.move_to_end(document_id)
+            self._counters["hits"] += 1
+            return document
+
+    def peek(self, document_id: str) -> Optional[RenderedDocument]:
+        """Look up a document without touching recency or counters"""
+        with self._lock:
+            return self._documents.get(document_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary of hit/miss/eviction counters and size
+        """
+        with self._lock:
+            return {
+                **self._counters,
+                "documents": len(self._documents),
+                "max_documents": self.max_documents,
+            }
+
+
+def _list_tag(ordered: bool) -> str:
+    return "ol" if ordered else "ul"
+
+
+def _list_marker(counters: List[int], item: ListItem) -> str:
+    """Bullet or running number of a list item, tracking numbers per level"""
+    del counters[item.level:]
+    while len(counters) < item.level:
+        counters.append(0)
+    if not item.ordered:
+        counters[-1] = 0
+        return "-"
+    counters[-1] += 1
+    return f"{counters[-1]}."
+
+
+def _table_rows(table: Table) -> List[Inlines]:
+    return ([table.header] if table.header is not None else []) + list(table.rows)
+
+
+def _html_text(text: str) -> str:
+    return html.escape(_CONTROL_RE.sub("", text), quote=False)
+
+
+def _html_inlines(inlines: Inlines) -> str:
+    out = []
+    for span in inlines:
+        text = _html_text(span.text)
+        if span.italic:
+            text = f"<em>{text}</em>"
+        if span.bold:
+            text = f"<strong>{text}</strong>"
+        out.append(text)
+    return "".join(out)
+
+
+def _html_table(table: Table) -> str:
+    columns = max((len(row) for row in _table_rows(table)), default=0)
+    out = ["<table>"]
+    if table.header is not None:
+        cells = "".join(f"<th>{_html_inlines(cell)}</th>" for cell in table.header)
+        padding = "<th></th>" * (columns - len(table.header))
+        out.append(f"<thead><tr>{cells}{padding}</tr></thead>")
+    out.append("<tbody>")
+    for row in table.rows:
+        cells = "".join(f"<td>{_html_inlines(cell)}</td>" for cell in row)
+        out.append(f"<tr>{cells}{'<td></td>' * (columns - len(row))}</tr>")
+    out.append("</tbody></table>")
+    return "".join(out)
+
+
+def _md_inlines(inlines: Inlines) -> str:
+    out = []
+    for span in inlines:
+        text = html.escape(_CONTROL_RE.sub("", span.text), quote=False)
+        if span.bold and span.italic:
+            text = f"***{text}***"
+        elif span.bold:
+            text = f"**{text}**"
+        elif span.italic:
+            text = f"*{text}*"
+        out.append(text)
+    return "".join(out)
+
+
+def _text(inlines: Inlines) -> str:
+    return _CONTROL_RE.sub("", plain_text(inlines))
@@ -3,35 +3,313 @@ Document Generator Module
 Converts LLM-generated content to formatted DOCX files
 """
 
+import io
+import os
+import time
+import asyncio
 import logging
-import re
-from typing import Optional
+import threading
+import uuid
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 from datetime import datetime
 from docx import Document
-from docx.shared import Pt, RGBColor, Inches
+from docx.shared import Pt, Inches
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from pathlib import Path
 
+from src.docx_template import (
+    STYLE_BODY,
+    STYLE_SECTION,
+    STYLE_SUBSECTION,
+    STYLE_TABLE,
+    STYLE_TITLE,
+    get_docx_template,
+    list_style,
+)
+from src.document_export import DocumentExportCache, RenderedDocument
+from src.document_store import DocumentStore, StoredDocument
+from src.markdown_ast import (
+    BOLD,
+    Block,
+    Heading,
+    Inlines,
+    ListItem,
+    SignatureBlock,
+    Span,
+    Table,
+    parse_markdown,
+)
+from src.ooxml_writer import get_ooxml_writer
+
 logger = logging.getLogger(__name__)
 
+DOCX_EXECUTORS = ("thread", "process")
+DEFAULT_DOCX_WORKERS = int(os.getenv("DOCX_WORKERS", str(min(4, os.cpu_count() or 1))))
+DEFAULT_DOCX_EXECUTOR = os.getenv("DOCX_EXECUTOR", "thread")
+DOCX_RENDERERS = ("python-docx", "ooxml")
+DEFAULT_DOCX_RENDERER = os.getenv("DOCX_RENDERER", "python-docx")
+
 
 class DocumentGenerator:
     """Generate DOCX documents from LLM content"""
 
-    def __init__(self, output_dir: str = "./outputs"):
+    def __init__(
+        self,
+        output_dir: str = "./outputs",
+        workers: int = DEFAULT_DOCX_WORKERS,
+        executor: str = DEFAULT_DOCX_EXECUTOR,
+        renderer: str = DEFAULT_DOCX_RENDERER,
+        document_cache: Optional[DocumentExportCache] = None,
+        store: Optional[DocumentStore] = None,
+    ):
         """
         Initialize document generator
         
         Args:
             output_dir: Directory to save generated documents
+            workers: Size of the pool used by ``agenerate_document``
+            executor: ``thread`` or ``process`` pool for ``agenerate_document``
+            renderer: Default renderer, ``python-docx`` or ``ooxml``
+            document_cache: Cache of parsed documents for exports (new one if None)
+            store: Content-addressed storage for DOCX files (one under output_dir if None)
         """
+        if executor not in DOCX_EXECUTORS:
+            raise ValueError(f"executor must be one of: {', '.join(DOCX_EXECUTORS)}")
+        if renderer not in DOCX_RENDERERS:
+            raise ValueError(f"renderer must be one of: {', '.join(DOCX_RENDERERS)}")
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.executor_kind = executor
+        self.renderer = renderer
+        self._executor: Optional[Executor] = None
+        self._executor_lock = threading.Lock()
+        self._in_flight = 0
+        self._render_times: deque = deque(maxlen=500)
+        self._counters = {"completed": 0, "failed": 0, "persisted": 0, "persist_failed": 0}
+        self._pending_writes: Set[asyncio.Task] = set()
+        self.template = get_docx_template()
+        self.documents = document_cache or DocumentExportCache()
+        self.store = store or DocumentStore(output_dir)
         logger.info(f"DocumentGenerator initialized with output dir: {output_dir}")
 
+    async def agenerate_document(
+        self,
+        content: str,
+        document_type: str,
+        metadata: Optional[dict] = None,
+        renderer: Optional[str] = None,
+    ) -> StoredDocument:
+        """
+        Generate a DOCX document in the worker pool, off the event loop
+        
+        Args:
+            content: LLM-generated document content
+            document_type: Type of document (loan_agreement, etc.)
+            metadata: Optional metadata dict with document info
+            renderer: ``python-docx`` or ``ooxml`` (defaults to the generator's)
+            
+        Returns:
+            StoredDocument with the document id and blob path
+        """
+        renderer = self._check_renderer(renderer)
+        if self.executor_kind == "process":
+            # Workers only render; storing here runs the parent's write hooks
+            filename, data = await self.arender_document(
+                content, document_type, metadata, renderer
+            )
+            return await asyncio.to_thread(self.save_document, filename, data, document_type)
+        return await self._run_in_pool(
+            self.generate_document, content, document_type, metadata, renderer
+        )
+
+    async def arender_document(
+        self,
+        content: str,
+        document_type: str,
+        metadata: Optional[dict] = None,
+        renderer: Optional[str] = None,
+    ) -> Tuple[str, bytes]:
+        """
+        Render a DOCX document into memory in the worker pool
+        
+        Args:
+            content: LLM-generated document content
+            document_type: Type of document (loan_agreement, etc.)
+            metadata: Optional metadata dict with document info
+            renderer: ``python-docx`` or ``ooxml`` (defaults to the generator's)
+            
+        Returns:
+            Tuple of (file name, DOCX bytes); nothing is written to disk
+        """
+        renderer = self._check_renderer(renderer)
+        if self.executor_kind == "process":
+            filename, data, footer = await self._run_in_pool(
+                _render_in_worker,
+                str(self.output_dir),
+                content,
+                document_type,
+                metadata,
+                renderer,
+            )
+            # The worker's parse stays in the worker; exports re-parse lazily
+            self.documents.put(
+                RenderedDocument(Path(filename).stem, document_type, content, None, footer)
+            )
+            return filename, data
+        return await self._run_in_pool(
+            self.render_document, content, document_type, metadata, renderer
+        )
+
+    async def _run_in_pool(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run a rendering call in the worker pool, tracking latency and failures"""
+        executor = self._get_executor()
+        self._in_flight += 1
+        started = time.perf_counter()
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+        except Exception:
+            self._counters["failed"] += 1
+            raise
+        finally:
+            self._in_flight -= 1
+        self._render_times.append(time.perf_counter() - started)
+        self._counters["completed"] += 1
+        return result
+
+    def save_document(
+        self, filename: str, data: bytes, document_type: Optional[str] = None
+    ) -> StoredDocument:
+        """
+        Store rendered DOCX bytes and index them under the document id
+        
+        Identical documents share one blob in the store.
+        
+        Args:
+            filename: File name returned by ``render_document``
+            data: DOCX bytes
+            document_type: Type of document, kept in the index
+            
+        Returns:
+            StoredDocument with the document id and blob path
+        """
+        stored = self.store.put(filename, data, document_type)
+        document = self.documents.peek(stored.document_id)
+        if document is not None:
+            document.file_path = stored.path
+        self._counters["persisted"] += 1
+        logger.info(f"Document saved: {stored.document_id} -> {stored.path}")
+        return stored
+
+    def persist_in_background(
+        self, filename: str, data: bytes, document_type: Optional[str] = None
+    ) -> "asyncio.Task":
+        """
+        Save rendered DOCX bytes without holding up the response
+        
+        Args:
+            filename: File name returned by ``render_document``
+            data: DOCX bytes
+            document_type: Type of document, kept in the index
+            
+        Returns:
+            Task completing once the document is stored
+        """
+        task = asyncio.get_running_loop().create_task(
+            asyncio.to_thread(self.save_document, filename, data, document_type)
+        )
+        self._pending_writes.add(task)
+        task.add_done_callback(self._write_done)
+        return task
+
+    def _write_done(self, task: "asyncio.Task") -> None:
+        self._pending_writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self._counters["persist_failed"] += 1
+            logger.error(f"Failed to persist document: {str(task.exception())}")
+
+    async def flush_writes(self) -> None:
+        """Wait for background saves still in progress"""
+        if self._pending_writes:
+            await asyncio.gather(*list(self._pending_writes), return_exceptions=True)
+
+    def _check_renderer(self, renderer: Optional[str]) -> str:
+        renderer = renderer or self.renderer
+        if renderer not in DOCX_RENDERERS:
+            raise ValueError(f"renderer must be one of: {', '.join(DOCX_RENDERERS)}")
+        return renderer
+
+    def _get_executor(self) -> Executor:
+        """Create the worker pool on first use"""
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    if self.executor_kind == "process":
+                        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                    else:
+                        self._executor = ThreadPoolExecutor(
+                            max_workers=self.workers, thread_name_prefix="docx"
+                        )
+                    logger.info(
+                        f"DOCX {self.executor_kind} pool started with {self.workers} workers"
+                    )
+        return self._executor
+
+    def get_document(self, document_id: str) -> Optional[RenderedDocument]:
+        """
+        Look up a recently generated document for export
+
+        Args:
+            document_id: Id of the document (its file name without extension)
+
+        Returns:
+            RenderedDocument or None if unknown or no longer cached
+        """
+        return self.documents.get(document_id)
+
+    def shutdown(self) -> None:
+        """Stop the worker pool, waiting for documents in progress"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get DOCX pool metrics
+        
+        Returns:
+            Dictionary with pool size, in-flight and queued documents,
+            background writes, counters and render latency (including time queued)
+        """
+        times = sorted(self._render_times)
+        return {
+            "executor": self.executor_kind,
+            "renderer": self.renderer,
+            "workers": self.workers,
+            "in_flight": self._in_flight,
+            "queue_depth": max(0, self._in_flight - self.workers),
+            "pending_writes": len(self._pending_writes),
+            **self._counters,
+            "render_seconds_avg": round(sum(times) / len(times), 4) if times else 0.0,
+            "render_seconds_p95": round(times[int(0.95 * (len(times) - 1))], 4)
+            if times
+            else 0.0,
+            "documents": self.documents.stats(),
+            "storage": self.store.stats(),
+        }
+
     def generate_document(
-        self, content: str, document_type: str, metadata: Optional[dict] = None
-    ) -> str:
+        self,
+        content: str,
+        document_type: str,
+        metadata: Optional[dict] = None,
+        renderer: Optional[str] = None,
+    ) -> StoredDocument:
         """
         Generate DOCX document from LLM content
         
@@ -39,116 +317,140 @@ class DocumentGenerator:
             content: LLM-generated document content
             document_type: Type of document (loan_agreement, etc.)
             metadata: Optional metadata dict with document info
+            renderer: ``python-docx`` or ``ooxml`` (defaults to the generator's)
             
         Returns:
-            Path to generated document
+            StoredDocument with the document id and blob path
         """
-        doc = Document()
+        filename, data = self.render_document(content, document_type, metadata, renderer)
+        return self.save_document(filename, data, document_type)
 
-        # Add content sections
-        self._add_document_content(doc, content, metadata)
+    def render_document(
+        self,
+        content: str,
+        document_type: str,
+        metadata: Optional[dict] = None,
+        renderer: Optional[str] = None,
+    ) -> Tuple[str, bytes]:
+        """
+        Generate a DOCX document in memory
+        
+        The document is cached for exports like a saved one; ``save_document``
+        writes it out later if it should be downloadable.
+        
+        Args:
+            content: LLM-generated document content
+            document_type: Type of document (loan_agreement, etc.)
+            metadata: Optional metadata dict with document info
+            renderer: ``python-docx`` or ``ooxml`` (defaults to the generator's)
+            
+        Returns:
+            Tuple of (file name, DOCX bytes)
+        """
+        filename, data, footer_text, blocks = self._render(
+            content, document_type, metadata, renderer
+        )
+        self.documents.put(
+            RenderedDocument(
+                Path(filename).stem, document_type, content, None, footer_text, blocks
+            )
+        )
+        return filename, data
 
-        # Generate filename
+    def _render(
+        self,
+        content: str,
+        document_type: str,
+        metadata: Optional[dict] = None,
+        renderer: Optional[str] = None,
+    ) -> Tuple[str, bytes, str, List[Block]]:
+        """Render DOCX bytes, returning the footer line and parse used"""
+        renderer = self._check_renderer(renderer)
         filename = self._generate_filename(document_type)
-        filepath = self.output_dir / filename
+        buffer = io.BytesIO()
+
+        # Parse once; the AST feeds the DOCX renderer and later exports
+        blocks = parse_markdown(content)
+        footer_text = self._footer_text(metadata) if metadata else None
 
-        # Save document
-        doc.save(str(filepath))
-        logger.info(f"Document saved: {filepath}")
+        if renderer == "ooxml":
+            # Stream XML straight into a prebuilt package, no object model
+            get_ooxml_writer().write(blocks, buffer, footer_text)
+        else:
+            doc = self.template.new_document()
 
-        return str(filepath)
+            # Add content sections
+            self._add_document_content(doc, blocks, footer_text)
+
+            # Save document
+            doc.save(buffer)
+
+        return filename, buffer.getvalue(), footer_text or "", blocks
 
     def _add_document_content(
-        self, doc: Document, content: str, metadata: Optional[dict] = None
+        self, doc: Document, blocks: List[Block], footer_text: Optional[str] = None
     ) -> None:
         """
         Add content to document with formatting
         
         Args:
             doc: Document object
-            content: Document content
-            metadata: Optional metadata
+            blocks: Parsed document content
+            footer_text: Optional footer line
         """
-        lines = content.split("\n")
-        
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            # Heading 1 (# Title)
-            if line.startswith("# "):
-                self._add_heading(doc, line[2:].strip(), level=1)
-            
-            # Heading 2 (## Section)
-            elif line.startswith("## "):
-                self._add_heading(doc, line[3:].strip(), level=2)
-            
-            # Heading 3 (### Subsection)
-            elif line.startswith("### "):
-                self._add_heading(doc, line[4:].strip(), level=3)
-            
-            # Signature Block Placeholder
-            elif "[SIGNATURE_BLOCK]" in line:
+        for block in blocks:
+            if isinstance(block, Heading):
+                self._add_heading(doc, block.inlines, level=block.level)
+            elif isinstance(block, ListItem):
+                self._add_paragraph(
+                    doc, block.inlines, style=list_style(block.ordered, block.level)
+                )
+            elif isinstance(block, Table):
+                self._add_table(doc, block)
+            elif isinstance(block, SignatureBlock):
                 self._add_signature_block(doc)
-            
-            # List items (Bullet points)
-            elif line.startswith("- ") or line.startswith("* "):
-                self._add_paragraph(doc, line[2:].strip(), style="List Bullet")
-            
-            # Numbered lists (1. Item)
-            elif re.match(r"^\d+\.\s+", line):
-                match = re.match(r"^\d+\.\s+(.+)$", line)
-                if match:
-                    self._add_paragraph(doc, match.group(1).strip(), style="List Number")
-            
-            # Regular Paragraphs
             else:
-                self._add_paragraph(doc, line)
+                self._add_paragraph(doc, block.inlines)
 
         # Add metadata footer
-        if metadata:
-            self._add_footer(doc, metadata)
-
-    def _add_heading(self, doc: Document, heading: str, level: int = 1) -> None:
-        """Add heading to document with style"""
-        if level == 1:
-            # Main Title Style
-            p = doc.add_heading(heading, level=1)
-            p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            for run in p.runs:
-                run.font.size = Pt(16)
-                run.font.bold = True
-                run.font.color.rgb = RGBColor(0, 0, 0)
-                run.font.name = "Arial"
-        else:
-            # Section Headings
-            p = doc.add_heading(heading, level=level)
-            for run in p.runs:
-                run.font.name = "Arial"
-                run.font.color.rgb = RGBColor(0, 0, 0)
-
-    def _add_paragraph(self, doc: Document, text: str, style: str = None) -> None:
-        """Add paragraph to document with bold support"""
-        if style:
-            p = doc.add_paragraph(style=style)
-        else:
-            p = doc.add_paragraph()
-        
-        # Parse bold markdown (**text**)
-        parts = re.split(r"(\*\*.*?\*\*)", text)
-        for part in parts:
-            if part.startswith("**") and part.endswith("**"):
-                run = p.add_run(part[2:-2])
-                run.font.bold = True
-            else:
-                run = p.add_run(part)
-            
-            run.font.name = "Times New Roman"
-            run.font.size = Pt(11)
-        
-        p.paragraph_format.space_after = Pt(6)
-        p.paragraph_format.line_spacing = 1.15
+        if footer_text is not None:
+            self._add_footer(doc, footer_text)
+
+    def _add_heading(self, doc: Document, heading: Inlines, level: int = 1) -> None:
+        """Add heading paragraph using the title or section style"""
+        style = {1: STYLE_TITLE, 2: STYLE_SECTION}.get(level, STYLE_SUBSECTION)
+        self._add_runs(doc.add_paragraph(style=style), heading)
+
+    def _add_paragraph(self, doc: Document, text: Inlines, style: str = STYLE_BODY) -> None:
+        """Add paragraph; fonts and spacing come from the style"""
+        self._add_runs(doc.add_paragraph(style=style), text)
+
+    def _add_runs(self, paragraph, inlines: Inlines) -> None:
+        """Add one run per span, with only bold and italic set inline"""
+        for span in inlines:
+            run = paragraph.add_run(span.text)
+            if span.bold:
+                run.bold = True
+            if span.italic:
+                run.italic = True
+
+    def _add_table(self, doc: Document, table: Table) -> None:
+        """Add a markdown table; header cells are bold"""
+        rows = list(table.rows)
+        if table.header is not None:
+            header = tuple(
+                tuple(Span(span.text, span.flags | BOLD) for span in cell) for cell in table.header
+            )
+            rows.insert(0, header)
+        if not rows:
+            return
+        columns = max(len(row) for row in rows)
+        docx_table = doc.add_table(rows=len(rows), cols=columns)
+        if self.template.table_style_id:
+            docx_table.style = STYLE_TABLE
+        for docx_row, row in zip(docx_table.rows, rows):
+            for cell, inlines in zip(docx_row.cells, row):
+                self._add_runs(cell.paragraphs[0], inlines)
 
     def _add_signature_block(self, doc: Document) -> None:
         """Add professional signature block"""
@@ -177,18 +479,22 @@ class DocumentGenerator:
         
         doc.add_paragraph()
 
-    def _add_footer(self, doc: Document, metadata: dict) -> None:
+    def _add_footer(self, doc: Document, footer_text: str) -> None:
         """Add footer with metadata"""
         section = doc.sections[0]
         footer = section.footer
         footer_para = footer.paragraphs[0]
-        footer_para.text = f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        footer_para.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
-        footer_para.style.font.size = Pt(8)
+        # Size and alignment come from the base template's Footer style
+        footer_para.text = footer_text
+
+    def _footer_text(self, metadata: dict) -> str:
+        """Footer line shared by both renderers"""
+        text = f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
 
         # Add metadata as footer text
         if "document_type" in metadata:
-            footer_para.text += f" | Type: {metadata['document_type']}"
+            text += f" | Type: {metadata['document_type']}"
+        return text
 
     def _generate_filename(self, document_type: str) -> str:
         """
@@ -198,7 +504,7 @@ class DocumentGenerator:
             document_type: Type of document
             
         Returns:
-            Filename with timestamp
+            Filename with timestamp and a random suffix, unique across workers
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         doc_type_name = (
@@ -206,7 +512,7 @@ class DocumentGenerator:
             if "_" in document_type
             else document_type
         )
-        return f"{doc_type_name}_{timestamp}.docx"
+        return f"{doc_type_name}_{timestamp}_{uuid.uuid4().hex[:8]}.docx"
 
     def add_cover_page(
         self, doc: Document, title: str, parties: list, date: str
@@ -248,6 +554,32 @@ class DocumentGenerator:
         doc.add_page_break()
 
 
+_worker_generators: Dict[str, "DocumentGenerator"] = {}
+
+
+def _render_in_worker(
+    output_dir: str,
+    content: str,
+    document_type: str,
+    metadata: Optional[dict],
+    renderer: Optional[str] = None,
+) -> Any:
+    """
+    Process-pool entry point reusing one generator per output directory
+
+    Workers only render: the parent stores the document, so its store's
+    write hooks (retention accounting) see every blob.
+
+    Returns:
+        Tuple of (file name, DOCX bytes, footer line)
+    """
+    generator = _worker_generators.get(output_dir)
+    if generator is None:
+        generator = _worker_generators[output_dir] = DocumentGenerator(output_dir)
+    filename, data, footer, _ = generator._render(content, document_type, metadata, renderer)
+    return filename, data, footer
+
+
 def generate_legal_document(
     content: str,
     document_type: str,
@@ -267,4 +599,4 @@ def generate_legal_document(
         Path to generated DOCX file
     """
     generator = DocumentGenerator(output_dir)
-    return generator.generate_document(content, document_type, metadata)
+    return generator.generate_document(content, document_type, metadata).path
@@ -0,0 +1,368 @@
+"""
+Document Store Module
+Content-addressed, sharded DOCX storage with a SQLite index of document ids
+"""
+
+import io
+import os
+import re
+import uuid
+import hashlib
+import sqlite3
+import logging
+import threading
+import time
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = "blobs"
+INDEX_FILE = "index.sqlite"
+# Files written straight into the output directory before the store existed
+LEGACY_SUFFIXES = (".docx", ".zip")
+
+_FOOTER_PART_RE = re.compile(r"word/footer\d*\.xml")
+# "Generated on" stamp in the metadata footer, down to the second
+_FOOTER_STAMP_RE = re.compile(rb"Generated on: \d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}")
+
+
+class StoredDocument(NamedTuple):
+    """Index entry of one generated document"""
+
+    document_id: str
+    filename: str
+    digest: str
+    size: int
+    path: str
+
+
+class DocumentStore:
+    """Blobs stored once per content hash, resolved through a document index"""
+
+    def __init__(self, root: str = "./outputs", db_path: Optional[str] = None):
+        """
+        Initialize the store
+
+        Args:
+            root: Directory holding the ``blobs`` tree
+            db_path: SQLite index path (defaults to ``index.sqlite`` under root)
+        """
+        self.root = Path(root)
+        self.blob_root = self.root / BLOB_DIR
+        self.blob_root.mkdir(parents=True, exist_ok=True)
+        db_path = db_path or str(self.root / INDEX_FILE)
+        self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._lock = threading.Lock()
+        self._counters = {"stored": 0, "deduplicated": 0, "evicted": 0, "evicted_bytes": 0}
+        # Called with the size of each newly written blob
+        self.on_write: Optional[Callable[[int], None]] = None
+        with self._lock:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "digest TEXT PRIMARY KEY, size INTEGER NOT NULL, created_at TEXT NOT NULL, "
+                "suffix TEXT NOT NULL DEFAULT '.docx', last_access REAL NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(blobs)")}
+            for column, definition in (
+                ("suffix", "TEXT NOT NULL DEFAULT '.docx'"),
+                ("last_access", "REAL NOT NULL DEFAULT 0"),
+            ):
+                if column not in columns:
+                    self._db.execute(f"ALTER TABLE blobs ADD COLUMN {column} {definition}")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS blobs_last_access ON blobs (last_access)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS blobs_created ON blobs (created_at)")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS documents ("
+                "id TEXT PRIMARY KEY, filename TEXT NOT NULL, digest TEXT NOT NULL, "
+                "document_type TEXT, created_at TEXT NOT NULL)"
+            )
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS documents_digest ON documents (digest)"
+            )
+            self._db.commit()
+        logger.info(f"DocumentStore initialized at {self.root}")
+
+    def blob_path(self, digest: str, suffix: str = ".docx") -> Path:
+        """Sharded location of a blob: ``blobs/ab/cd/abcd....docx``"""
+        return self.blob_root / digest[:2] / digest[2:4] / f"{digest}{suffix}"
+
+    def put(
+        self,
+        filename: str,
+        data: bytes,
+        document_type: Optional[str] = None,
+        created_at: Optional[datetime] = None,
+    ) -> StoredDocument:
+        """
+        Store a document, writing its blob only if the content is new
+
+        Args:
+            filename: Download name; its stem is the document id
+            data: DOCX (or ZIP archive) bytes
+            document_type: Type of document, kept in the index
+            created_at: When the document was generated (defaults to now)
+
+        Returns:
+            StoredDocument for the new index entry
+        """
+        digest = package_digest(data)
+        suffix = Path(filename).suffix or ".docx"
+        path = self.blob_path(digest, suffix)
+        document_id = Path(filename).stem
+
+        # Checking, writing and indexing in one write transaction keeps
+        # eviction (also from other processes, which unlinks inside its own
+        # transaction) from removing the blob in between; a deduplicated
+        # entry refreshes its timestamps
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                known = self._db.execute(
+                    "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+                ).fetchone()
+                written = not (known and path.exists())
+                if written:
+                    # Write under a unique name and rename, so readers never
+                    # see a partial blob
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    partial = path.with_name(f".{digest}.{uuid.uuid4().hex[:8]}.partial")
+                    partial.write_bytes(data)
+                    os.replace(partial, path)
+                self._index(
+                    document_id, filename, digest, len(data), suffix, document_type, created_at
+                )
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+            self._counters["stored" if written else "deduplicated"] += 1
+        if written and self.on_write is not None:
+            self.on_write(len(data))
+        return StoredDocument(document_id, filename, digest, len(data), str(path))
+
+    def _index(
+        self,
+        document_id: str,
+        filename: str,
+        digest: str,
+        size: int,
+        suffix: str,
+        document_type: Optional[str],
+        created_at: Optional[datetime] = None,
+    ) -> None:
+        """Insert a document and its blob row; the caller holds the lock and commits"""
+        created_at = created_at or datetime.now()
+        now = created_at.isoformat()
+        self._db.execute(
+            "INSERT INTO blobs (digest, size, created_at, suffix, last_access) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (digest) DO UPDATE SET "
+            "created_at = MAX(created_at, excluded.created_at), "
+            "last_access = MAX(last_access, excluded.last_access)",
+            (digest, size, now, suffix, created_at.timestamp()),
+        )
+        self._db.execute(
+            "INSERT OR REPLACE INTO documents (id, filename, digest, document_type, created_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (document_id, filename, digest, document_type, now),
+        )
+
+    def get(self, document_id: str) -> Optional[StoredDocument]:
+        """
+        Resolve a document id through the index
+
+        Args:
+            document_id: Id returned with the draft (file name without extension)
+
+        Returns:
+            StoredDocument or None if the id is unknown
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT d.filename, d.digest, b.size, b.suffix FROM documents d "
+                "JOIN blobs b ON b.digest = d.digest WHERE d.id = ?",
+                (document_id,),
+            ).fetchone()
+        if row is None:
+            return None
+        filename, digest, size, suffix = row
+        return StoredDocument(
+            document_id, filename, digest, size, str(self.blob_path(digest, suffix))
+        )
+
+    def touch(self, digest: str) -> None:
+        """Record a download of a blob for least-recently-used eviction"""
+        with self._lock:
+            self._db.execute(
+                "UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), digest)
+            )
+            self._db.commit()
+
+    def bytes_used(self) -> int:
+        """Total size of the stored blobs, from the index"""
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def least_recently_used(self, limit: int) -> List[Tuple[str, int]]:
+        """
+        Blobs in eviction order
+
+        Args:
+            limit: Maximum blobs returned
+
+        Returns:
+            (digest, size) pairs, least recently downloaded or stored first
+        """
+        with self._lock:
+            return self._db.execute(
+                "SELECT digest, size FROM blobs ORDER BY last_access LIMIT ?", (limit,)
+            ).fetchall()
+
+    def created_before(self, cutoff: datetime, limit: int) -> List[Tuple[str, int]]:
+        """
+        Blobs not stored again since a time
+
+        Args:
+            cutoff: Blobs last stored earlier than this are returned
+            limit: Maximum blobs returned
+
+        Returns:
+            (digest, size) pairs, oldest first
+        """
+        with self._lock:
+            return self._db.execute(
+                "SELECT digest, size FROM blobs WHERE created_at < ? ORDER BY created_at LIMIT ?",
+                (cutoff.isoformat(), limit),
+            ).fetchall()
+
+    def evict(
+        self, digests: Iterable[str], stale_before: Optional[float] = None
+    ) -> Tuple[int, int]:
+        """
+        Delete blobs and every document id pointing at them
+
+        Args:
+            digests: Blobs to delete
+            stale_before: Only delete blobs not stored or downloaded since this
+                ``time.time()`` value, so a blob reused after it was picked
+                as a candidate survives
+
+        Returns:
+            Tuple of (blobs deleted, bytes freed)
+        """
+        digests = list(digests)
+        if not digests:
+            return 0, 0
+        placeholders = ", ".join("?" * len(digests))
+        query = f"SELECT digest, size, suffix FROM blobs WHERE digest IN ({placeholders})"
+        params: List[Any] = list(digests)
+        if stale_before is not None:
+            query += " AND last_access <= ?"
+            params.append(stale_before)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._db.execute(query, params).fetchall()
+                if not rows:
+                    self._db.rollback()
+                    return 0, 0
+                evicted = [digest for digest, _, _ in rows]
+                placeholders = ", ".join("?" * len(evicted))
+                # Drop index rows first, so nothing resolves to a blob being removed
+                self._db.execute(
+                    f"DELETE FROM documents WHERE digest IN ({placeholders})", evicted
+                )
+                self._db.execute(f"DELETE FROM blobs WHERE digest IN ({placeholders})", evicted)
+                # Unlink before committing: a put of the same content, from any
+                # process, waits for the write lock and then finds no row and
+                # rewrites the blob instead of losing it
+                for digest, _, suffix in rows:
+                    self.blob_path(digest, suffix).unlink(missing_ok=True)
+                self._db.commit()
+            except BaseException:
+                self._db.rollback()
+                raise
+
+        freed = sum(size for _, size, _ in rows)
+        self._counters["evicted"] += len(rows)
+        self._counters["evicted_bytes"] += freed
+        return len(rows), freed
+
+    def import_legacy(self, directory: Optional[str] = None) -> int:
+        """
+        Move flat DOCX and ZIP files from the output directory into the store
+
+        Files keep their name as document id and their modification time as
+        creation time, so downloads keep working and retention applies to
+        them. Files that are not valid packages are left in place.
+
+        Args:
+            directory: Directory holding the flat files (defaults to root)
+
+        Returns:
+            Number of files imported
+        """
+        directory = Path(directory) if directory else self.root
+        imported = 0
+        for path in sorted(directory.iterdir()):
+            if not path.is_file() or path.suffix not in LEGACY_SUFFIXES:
+                continue
+            try:
+                self.put(
+                    path.name,
+                    path.read_bytes(),
+                    created_at=datetime.fromtimestamp(path.stat().st_mtime),
+                )
+            except (OSError, zipfile.BadZipFile) as e:
+                logger.warning(f"Skipping legacy output {path.name}: {str(e)}")
+                continue
+            path.unlink()
+            imported += 1
+        if imported:
+            logger.info(f"Imported {imported} legacy output files into the store")
+        return imported
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get storage counters
+
+        Returns:
+            Dictionary of indexed documents, distinct blobs, bytes and write counters
+        """
+        with self._lock:
+            documents = self._db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            blobs, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM blobs"
+            ).fetchone()
+        return {"documents": documents, "blobs": blobs, "bytes": size, **self._counters}
+
+
+def package_digest(data: bytes) -> str:
+    """
+    Content hash of a DOCX package
+
+    Hashes part names and contents rather than the zip bytes, whose entry
+    timestamps differ between otherwise identical saves. The "Generated on"
+    stamp in footer parts is left out too, so a redraft of the same content
+    reuses the blob (and shows the footer of its first generation).
+
+    Args:
+        data: DOCX bytes
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        for info in sorted(package.infolist(), key=lambda info: info.filename):
+            part = package.read(info)
+            if _FOOTER_PART_RE.fullmatch(info.filename):
+                part = _FOOTER_STAMP_RE.sub(b"Generated on:", part)
+            digest.update(f"{info.filename}\0{len(part)}\0".encode("utf-8"))
+            digest.update(part)
+    return digest.hexdigest()
@@ -0,0 +1,235 @@
+"""
+DOCX Base Template Module
+Styled base document loaded once and cloned for every generated DOCX
+"""
+
+import io
+import os
+import copy
+import logging
+import threading
+from typing import Dict, Optional, Set
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.oxml.ns import qn
+from docx.shared import Emu, Pt, RGBColor
+from docx.styles import BabelFish
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BASE_TEMPLATE = os.getenv("DOCX_BASE_TEMPLATE", "")
+
+# Paragraph styles generated documents reference, by markdown element
+STYLE_TITLE = "Legal Title"
+STYLE_SECTION = "Legal Section"
+STYLE_SUBSECTION = "Legal Subsection"
+STYLE_BODY = "Legal Body"
+STYLE_LIST_BULLET = "Legal List Bullet"
+STYLE_LIST_NUMBER = "Legal List Number"
+STYLE_FOOTER = "Footer"
+# Table style used when the template defines it
+STYLE_TABLE = "Table Grid"
+LIST_LEVELS = 3
+
+
+def list_style(ordered: bool, level: int) -> str:
+    """
+    Paragraph style of a list item
+
+    Args:
+        ordered: Numbered rather than bulleted
+        level: Nesting level, 1 (outermost) to LIST_LEVELS
+
+    Returns:
+        Style name, e.g. ``Legal List Bullet`` or ``Legal List Number 2``
+    """
+    name = STYLE_LIST_NUMBER if ordered else STYLE_LIST_BULLET
+    return name if level <= 1 else f"{name} {min(level, LIST_LEVELS)}"
+
+
+REQUIRED_STYLES = (
+    STYLE_TITLE,
+    STYLE_SECTION,
+    STYLE_SUBSECTION,
+    STYLE_BODY,
+    *(
+        list_style(ordered, level)
+        for ordered in (False, True)
+        for level in range(1, LIST_LEVELS + 1)
+    ),
+    STYLE_FOOTER,
+)
+
+_STYLESWITHEFFECTS_RELTYPE = "http://schemas.microsoft.com/office/2007/relationships/stylesWithEffects"
+_THUMBNAIL_RELTYPE = "http://schemas.openxmlformats.org/package/2006/relationships/metadata/thumbnail"
+
+
+class DocxBaseTemplate:
+    """Base document with the named styles, parsed once and cloned per document"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Load or build the base document
+
+        Args:
+            path: Optional .docx providing the named styles; the built-in
+                styled base is used when empty
+
+        Raises:
+            ValueError: If the template lacks a required style
+        """
+        if path:
+            base = Document(path)
+            missing = [name for name in REQUIRED_STYLES if _paragraph_style(base, name) is None]
+            if missing:
+                raise ValueError(f"DOCX base template {path} lacks styles: {', '.join(missing)}")
+        else:
+            base = build_base_document()
+
+        self.source = path or "built-in"
+        self._base = base
+        buffer = io.BytesIO()
+        base.save(buffer)
+        self.data = buffer.getvalue()
+        self.style_ids: Dict[str, str] = {
+            name: _paragraph_style(base, name).style_id for name in REQUIRED_STYLES
+        }
+        table_style = next(
+            (s for s in base.styles if s.type == WD_STYLE_TYPE.TABLE and s.name == STYLE_TABLE),
+            None,
+        )
+        self.table_style_id: Optional[str] = table_style.style_id if table_style else None
+        section = base.sections[-1]
+        # Usable width between the margins, for table column widths
+        self.text_width = Emu(section.page_width - section.left_margin - section.right_margin)
+        logger.info(f"DOCX base template loaded ({self.source}, {len(self.data)} bytes)")
+
+    def new_document(self) -> Document:
+        """
+        Fresh document carrying the base styles
+
+        Returns:
+            Independent copy of the base document
+        """
+        return copy.deepcopy(self._base)
+
+
+def build_base_document() -> Document:
+    """
+    Build the default base document from python-docx's template
+
+    Formatting lives in the named styles, so paragraphs only reference a
+    style. Styles nothing can reference are pruned, which keeps the package
+    small to clone, save and open.
+
+    Returns:
+        Styled Document with no body content
+    """
+    doc = Document()
+    styles = doc.styles
+
+    normal = styles["Normal"]
+    title = styles.add_style(STYLE_TITLE, WD_STYLE_TYPE.PARAGRAPH)
+    title.base_style = styles["Heading 1"]
+    title.next_paragraph_style = normal
+    title.font.name = "Arial"
+    title.font.size = Pt(16)
+    title.font.bold = True
+    title.font.color.rgb = RGBColor(0, 0, 0)
+    title.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    for name, heading in ((STYLE_SECTION, "Heading 2"), (STYLE_SUBSECTION, "Heading 3")):
+        style = styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = styles[heading]
+        style.next_paragraph_style = normal
+        style.font.name = "Arial"
+        style.font.color.rgb = RGBColor(0, 0, 0)
+
+    bases = [(STYLE_BODY, "Normal")]
+    for ordered, builtin in ((False, "List Bullet"), (True, "List Number")):
+        for level in range(1, LIST_LEVELS + 1):
+            suffix = f" {level}" if level > 1 else ""
+            bases.append((list_style(ordered, level), builtin + suffix))
+    for name, base in bases:
+        style = styles.add_style(name, WD_STYLE_TYPE.PARAGRAPH)
+        style.base_style = styles[base]
+        style.font.name = "Times New Roman"
+        style.font.size = Pt(11)
+        style.paragraph_format.space_after = Pt(6)
+        style.paragraph_format.line_spacing = 1.15
+
+    footer = styles[STYLE_FOOTER]
+    footer.font.size = Pt(8)
+    footer.paragraph_format.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    _prune_styles(doc)
+    _drop_unused_parts(doc)
+    return doc
+
+
+def _paragraph_style(doc: Document, name: str):
+    for style in doc.styles:
+        if style.type == WD_STYLE_TYPE.PARAGRAPH and style.name == name:
+            return style
+    return None
+
+
+def _prune_styles(doc: Document) -> None:
+    """Remove styles outside the closure of defaults and the named styles"""
+    root = doc.styles.element
+    by_id = {el.get(qn("w:styleId")): el for el in root.findall(qn("w:style"))}
+    names = {}
+    for sid, el in by_id.items():
+        name = el.find(qn("w:name"))
+        if name is not None:
+            names[name.get(qn("w:val"))] = sid
+
+    keep: Set[str] = {sid for sid, el in by_id.items() if el.get(qn("w:default")) == "1"}
+    for name in REQUIRED_STYLES + (STYLE_TABLE, "Header"):
+        name = BabelFish.ui2internal(name)
+        if name in names:
+            keep.add(names[name])
+    numbering = doc.part.numbering_part.element
+    keep.update(el.get(qn("w:val")) for el in numbering.iter(qn("w:pStyle")))
+
+    pending = list(keep)
+    while pending:
+        el = by_id.get(pending.pop())
+        if el is None:
+            continue
+        for tag in ("w:basedOn", "w:link", "w:next"):
+            ref = el.find(qn(tag))
+            if ref is not None and ref.get(qn("w:val")) not in keep:
+                keep.add(ref.get(qn("w:val")))
+                pending.append(ref.get(qn("w:val")))
+
+    for sid, el in by_id.items():
+        if sid not in keep:
+            root.remove(el)
+    latent = root.find(qn("w:latentStyles"))
+    if latent is not None:
+        root.remove(latent)
+
+
+def _drop_unused_parts(doc: Document) -> None:
+    """Drop the stylesWithEffects copy and thumbnail of python-docx's template"""
+    for rels in (doc.part.rels, doc.part.package.rels):
+        for r_id, rel in list(rels.items()):
+            if rel.reltype in (_STYLESWITHEFFECTS_RELTYPE, _THUMBNAIL_RELTYPE):
+                del rels[r_id]
+
+
+_template: Optional[DocxBaseTemplate] = None
+_template_lock = threading.Lock()
+
+
+def get_docx_template() -> DocxBaseTemplate:
+    """Get the process-wide base template"""
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = DocxBaseTemplate(DEFAULT_BASE_TEMPLATE or None)
+    return _template
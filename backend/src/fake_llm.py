@@ -0,0 +1,238 @@
+"""
+Fake LLM Backend Module
+Deterministic offline stand-in for Gemini, used for load testing
+"""
+
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+from typing import AsyncIterator, Dict, List, Optional
+
+from src.llm_config import LLMResponse, LLMTransientError
+
+logger = logging.getLogger(__name__)
+
+_TITLE_RE = re.compile(r"drafting a professional ([^.\n]+)\.")
+_SECTION_RE = re.compile(r"^\s*\d+\.\s+(.+?)\s*$", re.MULTILINE)
+_DETAIL_RE = re.compile(r"^\s*(?:-\s*)?([A-Z][A-Za-z /]+):\s*(.+?)\s*$", re.MULTILINE)
+_SCOPE_RE = re.compile(r"covering these sections in this order: (.+?)\.\s*$", re.MULTILINE)
+_SCOPE_START_RE = re.compile(r"starting from (\d+)")
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "exponential", "lognormal")
+
+
+class FakeLLMBackend:
+    """Offline LLM backend emitting realistic legal markdown"""
+
+    def __init__(
+        self,
+        model_name: str = "fake-legal-drafter",
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        latency_ms: float = 800.0,
+        latency_distribution: str = "lognormal",
+        latency_sigma: float = 0.5,
+        tokens_per_second: float = 80.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        """
+        Initialize fake backend
+
+        Args:
+            model_name: Name reported as the model
+            temperature: Accepted for interface compatibility
+            max_tokens: Maximum tokens in response
+            latency_ms: Median time to first token in milliseconds
+            latency_distribution: One of fixed, uniform, exponential, lognormal
+            latency_sigma: Spread of the latency distribution
+            tokens_per_second: Simulated generation rate
+            error_rate: Probability (0-1) that a call raises LLMTransientError
+            seed: Random seed for reproducible latency and errors
+        """
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown latency distribution: {latency_distribution}. "
+                f"Expected one of {', '.join(LATENCY_DISTRIBUTIONS)}"
+            )
+
+        self.model_name = model_name
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.latency_ms = latency_ms
+        self.latency_distribution = latency_distribution
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+
+        logger.info(
+            f"Fake LLM backend initialized ({latency_distribution} {latency_ms}ms, "
+            f"{tokens_per_second} tok/s, error_rate={error_rate})"
+        )
+
+    @classmethod
+    def from_env(
+        cls, model_name: str, temperature: float, max_tokens: int
+    ) -> "FakeLLMBackend":
+        """Create a fake backend configured from FAKE_LLM_* environment variables"""
+        seed = os.getenv("FAKE_LLM_SEED")
+        return cls(
+            model_name=model_name,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            latency_ms=float(os.getenv("FAKE_LLM_LATENCY_MS", "800")),
+            latency_distribution=os.getenv("FAKE_LLM_LATENCY_DISTRIBUTION", "lognormal"),
+            latency_sigma=float(os.getenv("FAKE_LLM_LATENCY_SIGMA", "0.5")),
+            tokens_per_second=float(os.getenv("FAKE_LLM_TOKENS_PER_SECOND", "80")),
+            error_rate=float(os.getenv("FAKE_LLM_ERROR_RATE", "0")),
+            seed=int(seed) if seed else None,
+        )
+
+    def invoke(self, prompt: str) -> LLMResponse:
+        content = self.render(prompt)
+        self._maybe_fail()
+        time.sleep(self._first_token_delay() + self._generation_time(content))
+        return LLMResponse(content)
+
+    async def ainvoke(self, prompt: str) -> LLMResponse:
+        content = self.render(prompt)
+        self._maybe_fail()
+        await asyncio.sleep(self._first_token_delay() + self._generation_time(content))
+        return LLMResponse(content)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        content = self.render(prompt)
+        self._maybe_fail()
+        await asyncio.sleep(self._first_token_delay())
+        for line in content.splitlines(keepends=True):
+            await asyncio.sleep(self._generation_time(line))
+            yield line
+
+    def _first_token_delay(self) -> float:
+        """Sample the time to first token in seconds"""
+        median = self.latency_ms / 1000.0
+        if self.latency_distribution == "fixed":
+            return median
+        if self.latency_distribution == "uniform":
+            spread = median * self.latency_sigma
+            return max(0.0, self._rng.uniform(median - spread, median + spread))
+        if self.latency_distribution == "exponential":
+            return self._rng.expovariate(1.0 / median) if median > 0 else 0.0
+        return median * self._rng.lognormvariate(0.0, self.latency_sigma)
+
+    def _generation_time(self, text: str) -> float:
+        """Time to emit ``text`` at the configured token rate"""
+        if self.tokens_per_second <= 0:
+            return 0.0
+        return _estimate_tokens(text) / self.tokens_per_second
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise LLMTransientError("Fake LLM backend injected failure")
+
+    def render(self, prompt: str) -> str:
+        """
+        Deterministically render a markdown document for a prompt
+
+        The title, requested sections and party details are read from the
+        prompt, so every LegalPromptTemplates document type gets its own
+        structure.
+
+        Args:
+            prompt: Formatted prompt
+
+        Returns:
+            Markdown document content
+        """
+        title_match = _TITLE_RE.search(prompt)
+        title = title_match.group(1).strip() if title_match else "Agreement"
+        details = _parse_details(prompt)
+        sections = _SECTION_RE.findall(prompt) or ["Terms and Conditions"]
+        first_number = 1
+        include_title = True
+
+        # Section-parallel prompts scope the draft to a subset of sections
+        scope = _SCOPE_RE.search(prompt)
+        if scope:
+            sections = [name.strip() for name in scope.group(1).split(",")]
+            start = _SCOPE_START_RE.search(prompt)
+            first_number = int(start.group(1)) if start else 1
+            include_title = "Begin with the `# Title`" in prompt
+        parties = [
+            value
+            for key, value in details.items()
+            if key.endswith(("name", "party", "provider", "client", "names"))
+        ] or ["Party A", "Party B"]
+
+        date = details.get("date of agreement", details.get("date", "the Effective Date"))
+
+        lines = []
+        if include_title:
+            lines.append(f"# {title.upper()}")
+            lines.append("")
+            lines.append(
+                f"This {title} is entered into on {date} "
+                f"by and between {' and '.join('**' + p + '**' for p in parties[:2])} "
+                f"(collectively, the **Parties**)."
+            )
+            lines.append("")
+
+        budget = self.max_tokens - _estimate_tokens("\n".join(lines))
+        for index, section in enumerate(sections, start=first_number):
+            block = _render_section(index, section, title, details)
+            cost = _estimate_tokens(block)
+            if cost > budget:
+                break
+            lines.append(block)
+            budget -= cost
+
+        return "\n".join(lines).strip()
+
+
+def _parse_details(prompt: str) -> Dict[str, str]:
+    """Extract ``Label: value`` detail lines from a prompt"""
+    details = {}
+    for label, value in _DETAIL_RE.findall(prompt):
+        details[label.strip().lower()] = value
+    return details
+
+
+def _render_section(index: int, section: str, title: str, details: Dict[str, str]) -> str:
+    """Render one numbered section of boilerplate legal text"""
+    heading = section.split("(")[0].strip()
+    if "signature" in heading.lower():
+        return (
+            f"## {index}. {heading}\n\n"
+            f"IN WITNESS WHEREOF, the Parties have executed this {title} "
+            "on the date first written above.\n\n[SIGNATURE_BLOCK]\n"
+        )
+
+    jurisdiction = details.get("jurisdiction", "India")
+    body: List[str] = [
+        f"## {index}. {heading}",
+        "",
+        f"The Parties agree that the provisions of this **{heading}** clause shall "
+        f"apply for the entire term of this {title} and shall be interpreted in "
+        f"accordance with the laws of {jurisdiction}.",
+        "",
+        "Each Party shall act in good faith in performing its obligations under "
+        "this clause and shall promptly notify the other Party in writing of any "
+        "circumstance that may affect such performance.",
+        "",
+        f"- Obligations under this clause survive any amendment of this {title}.",
+        "- Notices shall be delivered in writing to the addresses set out above.",
+        "",
+        "1. The rights under this clause are cumulative.",
+        "2. No waiver shall be effective unless made in writing.",
+        "",
+    ]
+    return "\n".join(body)
+
+
+def _estimate_tokens(text: str) -> int:
+    """Rough token estimate (about four characters per token)"""
+    return max(1, len(text) // 4)
@@ -0,0 +1,368 @@
+"""
+Job Queue Module
+SQLite-backed draft jobs processed by an in-process worker pool
+"""
+
+import json
+import uuid
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed")
+
+
+class JobFailed(Exception):
+    """Raised by a job handler to record a failure with an HTTP-style status"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+# Load shedding, an unavailable LLM and upstream timeouts; other 5xx are bugs
+RETRYABLE_STATUS_CODES = frozenset({429, 503, 504})
+
+
+class JobRetry(JobFailed):
+    """Raised by a job handler when the job should run again later"""
+
+    def __init__(self, status_code: int, detail: str, retry_after: float = 0):
+        super().__init__(status_code, detail)
+        self.retry_after = retry_after
+
+
+class JobStore:
+    """Persistent job records in SQLite"""
+
+    def __init__(self, db_path: str = "./jobs/jobs.sqlite"):
+        """
+        Initialize job store
+
+        Args:
+            db_path: Path of the SQLite database file
+        """
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(db_path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "id TEXT PRIMARY KEY, status TEXT NOT NULL, request TEXT NOT NULL, "
+                "result TEXT, error TEXT, status_code INTEGER, timings TEXT, "
+                "created_at TEXT NOT NULL, started_at TEXT, finished_at TEXT, "
+                "attempts INTEGER NOT NULL DEFAULT 0)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(jobs)")}
+            if "attempts" not in columns:
+                self._db.execute(
+                    "ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0"
+                )
+            self._db.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)")
+            self._db.commit()
+        logger.info(f"JobStore initialized at {db_path}")
+
+    def create(self, request: Dict[str, Any]) -> str:
+        """
+        Insert a queued job
+
+        Args:
+            request: JSON-serializable request payload
+
+        Returns:
+            New job id
+        """
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO jobs (id, status, request, created_at) VALUES (?, ?, ?, ?)",
+                (job_id, "queued", json.dumps(request), _now()),
+            )
+            self._db.commit()
+        return job_id
+
+    def mark_running(self, job_id: str) -> None:
+        self._update(job_id, status="running", started_at=_now())
+
+    def requeue(self, job_id: str, error: str, status_code: int) -> int:
+        """
+        Put a running job back in the queue after a transient failure
+
+        Args:
+            job_id: Job id
+            error: Reason of the failed attempt
+            status_code: HTTP-style status of the failed attempt
+
+        Returns:
+            Number of failed attempts so far
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, error = ?, "
+                "status_code = ?, attempts = attempts + 1 WHERE id = ?",
+                (error, status_code, job_id),
+            )
+            self._db.commit()
+            row = self._db.execute(
+                "SELECT attempts FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return row["attempts"] if row is not None else 0
+
+    def complete(self, job_id: str, result: Dict[str, Any], timings: Dict[str, float]) -> None:
+        self._update(
+            job_id,
+            status="succeeded",
+            result=json.dumps(result),
+            timings=json.dumps(timings),
+            finished_at=_now(),
+        )
+
+    def fail(
+        self, job_id: str, error: str, status_code: int, timings: Dict[str, float]
+    ) -> None:
+        self._update(
+            job_id,
+            status="failed",
+            error=error,
+            status_code=status_code,
+            timings=json.dumps(timings),
+            finished_at=_now(),
+        )
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._lock:
+            self._db.execute(
+                f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id)
+            )
+            self._db.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a job record
+
+        Args:
+            job_id: Job id
+
+        Returns:
+            Job dictionary with decoded JSON fields, or None
+        """
+        with self._lock:
+            row = self._db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        for field in ("request", "result", "timings"):
+            if job[field] is not None:
+                job[field] = json.loads(job[field])
+        return job
+
+    def recover(self) -> List[str]:
+        """
+        Requeue jobs interrupted by a restart
+
+        Returns:
+            Ids of queued jobs in creation order
+        """
+        with self._lock:
+            self._db.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'"
+            )
+            self._db.commit()
+            rows = self._db.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+        return [row["id"] for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """Number of jobs per status"""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"
+            ).fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({row["status"]: row["n"] for row in rows})
+        return counts
+
+
+JobHandler = Callable[[Dict[str, Any], Dict[str, float]], Awaitable[Dict[str, Any]]]
+
+
+class JobQueue:
+    """In-process worker pool draining jobs from a JobStore"""
+
+    def __init__(
+        self,
+        store: JobStore,
+        workers: int = 4,
+        max_attempts: int = 5,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 60.0,
+    ):
+        """
+        Initialize job queue
+
+        Args:
+            store: Persistent job store
+            workers: Number of concurrent worker tasks
+            max_attempts: Runs per job before a retryable failure becomes final
+            retry_base_delay: First backoff in seconds, doubled per attempt
+            retry_max_delay: Upper bound of the backoff (Retry-After can exceed it)
+        """
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.store = store
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.handler: Optional[JobHandler] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retries: Dict[str, asyncio.TimerHandle] = {}
+        self._counters = {"retried": 0}
+
+    async def start(self, handler: JobHandler) -> None:
+        """
+        Start workers and requeue jobs left over from a previous run
+
+        Args:
+            handler: Coroutine running a job payload, filling per-stage timings
+        """
+        self.handler = handler
+        self._queue = asyncio.Queue()
+        recovered = await asyncio.to_thread(self.store.recover)
+        for job_id in recovered:
+            self._queue.put_nowait(job_id)
+        if recovered:
+            logger.info(f"Recovered {len(recovered)} queued jobs")
+
+        self._tasks = [
+            asyncio.create_task(self._worker(n)) for n in range(self.workers)
+        ]
+        logger.info(f"Job queue started with {self.workers} workers")
+
+    async def stop(self) -> None:
+        """Cancel workers; running and delayed jobs are requeued on next start"""
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, request: Dict[str, Any]) -> str:
+        """
+        Persist and enqueue a job
+
+        Args:
+            request: JSON-serializable request payload
+
+        Returns:
+            Job id
+        """
+        if self._queue is None:
+            raise RuntimeError("Job queue is not running")
+        job_id = await asyncio.to_thread(self.store.create, request)
+        self._queue.put_nowait(job_id)
+        return job_id
+
+    async def _worker(self, number: int) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                # A store error must not end this worker's loop for good
+                logger.error(
+                    f"Worker {number} failed running job {job_id}: {str(e)}", exc_info=True
+                )
+                try:
+                    await asyncio.to_thread(self.store.fail, job_id, str(e), 500, {})
+                except Exception as store_error:
+                    logger.error(f"Could not mark job {job_id} failed: {str(store_error)}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job_id: str) -> None:
+        job = await asyncio.to_thread(self.store.get, job_id)
+        if job is None or job["status"] != "queued":
+            return
+
+        await asyncio.to_thread(self.store.mark_running, job_id)
+        timings: Dict[str, float] = {}
+        started = time.perf_counter()
+        try:
+            result = await self.handler(job["request"], timings)
+        except JobRetry as retry:
+            attempts = await asyncio.to_thread(
+                self.store.requeue, job_id, retry.detail, retry.status_code
+            )
+            if attempts < self.max_attempts:
+                self._schedule_retry(job_id, attempts, retry.retry_after)
+                return
+            timings["total_seconds"] = round(time.perf_counter() - started, 4)
+            await asyncio.to_thread(
+                self.store.fail, job_id, retry.detail, retry.status_code, timings
+            )
+            logger.warning(f"Job {job_id} failed after {attempts} attempts: {retry.detail}")
+            return
+        except JobFailed as failure:
+            timings["total_seconds"] = round(time.perf_counter() - started, 4)
+            await asyncio.to_thread(
+                self.store.fail, job_id, failure.detail, failure.status_code, timings
+            )
+            logger.warning(f"Job {job_id} failed: {failure.detail}")
+            return
+        except Exception as e:
+            timings["total_seconds"] = round(time.perf_counter() - started, 4)
+            await asyncio.to_thread(self.store.fail, job_id, str(e), 500, timings)
+            logger.error(f"Job {job_id} failed: {str(e)}", exc_info=True)
+            return
+
+        timings["total_seconds"] = round(time.perf_counter() - started, 4)
+        await asyncio.to_thread(self.store.complete, job_id, result, timings)
+        logger.info(f"Job {job_id} completed in {timings['total_seconds']}s")
+
+    def _schedule_retry(self, job_id: str, attempts: int, retry_after: float) -> None:
+        """Enqueue a requeued job again after backoff, at least ``retry_after``"""
+        backoff = min(self.retry_base_delay * 2 ** (attempts - 1), self.retry_max_delay)
+        delay = max(backoff, retry_after)
+        self._counters["retried"] += 1
+        logger.info(f"Job {job_id} retrying in {delay:.1f}s (attempt {attempts + 1})")
+
+        def enqueue() -> None:
+            self._retries.pop(job_id, None)
+            self._queue.put_nowait(job_id)
+
+        self._retries[job_id] = asyncio.get_running_loop().call_later(delay, enqueue)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue metrics
+
+        Returns:
+            Dictionary with worker count, queue depth, delayed retries and
+            per-status job counts
+        """
+        return {
+            "workers": len(self._tasks),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "retry_pending": len(self._retries),
+            **self._counters,
+            "jobs": self.store.counts(),
+        }
+
+
+def _now() -> str:
+    return datetime.now().isoformat()
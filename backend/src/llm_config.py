@@ -5,13 +5,122 @@ Handles Google Gemini integration and LLM initialization
 
 import os
 import logging
-from typing import Optional, Any
+import threading
+from typing import Optional, Any, AsyncIterator, Dict, Tuple, Protocol
 from dotenv import load_dotenv
 
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_MODEL = os.getenv("LLM_MODEL", "gemini-2.0-flash")
+DEFAULT_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.7"))
+DEFAULT_MAX_TOKENS = int(os.getenv("LLM_MAX_TOKENS", "2000"))
+DEFAULT_BACKEND = os.getenv("LLM_BACKEND", "gemini")
+
+LLM_BACKENDS = ("gemini", "fake")
+
+
+class LLMTransientError(RuntimeError):
+    """Retryable LLM failure (rate limit, timeout, temporary outage)"""
+
+
+class LLMResponse:
+    """Response returned by LLM wrappers"""
+
+    __slots__ = ("content",)
+
+    def __init__(self, content: str):
+        self.content = content
+
+
+class LLMBackend(Protocol):
+    """Interface implemented by every LLM backend"""
+
+    model_name: str
+    temperature: float
+    max_tokens: int
+
+    def invoke(self, prompt: str) -> LLMResponse:
+        """Generate the full response synchronously"""
+        ...
+
+    async def ainvoke(self, prompt: str) -> LLMResponse:
+        """Generate the full response without blocking the event loop"""
+        ...
+
+    def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Yield response text chunks as they are produced"""
+        ...
+
+
+class GeminiWrapper:
+    """Thin wrapper around a Gemini GenerativeModel"""
+
+    def __init__(self, model_name: str, temperature: float, max_tokens: int):
+        """
+        Initialize Gemini wrapper
+
+        Args:
+            model_name: Gemini model name
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens in response
+        """
+        import google.generativeai as genai
+
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.generation_config = genai.types.GenerationConfig(
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+        )
+
+    @staticmethod
+    def _to_response(resp) -> LLMResponse:
+        content = ""
+        try:
+            content = resp.text.strip()
+        except Exception:
+            # Fallback to textual content if structure differs
+            content = str(resp)
+
+        return LLMResponse(content)
+
+    def invoke(self, prompt: str) -> LLMResponse:
+        # Generate content using Gemini
+        resp = self.model.generate_content(
+            prompt,
+            generation_config=self.generation_config,
+        )
+        return self._to_response(resp)
+
+    async def ainvoke(self, prompt: str) -> LLMResponse:
+        # Non-blocking generation via the SDK's async client, so the
+        # event loop keeps serving other requests while Gemini works
+        resp = await self.model.generate_content_async(
+            prompt,
+            generation_config=self.generation_config,
+        )
+        return self._to_response(resp)
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        # Yield text chunks as Gemini produces them
+        resp = await self.model.generate_content_async(
+            prompt,
+            generation_config=self.generation_config,
+            stream=True,
+        )
+        async for chunk in resp:
+            try:
+                text = chunk.text
+            except Exception:
+                # Chunks without text parts (e.g. safety metadata only)
+                continue
+            if text:
+                yield text
+
 
 class LLMConfig:
     """Configuration for LLM models"""
@@ -19,21 +128,30 @@ class LLMConfig:
     def __init__(
         self,
         api_key: Optional[str] = None,
-        model: str = "gemini-2.0-flash",
-        temperature: float = 0.7,
-        max_tokens: int = 2000,
+        model: str = DEFAULT_MODEL,
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        backend: str = DEFAULT_BACKEND,
     ):
         """
         Initialize LLM configuration
-        
+
         Args:
             api_key: Google Gemini API key
-            model: Model name (default: gemini-1.5-flash)
+            model: Model name (default: gemini-2.0-flash)
             temperature: Sampling temperature (0-1)
             max_tokens: Maximum tokens in response
+            backend: LLM backend name ('gemini' or 'fake')
         """
+        if backend not in LLM_BACKENDS:
+            raise ValueError(
+                f"Unknown LLM backend: {backend}. "
+                f"Expected one of {', '.join(LLM_BACKENDS)}"
+            )
+        self.backend = backend
+
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
-        if not self.api_key:
+        if backend == "gemini" and not self.api_key:
             raise ValueError(
                 "GEMINI_API_KEY not found in environment variables. "
                 "Please set it in .env file or environment."
@@ -43,59 +161,149 @@ class LLMConfig:
         self.temperature = temperature
         self.max_tokens = max_tokens
 
-        logger.info(f"LLM Config initialized with model: {self.model}")
+        logger.info(
+            f"LLM Config initialized with model: {self.model} (backend: {self.backend})"
+        )
+
+    def configure(self) -> None:
+        """Configure the Gemini SDK with this API key"""
+        if self.backend != "gemini":
+            return
 
-    def get_llm(self) -> Any:
+        import google.generativeai as genai
+
+        genai.configure(api_key=self.api_key)
+
+    def create_backend(self) -> LLMBackend:
+        """
+        Construct the configured backend (assumes configure() has run)
+
+        Returns:
+            LLM backend instance
+        """
+        if self.backend == "fake":
+            from src.fake_llm import FakeLLMBackend
+
+            return FakeLLMBackend.from_env(self.model, self.temperature, self.max_tokens)
+
+        return GeminiWrapper(self.model, self.temperature, self.max_tokens)
+
+    def get_llm(self) -> LLMBackend:
         """
         Get initialized LLM instance
-        
+
         Returns:
-            Gemini model wrapper instance
+            LLM backend instance
         """
-        import google.generativeai as genai
+        self.configure()
+        return self.create_backend()
 
-        genai.configure(api_key=self.api_key)
 
-        class GeminiWrapper:
-            def __init__(self, model_name: str, temperature: float, max_tokens: int):
-                self.model = genai.GenerativeModel(model_name)
-                self.temperature = temperature
-                self.max_tokens = max_tokens
-
-            def invoke(self, prompt: str):
-                # Generate content using Gemini
-                generation_config = genai.types.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_tokens,
-                )
-                
-                resp = self.model.generate_content(
-                    prompt,
-                    generation_config=generation_config,
+ClientKey = Tuple[str, float, int]
+
+
+class LLMClientPool:
+    """Process-wide, thread-safe pool of LLM clients"""
+
+    def __init__(self, api_key: Optional[str] = None, backend: str = DEFAULT_BACKEND):
+        """
+        Initialize client pool
+
+        Args:
+            api_key: Google Gemini API key (falls back to GEMINI_API_KEY)
+            backend: LLM backend name ('gemini' or 'fake')
+        """
+        self.api_key = api_key
+        self.backend = backend
+        self._clients: Dict[ClientKey, LLMBackend] = {}
+        self._lock = threading.Lock()
+        self._configured = False
+
+    def get(
+        self,
+        model: str = DEFAULT_MODEL,
+        temperature: float = DEFAULT_TEMPERATURE,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+    ) -> LLMBackend:
+        """
+        Get a pooled client, creating it on first use
+
+        Args:
+            model: Model name
+            temperature: Sampling temperature (0-1)
+            max_tokens: Maximum tokens in response
+
+        Returns:
+            Shared LLM backend instance
+        """
+        key = (model, float(temperature), int(max_tokens))
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                config = LLMConfig(
+                    api_key=self.api_key,
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    backend=self.backend,
                 )
-                
-                content = ""
-                try:
-                    content = resp.text.strip()
-                except Exception:
-                    # Fallback to textual content if structure differs
-                    content = str(resp)
+                if not self._configured:
+                    config.configure()
+                    self._configured = True
+                client = config.create_backend()
+                self._clients[key] = client
+                logger.info(f"LLM client pooled for key: {key}")
+        return client
 
-                # Return an object with `.content` attribute for compatibility
-                return type("Resp", (), {"content": content})
+    def warm(self, keys: Optional[list] = None) -> None:
+        """
+        Create clients ahead of the first request
+
+        Args:
+            keys: List of (model, temperature, max_tokens) tuples;
+                defaults to the configured default client
+        """
+        for key in keys or [(DEFAULT_MODEL, DEFAULT_TEMPERATURE, DEFAULT_MAX_TOKENS)]:
+            self.get(*key)
+
+    def size(self) -> int:
+        """Number of pooled clients"""
+        return len(self._clients)
+
+    def clear(self) -> None:
+        """Drop all pooled clients"""
+        with self._lock:
+            self._clients.clear()
+            self._configured = False
 
-        return GeminiWrapper(self.model, self.temperature, self.max_tokens)
 
+_llm_pool: Optional[LLMClientPool] = None
+_llm_pool_lock = threading.Lock()
 
-def initialize_llm(model: str = "gemini-2.0-flash") -> Any:
+
+def get_llm_pool() -> LLMClientPool:
+    """Get the process-wide LLM client pool"""
+    global _llm_pool
+    if _llm_pool is None:
+        with _llm_pool_lock:
+            if _llm_pool is None:
+                _llm_pool = LLMClientPool()
+    return _llm_pool
+
+
+def initialize_llm(model: str = DEFAULT_MODEL) -> Any:
     """
     Convenience function to initialize LLM
-    
+
     Args:
         model: Model name
-        
+
     Returns:
-        Gemini model wrapper instance
+        LLM backend instance
     """
     config = LLMConfig(model=model)
     return config.get_llm()
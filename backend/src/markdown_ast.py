@@ -0,0 +1,240 @@
+"""
+Markdown AST Module
+Single-pass tokenizer turning LLM markdown into a compact block/inline tree
+"""
+
+import re
+from dataclasses import dataclass
+from functools import partial
+from typing import List, NamedTuple, Optional, Tuple, Union
+
+SIGNATURE_MARKER = "[SIGNATURE_BLOCK]"
+MAX_HEADING_LEVEL = 3
+MAX_LIST_LEVEL = 3
+
+# Inline span flags
+BOLD = 1
+ITALIC = 2
+
+# One match per line classifies it: heading, list item, table row or text
+_BLOCK_RE = re.compile(
+    r"(?P<heading>#{1,6})\s+(?P<heading_text>.*)"
+    r"|(?:(?P<bullet>[-*+])|(?P<number>\d{1,9})[.)])\s+(?P<item>.*)"
+    r"|(?P<row>\|.*)"
+)
+_TABLE_RULE_RE = re.compile(r"^\|?\s*:?-+:?\s*(?:\|\s*:?-+:?\s*)*\|?$")
+_CELL_SPLIT_RE = re.compile(r"(?<!\\)\|")
+# Alternatives share the leading "*", so the engine can skip ahead to it;
+# runs without "*" are matched greedily, which cannot overshoot the closer
+_INLINE_RE = re.compile(
+    r"\*(?:\*\*([^*]+)\*\*\*"
+    r"|\*(.+?)\*\*"
+    r"|(?<![\w*]\*)([^*\s](?:[^*]*[^*\s])?)\*(?![\w*]))"
+)
+# Characters a heading, list item or table row can start with
+_BLOCK_START = frozenset("#-*+|0123456789")
+
+
+class Span(NamedTuple):
+    """Run of text sharing one set of flags"""
+
+    text: str
+    flags: int = 0
+
+    @property
+    def bold(self) -> bool:
+        return bool(self.flags & BOLD)
+
+    @property
+    def italic(self) -> bool:
+        return bool(self.flags & ITALIC)
+
+
+Inlines = Tuple[Span, ...]
+
+# Span(text, flags) without the Python-level __new__, for the hot loops
+_span = partial(tuple.__new__, Span)
+
+# Blocks are never modified after parsing but are not frozen: a frozen
+# dataclass costs twice as much to build, and long contracts have thousands
+
+
+@dataclass
+class Heading:
+    __slots__ = ("level", "inlines")
+
+    level: int
+    inlines: Inlines
+
+
+@dataclass
+class Paragraph:
+    __slots__ = ("inlines",)
+
+    inlines: Inlines
+
+
+@dataclass
+class ListItem:
+    """List item; nesting is the ``level`` (1 = outermost)"""
+
+    __slots__ = ("ordered", "level", "inlines")
+
+    ordered: bool
+    level: int
+    inlines: Inlines
+
+
+@dataclass
+class Table:
+    """Pipe table; ``header`` is None when the table has no rule row"""
+
+    __slots__ = ("header", "rows")
+
+    header: Optional[Tuple[Inlines, ...]]
+    rows: Tuple[Tuple[Inlines, ...], ...]
+
+
+@dataclass
+class SignatureBlock:
+    __slots__ = ()
+
+
+Block = Union[Heading, Paragraph, ListItem, Table, SignatureBlock]
+
+
+def parse_markdown(content: str) -> List[Block]:
+    """
+    Tokenize markdown into blocks in one pass over the lines
+
+    Every non-empty line becomes one block, except consecutive ``|`` rows,
+    which form a table. Inline emphasis is only scanned in lines
+    containing ``*``.
+
+    Args:
+        content: LLM-generated markdown
+
+    Returns:
+        List of blocks in document order
+    """
+    blocks: List[Block] = []
+    table: List[str] = []
+    list_indents: List[int] = []
+
+    for raw in content.split("\n"):
+        line = raw.strip()
+        match = _BLOCK_RE.match(line) if line and line[0] in _BLOCK_START else None
+        if match is None:
+            # Blank lines and prose need no further classification
+            if table:
+                _append_table(blocks, table)
+                table = []
+            if not line:
+                continue
+            if SIGNATURE_MARKER in line:
+                blocks.append(SignatureBlock())
+            else:
+                inlines = parse_inlines(line) if "*" in line else (_span((line, 0)),)
+                blocks.append(Paragraph(inlines))
+                list_indents = []
+            continue
+
+        # The last group closed identifies the alternative that matched
+        kind = match.lastgroup
+        if table and kind != "row":
+            _append_table(blocks, table)
+            table = []
+
+        if kind == "heading_text":
+            level = min(len(match.group("heading")), MAX_HEADING_LEVEL)
+            text = match.group(kind)
+            inlines = parse_inlines(text) if "*" in text else (_span((text, 0)),)
+            blocks.append(Heading(level, inlines))
+            list_indents = []
+        elif SIGNATURE_MARKER in line:
+            blocks.append(SignatureBlock())
+        elif kind == "item":
+            expanded = raw.expandtabs(4)
+            indent = len(expanded) - len(expanded.lstrip())
+            while list_indents and indent < list_indents[-1]:
+                list_indents.pop()
+            if not list_indents or indent > list_indents[-1]:
+                list_indents.append(indent)
+            level = min(len(list_indents), MAX_LIST_LEVEL)
+            text = match.group(kind)
+            inlines = parse_inlines(text) if "*" in text else (_span((text, 0)),)
+            blocks.append(ListItem(match.group("number") is not None, level, inlines))
+        else:
+            table.append(line)
+
+    if table:
+        _append_table(blocks, table)
+    return blocks
+
+
+def parse_inlines(text: str, flags: int = 0) -> Inlines:
+    """
+    Split text into spans for ``***bold italic***``, ``**bold**`` and ``*italic*``
+
+    Args:
+        text: Text of one block
+        flags: Flags inherited from an enclosing span
+
+    Returns:
+        Tuple of non-empty spans
+    """
+    if "*" not in text:
+        return (_span((text, flags)),) if text else ()
+
+    # split() yields text, then the three emphasis groups of each match
+    parts = _INLINE_RE.split(text)
+    spans: List[Span] = []
+    for index in range(0, len(parts) - 1, 4):
+        before, bold_italic, bold, italic = parts[index : index + 4]
+        if before:
+            spans.append(_span((before, flags)))
+        if bold_italic is not None:
+            spans.append(_span((bold_italic, flags | BOLD | ITALIC)))
+        elif bold is None:
+            spans.append(_span((italic, flags | ITALIC)))
+        elif "*" in bold:
+            spans.extend(parse_inlines(bold, flags | BOLD))
+        else:
+            spans.append(_span((bold, flags | BOLD)))
+    if parts[-1]:
+        spans.append(_span((parts[-1], flags)))
+    return tuple(spans)
+
+
+def plain_text(inlines: Inlines) -> str:
+    """Text of a span sequence without formatting"""
+    return "".join(span.text for span in inlines)
+
+
+def _append_table(blocks: List[Block], lines: List[str]) -> None:
+    """Add a table unless its rows were all rule lines"""
+    table = _table(lines)
+    if table.header is not None or table.rows:
+        blocks.append(table)
+
+
+def _table(lines: List[str]) -> Table:
+    """Build a table from consecutive ``|`` rows"""
+    header = None
+    if len(lines) > 1 and _TABLE_RULE_RE.match(lines[1]):
+        header = _cells(lines[0])
+        lines = lines[2:]
+    rows = tuple(_cells(line) for line in lines if not _TABLE_RULE_RE.match(line))
+    return Table(header, rows)
+
+
+def _cells(line: str) -> Tuple[Inlines, ...]:
+    line = line.strip()
+    if line.startswith("|"):
+        line = line[1:]
+    if line.endswith("|") and not line.endswith("\\|"):
+        line = line[:-1]
+    return tuple(
+        parse_inlines(cell.strip().replace("\\|", "|"))
+        for cell in _CELL_SPLIT_RE.split(line)
+    )
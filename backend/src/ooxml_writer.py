@@ -0,0 +1,283 @@
+"""
+OOXML Writer Module
+Fast DOCX output by streaming WordprocessingML into a prebuilt package skeleton
+"""
+
+import io
+import re
+import logging
+import threading
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Union
+from xml.sax.saxutils import escape
+
+from docx.shared import Emu
+
+from src.docx_template import (
+    LIST_LEVELS,
+    STYLE_BODY,
+    STYLE_SECTION,
+    STYLE_SUBSECTION,
+    STYLE_TITLE,
+    DocxBaseTemplate,
+    get_docx_template,
+    list_style,
+)
+from src.markdown_ast import (
+    BOLD,
+    ITALIC,
+    Block,
+    Heading,
+    Inlines,
+    ListItem,
+    SignatureBlock,
+    Table,
+)
+
+logger = logging.getLogger(__name__)
+
+_DOCUMENT_PART = "word/document.xml"
+_FOOTER_PART = "word/footer1.xml"
+_FOOTER_PLACEHOLDER = "@@FOOTER_TEXT@@"
+_WRITE_CHUNK_CHARS = 64 * 1024
+
+_INVALID_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Run properties by span flags
+_RPR = {
+    0: "",
+    BOLD: "<w:rPr><w:b/></w:rPr>",
+    ITALIC: "<w:rPr><w:i/></w:rPr>",
+    BOLD | ITALIC: "<w:rPr><w:b/><w:i/></w:rPr>",
+}
+_TABLE_LOOK = (
+    '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" '
+    'w:noHBand="0" w:noVBand="1" w:val="04A0"/>'
+)
+_SIGNATURE_CELL = (
+    '<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="4320"/></w:tcPr><w:p>'
+    "<w:r><w:rPr><w:b/></w:rPr><w:t>__________________________</w:t><w:br/></w:r>"
+    "<w:r><w:t>Signed by ({party})</w:t><w:br/></w:r>"
+    "<w:r><w:t>Date: _____________</w:t></w:r></w:p></w:tc>"
+)
+_SIGNATURE_BLOCK = (
+    "<w:p/><w:p/><w:tbl><w:tblPr>"
+    '<w:tblW w:type="auto" w:w="0"/><w:tblLayout w:type="fixed"/>'
+    + _TABLE_LOOK
+    + "</w:tblPr>"
+    '<w:tblGrid><w:gridCol w:w="4320"/><w:gridCol w:w="4320"/></w:tblGrid><w:tr>'
+    + _SIGNATURE_CELL.format(party="Party A")
+    + _SIGNATURE_CELL.format(party="Party B")
+    + "</w:tr></w:tbl><w:p/>"
+)
+
+
+class _Skeleton:
+    """Static parts of a DOCX package, prebuilt once"""
+
+    __slots__ = ("package", "document_head", "document_tail", "footer_head", "footer_tail")
+
+    def __init__(self, template: DocxBaseTemplate, with_footer: bool):
+        # Let python-docx produce the package once from the base template, so
+        # styles, numbering and the footer part match the python-docx path
+        doc = template.new_document()
+        if with_footer:
+            doc.sections[0].footer.paragraphs[0].text = _FOOTER_PLACEHOLDER
+        buffer = io.BytesIO()
+        doc.save(buffer)
+
+        source = zipfile.ZipFile(io.BytesIO(buffer.getvalue()))
+        document_xml = source.read(_DOCUMENT_PART).decode("utf-8")
+        body_start = document_xml.index("<w:body>") + len("<w:body>")
+        self.document_head = document_xml[:body_start]
+        self.document_tail = document_xml[document_xml.index("<w:sectPr", body_start):]
+
+        self.footer_head = self.footer_tail = ""
+        if with_footer:
+            footer_xml = source.read(_FOOTER_PART).decode("utf-8")
+            self.footer_head, self.footer_tail = footer_xml.split(_FOOTER_PLACEHOLDER)
+
+        # Static parts are compressed here once; each document only appends
+        # its own document.xml (and footer) to a copy of these bytes
+        package = io.BytesIO()
+        with zipfile.ZipFile(package, "w", zipfile.ZIP_DEFLATED) as target:
+            for info in source.infolist():
+                if info.filename not in (_DOCUMENT_PART, _FOOTER_PART):
+                    target.writestr(info.filename, source.read(info.filename))
+        self.package = package.getvalue()
+
+
+class OOXMLWriter:
+    """Write DOCX files without building the python-docx object model"""
+
+    def __init__(self, template: Optional[DocxBaseTemplate] = None):
+        """
+        Initialize writer (package skeletons are built on first use)
+
+        Args:
+            template: Base template providing the styles (shared one if None)
+        """
+        self.template = template or get_docx_template()
+        pprs = {name: _ppr(style_id) for name, style_id in self.template.style_ids.items()}
+        self._heading_ppr = {1: pprs[STYLE_TITLE], 2: pprs[STYLE_SECTION], 3: pprs[STYLE_SUBSECTION]}
+        self._body_ppr = pprs[STYLE_BODY]
+        self._list_ppr = {
+            (ordered, level): pprs[list_style(ordered, level)]
+            for ordered in (False, True)
+            for level in range(1, LIST_LEVELS + 1)
+        }
+        table_style = self.template.table_style_id
+        self._table_style = f'<w:tblStyle w:val="{table_style}"/>' if table_style else ""
+        self._skeletons: Dict[bool, _Skeleton] = {}
+        self._lock = threading.Lock()
+
+    def _skeleton(self, with_footer: bool) -> _Skeleton:
+        skeleton = self._skeletons.get(with_footer)
+        if skeleton is None:
+            with self._lock:
+                skeleton = self._skeletons.get(with_footer)
+                if skeleton is None:
+                    skeleton = self._skeletons[with_footer] = _Skeleton(
+                        self.template, with_footer
+                    )
+                    logger.info(f"OOXML skeleton built (footer={with_footer})")
+        return skeleton
+
+    def warm(self) -> None:
+        """Build both package skeletons ahead of the first document"""
+        self._skeleton(True)
+        self._skeleton(False)
+
+    def write(
+        self,
+        blocks: List[Block],
+        target: Union[str, Path, BinaryIO],
+        footer_text: Optional[str] = None,
+    ) -> None:
+        """
+        Render a parsed document into a DOCX package
+
+        Args:
+            blocks: Document AST from ``parse_markdown``
+            target: File path or writable binary stream
+            footer_text: Footer line; no footer part when None
+        """
+        skeleton = self._skeleton(footer_text is not None)
+        if isinstance(target, (str, Path)):
+            with open(target, "w+b") as stream:
+                self._write_package(skeleton, blocks, stream, footer_text)
+        else:
+            self._write_package(skeleton, blocks, target, footer_text)
+
+    def _write_package(
+        self,
+        skeleton: _Skeleton,
+        blocks: List[Block],
+        stream: BinaryIO,
+        footer_text: Optional[str],
+    ) -> None:
+        start = stream.tell()
+        stream.write(skeleton.package)
+        stream.seek(start)
+        with zipfile.ZipFile(stream, "a", zipfile.ZIP_DEFLATED) as package:
+            with package.open(_DOCUMENT_PART, "w") as part:
+                pending: List[str] = [skeleton.document_head]
+                size = len(skeleton.document_head)
+                for xml in self._body(blocks):
+                    pending.append(xml)
+                    size += len(xml)
+                    if size >= _WRITE_CHUNK_CHARS:
+                        part.write("".join(pending).encode("utf-8"))
+                        pending, size = [], 0
+                pending.append(skeleton.document_tail)
+                part.write("".join(pending).encode("utf-8"))
+            if footer_text is not None:
+                package.writestr(
+                    _FOOTER_PART,
+                    skeleton.footer_head + _xml_text(footer_text) + skeleton.footer_tail,
+                )
+
+    def _body(self, blocks: List[Block]) -> Iterator[str]:
+        """WordprocessingML for each block (same output as the python-docx path)"""
+        for block in blocks:
+            if isinstance(block, Heading):
+                yield f"<w:p>{self._heading_ppr[block.level]}{_runs(block.inlines)}</w:p>"
+            elif isinstance(block, ListItem):
+                ppr = self._list_ppr[(block.ordered, block.level)]
+                yield f"<w:p>{ppr}{_runs(block.inlines)}</w:p>"
+            elif isinstance(block, Table):
+                yield self._table(block)
+            elif isinstance(block, SignatureBlock):
+                yield _SIGNATURE_BLOCK
+            else:
+                yield f"<w:p>{self._body_ppr}{_runs(block.inlines)}</w:p>"
+
+    def _table(self, table: Table) -> str:
+        rows = list(table.rows)
+        if table.header is not None:
+            rows.insert(0, table.header)
+        if not rows:
+            return ""
+        columns = max(len(row) for row in rows)
+        width = Emu(self.template.text_width // columns).twips
+        cell_open = f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{width}"/></w:tcPr>'
+        parts = [
+            f'<w:tbl><w:tblPr>{self._table_style}<w:tblW w:type="auto" w:w="0"/>',
+            f"{_TABLE_LOOK}</w:tblPr><w:tblGrid>",
+            f'<w:gridCol w:w="{width}"/>' * columns,
+            "</w:tblGrid>",
+        ]
+        for index, row in enumerate(rows):
+            flags = BOLD if index == 0 and table.header is not None else 0
+            parts.append("<w:tr>")
+            for column in range(columns):
+                runs = _runs(row[column], flags) if column < len(row) else ""
+                paragraph = f"<w:p>{runs}</w:p>" if runs else "<w:p/>"
+                parts.append(f"{cell_open}{paragraph}</w:tc>")
+            parts.append("</w:tr>")
+        parts.append("</w:tbl>")
+        return "".join(parts)
+
+
+def _xml_text(text: str) -> str:
+    """Escape text for an XML text node, dropping characters XML forbids"""
+    return escape(_INVALID_XML_RE.sub("", text))
+
+
+def _ppr(style_id: str) -> str:
+    return f'<w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>'
+
+
+def _runs(inlines: Inlines, flags: int = 0) -> str:
+    return "".join(_run(span.text, _RPR[span.flags | flags]) for span in inlines)
+
+
+def _run(text: str, rpr: str = "") -> str:
+    if not text:
+        return ""
+    if "\t" in text:
+        # python-docx writes tabs as <w:tab/> between text nodes
+        return f"<w:r>{rpr}{'<w:tab/>'.join(_text(part) for part in text.split(chr(9)))}</w:r>"
+    return f"<w:r>{rpr}{_text(text)}</w:r>"
+
+
+def _text(text: str) -> str:
+    if not text:
+        return ""
+    space = ' xml:space="preserve"' if text != text.strip() else ""
+    return f"<w:t{space}>{_xml_text(text)}</w:t>"
+
+
+_writer: Optional[OOXMLWriter] = None
+_writer_lock = threading.Lock()
+
+
+def get_ooxml_writer() -> OOXMLWriter:
+    """Get the process-wide OOXML writer"""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = OOXMLWriter()
+    return _writer
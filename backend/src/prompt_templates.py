@@ -1,16 +1,23 @@
 """
 Prompt Templates for Legal Document Generation
-Contains structured prompts for different document types
+Prompt rendering for the document types in the template registry
 """
 
-from typing import Dict, List, Optional
+from string import Formatter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
 
+_FORMATTER = Formatter()
+
 
 class PromptTemplate:
-    """Base prompt template class"""
+    """Prompt template compiled into literal text and variable slots
+
+    The template is parsed once; rendering fills the slots and joins the
+    pieces, without re-parsing the format string for every request.
+    """
 
     def __init__(self, name: str, template: str, variables: List[str]):
         """
@@ -20,369 +27,122 @@ class PromptTemplate:
             name: Template name
             template: Template string with {variable} placeholders
             variables: List of required variables
+            
+        Raises:
+            ValueError: If the placeholders do not match ``variables`` or use
+                unsupported format syntax
         """
         self.name = name
         self.template = template
         self.variables = variables
 
+        parts: List[str] = []
+        slots: List[Tuple[int, str]] = []
+        try:
+            parsed = list(_FORMATTER.parse(template))
+        except ValueError as e:
+            raise ValueError(f"Prompt template '{name}' is malformed: {str(e)}")
+        for literal, field, format_spec, conversion in parsed:
+            if literal:
+                parts.append(literal)
+            if field is None:
+                continue
+            if not field.isidentifier() or format_spec or conversion:
+                raise ValueError(
+                    f"Prompt template '{name}' has an unsupported placeholder: "
+                    f"{{{field}{'!' + conversion if conversion else ''}"
+                    f"{':' + format_spec if format_spec else ''}}}"
+                )
+            slots.append((len(parts), field))
+            parts.append("")
+
+        placeholders = {field for _, field in slots}
+        undeclared = sorted(placeholders - set(variables))
+        unused = sorted(set(variables) - placeholders)
+        if undeclared or unused:
+            problems = []
+            if undeclared:
+                problems.append(f"undeclared placeholders: {', '.join(undeclared)}")
+            if unused:
+                problems.append(f"declared variables not in template: {', '.join(unused)}")
+            raise ValueError(f"Prompt template '{name}' {'; '.join(problems)}")
+
+        self._parts = parts
+        self._slots = tuple(slots)
+        self._required = frozenset(placeholders)
+
     def format(self, **kwargs) -> str:
         """
         Format template with variables
         
         Args:
-            **kwargs: Variable values
+            **kwargs: Variable values (extra values are ignored)
             
         Returns:
             Formatted prompt string
+            
+        Raises:
+            ValueError: If required variables are missing
         """
-        return self.template.format(**kwargs)
+        return self.render(kwargs)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """
+        Render the template from a mapping of variable values
+        
+        Args:
+            values: Variable values (extra values are ignored)
+            
+        Returns:
+            Formatted prompt string
+            
+        Raises:
+            ValueError: If required variables are missing
+        """
+        parts = self._parts.copy()
+        try:
+            for index, field in self._slots:
+                parts[index] = str(values[field])
+        except KeyError:
+            missing = sorted(self._required - values.keys())
+            raise ValueError(
+                f"Missing variables for {self.name} prompt: {', '.join(missing)}"
+            )
+        return "".join(parts)
+
+    def render_many(self, rows: Iterable[Mapping[str, Any]]) -> List[str]:
+        """
+        Render the template for a batch of variable mappings
+        
+        Args:
+            rows: One mapping of variable values per prompt
+            
+        Returns:
+            Formatted prompts in input order
+        """
+        return [self.render(values) for values in rows]
 
 
 class LegalPromptTemplates:
     """Collection of legal document prompt templates"""
 
-    def __init__(self):
-        """Initialize prompt templates"""
-        self.templates = self._initialize_templates()
-        logger.info("Legal prompt templates initialized")
-
-    def _initialize_templates(self) -> Dict[str, PromptTemplate]:
-        """Initialize all prompt templates"""
-
-        return {
-            "loan_agreement": PromptTemplate(
-                name="Loan Agreement",
-                template="""You are a legal expert drafting a professional Loan Agreement.
-Generate a comprehensive and legally sound Loan Agreement based on the following details.
-
-**IMPORTANT: Output the document in strictly formatted Markdown.**
-- Use `# Title` for the main document title.
-- Use `## Section Name` for all major section headings (e.g., 1. Definitions).
-- Use `### Subsection Name` for sub-clauses if needed.
-- Use `**Bold**` for defined terms or emphasis.
-- Use standard paragraphs for text.
-- Use `[SIGNATURE_BLOCK]` as a placeholder where signatures should go.
-
-**Details:**
-- Lender Name: {lender_name}
-- Borrower Name: {borrower_name}
-- Loan Amount: {loan_amount}
-- Currency: {currency}
-- Interest Rate: {interest_rate}%
-- Tenure: {tenure} months
-- Repayment Frequency: {repayment_frequency}
-- Date of Agreement: {date}
-- Jurisdiction: {jurisdiction}
-- Additional Details: {additional_details}
-
-**Required Sections:**
-1. Title and Parties
-2. Definitions and Interpretations
-3. Loan Terms (Amount, Purpose, Disbursement)
-4. Interest Rate and Calculation
-5. Repayment Schedule and Amount
-6. Payment Terms and Methods
-7. Default Conditions and Remedies
-8. Prepayment Options
-9. Representations and Warranties
-10. Indemnification
-11. Termination Clause
-12. Governing Law and Jurisdiction
-13. Dispute Resolution
-14. Signature Block
-
-Ensure the document is formal, legally accurate, and includes all necessary clauses.""",
-                variables=[
-                    "lender_name",
-                    "borrower_name",
-                    "loan_amount",
-                    "currency",
-                    "interest_rate",
-                    "tenure",
-                    "repayment_frequency",
-                    "date",
-                    "jurisdiction",
-                    "additional_details",
-                ],
-            ),
-            "rental_agreement": PromptTemplate(
-                name="Rental Agreement",
-                template="""You are a legal expert drafting a professional Rental Agreement.
-Generate a comprehensive and legally sound Rental Agreement based on the following details.
-
-**IMPORTANT: Output the document in strictly formatted Markdown.**
-- Use `# Title` for the main document title.
-- Use `## Section Name` for all major section headings.
-- Use `**Bold**` for emphasis.
-- Use `[SIGNATURE_BLOCK]` for signatures.
-
-**Details:**
-- Landlord Name: {landlord_name}
-- Tenant Name: {tenant_name}
-- Property Address: {property_address}
-- Property Type: {property_type}
-- Rent Amount: {rent_amount}
-- Currency: {currency}
-- Lease Duration: {lease_duration} months
-- Deposit Amount: {deposit_amount}
-- Lease Start Date: {start_date}
-- Jurisdiction: {jurisdiction}
-- Additional Details: {additional_details}
-
-**Required Sections:**
-1. Parties and Property Description
-2. Term of Lease
-3. Rent Payment Terms
-4. Security Deposit
-5. Maintenance and Repairs
-6. Utilities and Services
-7. Tenant Obligations
-8. Landlord Obligations
-9. Entry Rights
-10. Alterations to Property
-11. Termination Clause
-12. Eviction Conditions
-13. Renewal Terms
-14. Governing Law and Jurisdiction
-15. Dispute Resolution
-16. Signature Blocks""",
-                variables=[
-                    "landlord_name",
-                    "tenant_name",
-                    "property_address",
-                    "property_type",
-                    "rent_amount",
-                    "currency",
-                    "lease_duration",
-                    "deposit_amount",
-                    "start_date",
-                    "jurisdiction",
-                    "additional_details",
-                ],
-            ),
-            "nda": PromptTemplate(
-                name="Non-Disclosure Agreement",
-                template="""You are a legal expert drafting a professional Non-Disclosure Agreement. 
-Generate a comprehensive and legally sound NDA based on the following details:
-
-Disclosing Party: {disclosing_party}
-Receiving Party: {receiving_party}
-Purpose of Disclosure: {purpose}
-Confidential Information Type: {info_type}
-Term Duration: {term_duration} months
-Jurisdiction: {jurisdiction}
-
-Additional Details: {additional_details}
-
-Generate the document with the following sections:
-1. Title and Parties
-2. Definitions (Confidential Information, Disclosing Party, Receiving Party)
-3. Scope of Confidential Information
-4. Obligations of Receiving Party
-5. Exclusions from Confidential Information
-6. Term and Duration
-7. Return or Destruction of Information
-8. No License or Rights
-9. No Obligation to Disclose
-10. Remedies and Injunctive Relief
-11. Indemnification
-12. Governing Law and Jurisdiction
-13. Entire Agreement
-14. Amendment and Severability
-15. Signature Block
-
-Ensure the document is legally robust and protects sensitive information.""",
-                variables=[
-                    "disclosing_party",
-                    "receiving_party",
-                    "purpose",
-                    "info_type",
-                    "term_duration",
-                    "jurisdiction",
-                    "additional_details",
-                ],
-            ),
-            "service_agreement": PromptTemplate(
-                name="Service Agreement",
-                template="""You are a legal expert drafting a professional Service Agreement. 
-Generate a comprehensive and legally sound Service Agreement based on the following details:
-
-Service Provider: {service_provider}
-Service Client: {service_client}
-Service Description: {service_description}
-Service Fees: {service_fees}
-Currency: {currency}
-Payment Schedule: {payment_schedule}
-Term Duration: {term_duration} months
-Jurisdiction: {jurisdiction}
-
-Additional Details: {additional_details}
-
-Generate the document with the following sections:
-1. Parties and Effective Date
-2. Scope of Services
-3. Service Delivery Timeline and Milestones
-4. Fees and Payment Terms
-5. Payment Methods and Schedule
-6. Intellectual Property Rights
-7. Confidentiality
-8. Representations and Warranties
-9. Limitation of Liability
-10. Indemnification
-11. Insurance Requirements
-12. Term and Termination
-13. Post-Termination Obligations
-14. Dispute Resolution
-15. Governing Law and Jurisdiction
-16. Signature Block
-
-Ensure the document clearly defines services, responsibilities, and payment terms.""",
-                variables=[
-                    "service_provider",
-                    "service_client",
-                    "service_description",
-                    "service_fees",
-                    "currency",
-                    "payment_schedule",
-                    "term_duration",
-                    "jurisdiction",
-                    "additional_details",
-                ],
-            ),
-            "employment_contract": PromptTemplate(
-                name="Employment Contract",
-                template="""You are a legal expert drafting a professional Employment Contract. 
-Generate a comprehensive and legally sound Employment Contract based on the following details:
-
-Employee Name: {employee_name}
-Employer Name: {employer_name}
-Position: {position}
-Department: {department}
-Salary: {salary}
-Currency: {currency}
-Employment Type: {employment_type}
-Start Date: {start_date}
-Jurisdiction: {jurisdiction}
-
-Additional Details: {additional_details}
-
-Generate the document with the following sections:
-1. Parties and Effective Date
-2. Position and Responsibilities
-3. Reporting Structure
-4. Compensation and Benefits
-5. Working Hours and Leave Policy
-6. Confidentiality and Non-Disclosure
-7. Non-Compete and Non-Solicitation
-8. Intellectual Property Rights
-9. Performance Standards
-10. Termination Clause (Notice Period, Severance)
-11. Grounds for Immediate Termination
-12. Post-Employment Obligations
-13. Dispute Resolution
-14. Governing Law and Jurisdiction
-15. Entire Agreement
-16. Signature Block
-
-Ensure the document is comprehensive and protects both employer and employee interests.""",
-                variables=[
-                    "employee_name",
-                    "employer_name",
-                    "position",
-                    "department",
-                    "salary",
-                    "currency",
-                    "employment_type",
-                    "start_date",
-                    "jurisdiction",
-                    "additional_details",
-                ],
-            ),
-            "partnership_deed": PromptTemplate(
-                name="Partnership Deed",
-                template="""You are a legal expert drafting a professional Partnership Deed. 
-Generate a comprehensive and legally sound Partnership Deed based on the following details:
-
-Partner Names: {partner_names}
-Business Name: {business_name}
-Business Description: {business_description}
-Principal Place of Business: {place_of_business}
-Capital Contributions: {capital_contributions}
-Profit Sharing Ratio: {profit_sharing_ratio}
-Management Rights: {management_rights}
-Jurisdiction: {jurisdiction}
-
-Additional Details: {additional_details}
-
-Generate the document with the following sections:
-1. Parties and Agreement Date
-2. Name and Commencement of Partnership
-3. Principal Place of Business
-4. Nature and Objects of Partnership
-5. Capital Contribution and Loans
-6. Profit and Loss Sharing
-7. Management and Decision Making
-8. Rights and Duties of Partners
-9. Restrictions on Partners
-10. Banking and Accounts
-11. Admission of New Partners
-12. Retirement and Expulsion
-13. Dissolution and Winding Up
-14. Dispute Resolution
-15. Governing Law and Jurisdiction
-16. Signature Block
-
-Ensure the document is legally comprehensive and covers all aspects of partnership operation.""",
-                variables=[
-                    "partner_names",
-                    "business_name",
-                    "business_description",
-                    "place_of_business",
-                    "capital_contributions",
-                    "profit_sharing_ratio",
-                    "management_rights",
-                    "jurisdiction",
-                    "additional_details",
-                ],
-            ),
-            "affidavit": PromptTemplate(
-                name="Affidavit",
-                template="""You are a legal expert drafting a professional Affidavit. 
-Generate a comprehensive and legally sound Affidavit based on the following details:
-
-Affiant Name: {affiant_name}
-Affiant Address: {affiant_address}
-Date: {date}
-Purpose of Affidavit: {purpose}
-Statement Content: {statement_content}
-Jurisdiction: {jurisdiction}
-
-Additional Details: {additional_details}
+    def __init__(self, registry=None):
+        """
+        Initialize prompt templates
+        
+        Args:
+            registry: Template registry (the shared registry by default)
+        """
+        # Imported here: the registry compiles PromptTemplate objects
+        from src.template_registry import get_template_registry
 
-Generate the document with the following sections:
-1. Title (IN THE COURT OF...)
-2. Affiant Details (Name, Address, Occupation)
-3. Sworn Statement Declaration
-4. Facts and Statements (Numbered paragraphs)
-5. Belief and Knowledge Statement
-6. Certification
-7. Jurat (Oath/Affirmation)
-8. Signature of Affiant
-9. Witness/Notary Details
-10. Notary Seal and Signature
+        self.registry = registry or get_template_registry()
+        logger.info("Legal prompt templates initialized")
 
-Ensure the document follows legal affidavit format and is suitable for court filing.""",
-                variables=[
-                    "affiant_name",
-                    "affiant_address",
-                    "date",
-                    "purpose",
-                    "statement_content",
-                    "jurisdiction",
-                    "additional_details",
-                ],
-            ),
-        }
+    @property
+    def templates(self) -> Mapping[str, PromptTemplate]:
+        """Prompt templates of the current registry snapshot"""
+        return self.registry.snapshot.prompts
 
     def get_template(self, doc_type: str) -> Optional[PromptTemplate]:
         """
@@ -418,6 +178,35 @@ Ensure the document follows legal affidavit format and is suitable for court fil
         return template.format(**kwargs)
 
 
-def get_prompt_templates() -> LegalPromptTemplates:
+def format_reference_clauses(clauses: Dict[str, List[Dict]]) -> str:
+    """
+    Render retrieved clauses as a prompt block
+    
+    Args:
+        clauses: Mapping of section key to clause dictionaries
+        
+    Returns:
+        Markdown block to append to a prompt, or an empty string
+    """
+    if not clauses:
+        return ""
+
+    lines = [
+        "",
+        "**Reference Clauses:**",
+        "Vetted clause language for this document type. Adapt these clauses to the "
+        "details above instead of drafting those sections from scratch, and keep "
+        "them concise.",
+    ]
+    for section, section_clauses in clauses.items():
+        for clause in section_clauses:
+            heading = section.replace("_", " ").title()
+            lines.append("")
+            lines.append(f"### {heading} - {clause['title']}")
+            lines.append(clause["text"])
+    return "\n".join(lines)
+
+
+def get_prompt_templates(registry=None) -> LegalPromptTemplates:
     """Get prompt templates instance"""
-    return LegalPromptTemplates()
+    return LegalPromptTemplates(registry)
@@ -3,180 +3,43 @@ RAG (Retrieval-Augmented Generation) Pipeline
 Handles legal document templates and retrieval
 """
 
+import os
+import time
 import logging
 import json
-from typing import Dict, List, Optional
+from typing import Dict, List, Mapping, Optional, Tuple
 from pathlib import Path
 
+from src.clause_index import Clause, ClauseIndex, DEFAULT_CORPUS_DIR
+from src.vector_index import ClauseVectorSearch, DEFAULT_INDEX_DIR
+from src.doc_classifier import DocumentTypeClassifier
+from src.template_registry import TemplateRegistry, get_template_registry
+
 logger = logging.getLogger(__name__)
 
+CLAUSE_TOP_K = int(os.getenv("CLAUSE_TOP_K", "2"))
+CLAUSE_RETRIEVAL_BUDGET_MS = float(os.getenv("CLAUSE_RETRIEVAL_BUDGET_MS", "25"))
 
-class LegalTemplateDatabase:
-    """In-memory database of legal document templates"""
 
-    def __init__(self):
-        """Initialize template database"""
-        self.templates = self._load_templates()
-        logger.info(f"Loaded {len(self.templates)} document templates")
+class LegalTemplateDatabase:
+    """Read-only view of document templates in the template registry"""
 
-    def _load_templates(self) -> Dict[str, Dict]:
+    def __init__(self, registry: Optional[TemplateRegistry] = None):
         """
-        Load legal document templates
+        Initialize template database
         
-        Returns:
-            Dictionary of document templates
+        Args:
+            registry: Template registry (the shared registry by default)
         """
-        return {
-            "loan_agreement": {
-                "type": "Loan Agreement",
-                "sections": [
-                    "parties",
-                    "loan_terms",
-                    "interest_rate",
-                    "repayment_schedule",
-                    "default_conditions",
-                    "prepayment",
-                    "governing_law",
-                    "signatures",
-                ],
-                "key_elements": [
-                    "loan_amount",
-                    "interest_rate",
-                    "tenure",
-                    "repayment_frequency",
-                    "lender_name",
-                    "borrower_name",
-                    "date",
-                ],
-            },
-            "rental_agreement": {
-                "type": "Rental Agreement",
-                "sections": [
-                    "parties",
-                    "property_description",
-                    "rental_terms",
-                    "rent_amount",
-                    "deposit",
-                    "maintenance",
-                    "termination",
-                    "governing_law",
-                    "signatures",
-                ],
-                "key_elements": [
-                    "property_address",
-                    "rent_amount",
-                    "lease_duration",
-                    "landlord_name",
-                    "tenant_name",
-                    "deposit_amount",
-                ],
-            },
-            "nda": {
-                "type": "Non-Disclosure Agreement",
-                "sections": [
-                    "parties",
-                    "definitions",
-                    "confidential_information",
-                    "obligations",
-                    "exclusions",
-                    "term",
-                    "return_of_information",
-                    "governing_law",
-                    "signatures",
-                ],
-                "key_elements": [
-                    "parties_names",
-                    "purpose",
-                    "term_months",
-                    "jurisdiction",
-                ],
-            },
-            "service_agreement": {
-                "type": "Service Agreement",
-                "sections": [
-                    "parties",
-                    "scope_of_services",
-                    "terms",
-                    "fees",
-                    "payment_terms",
-                    "intellectual_property",
-                    "termination",
-                    "governing_law",
-                    "signatures",
-                ],
-                "key_elements": [
-                    "service_provider",
-                    "service_client",
-                    "service_description",
-                    "fees",
-                    "payment_schedule",
-                ],
-            },
-            "employment_contract": {
-                "type": "Employment Contract",
-                "sections": [
-                    "parties",
-                    "position_details",
-                    "responsibilities",
-                    "compensation",
-                    "benefits",
-                    "term",
-                    "confidentiality",
-                    "termination",
-                    "governing_law",
-                    "signatures",
-                ],
-                "key_elements": [
-                    "employee_name",
-                    "employer_name",
-                    "position",
-                    "salary",
-                    "start_date",
-                    "employment_type",
-                ],
-            },
-            "partnership_deed": {
-                "type": "Partnership Deed",
-                "sections": [
-                    "parties",
-                    "name_of_partnership",
-                    "principal_place_of_business",
-                    "nature_of_business",
-                    "capital_contribution",
-                    "profit_sharing",
-                    "management",
-                    "dissolution",
-                    "governing_law",
-                    "signatures",
-                ],
-                "key_elements": [
-                    "partner_names",
-                    "business_name",
-                    "business_description",
-                    "capital_contributions",
-                    "profit_sharing_ratio",
-                ],
-            },
-            "affidavit": {
-                "type": "Affidavit",
-                "sections": [
-                    "title",
-                    "affiant_details",
-                    "statement_of_facts",
-                    "certification",
-                    "jurat",
-                    "signature",
-                ],
-                "key_elements": [
-                    "affiant_name",
-                    "affiant_address",
-                    "statement_content",
-                    "date",
-                ],
-            },
-        }
+        self.registry = registry or get_template_registry()
+        logger.info(f"Loaded {len(self.templates)} document templates")
+
+    @property
+    def templates(self) -> Mapping[str, Mapping]:
+        """Templates of the current registry snapshot"""
+        return self.registry.snapshot.templates
 
-    def get_template(self, doc_type: str) -> Optional[Dict]:
+    def get_template(self, doc_type: str) -> Optional[Mapping]:
         """
         Retrieve template for a document type
         
@@ -221,11 +84,32 @@ class LegalTemplateDatabase:
 class RAGPipeline:
     """RAG pipeline for legal document generation"""
 
-    def __init__(self):
-        """Initialize RAG pipeline"""
-        self.template_db = LegalTemplateDatabase()
+    def __init__(
+        self,
+        clause_corpus_dir: str = DEFAULT_CORPUS_DIR,
+        clause_vector_dir: str = DEFAULT_INDEX_DIR,
+        registry: Optional[TemplateRegistry] = None,
+    ):
+        """
+        Initialize RAG pipeline
+        
+        Args:
+            clause_corpus_dir: Directory of vetted clauses to index
+            clause_vector_dir: Directory of the memory-mapped clause vectors
+            registry: Template registry (the shared registry by default)
+        """
+        self.template_db = LegalTemplateDatabase(registry)
+        self.clause_index = ClauseIndex.from_directory(clause_corpus_dir)
+        self.clause_vectors = ClauseVectorSearch.load(
+            self.clause_index.clauses, clause_vector_dir
+        )
         logger.info("RAG Pipeline initialized")
 
+    @property
+    def classifier(self) -> DocumentTypeClassifier:
+        """Document type classifier compiled for the current registry snapshot"""
+        return self.template_db.registry.snapshot.classifier
+
     def identify_document_type(self, prompt: str) -> Optional[str]:
         """
         Identify document type from user prompt
@@ -236,25 +120,29 @@ class RAGPipeline:
         Returns:
             Document type key or None
         """
-        prompt_lower = prompt.lower()
-        keywords = {
-            "loan_agreement": ["loan", "lender", "borrower"],
-            "rental_agreement": ["rental", "lease", "tenant", "landlord"],
-            "nda": ["confidential", "nda", "non-disclosure"],
-            "service_agreement": ["service", "provider", "client"],
-            "employment_contract": ["employment", "employee", "hired", "job"],
-            "partnership_deed": ["partnership", "partner", "business"],
-            "affidavit": ["affidavit", "sworn", "statement"],
-        }
-
-        for doc_type, keywords_list in keywords.items():
-            if any(kw in prompt_lower for kw in keywords_list):
-                return doc_type
+        prediction = self.classifier.predict(prompt)
+        if prediction:
+            doc_type, confidence = prediction
+            logger.info(f"Classified prompt as {doc_type} (confidence {confidence})")
+            return doc_type
 
         # Default to searching templates
         searches = self.template_db.search_templates(prompt)
         return searches[0] if searches else None
 
+    def identify_document_types(self, prompt: str, k: int = 3) -> List[Tuple[str, float]]:
+        """
+        Rank candidate document types for a prompt
+        
+        Args:
+            prompt: User prompt
+            k: Number of candidates
+            
+        Returns:
+            List of (document type, confidence), best first
+        """
+        return self.classifier.top_k(prompt, k)
+
     def retrieve_relevant_context(
         self, prompt: str, doc_type: str
     ) -> Dict[str, any]:
@@ -279,11 +167,76 @@ class RAGPipeline:
             "sections": template.get("sections", []),
             "key_elements": template.get("key_elements", []),
             "user_prompt": prompt,
+            "clauses": self.retrieve_clauses(prompt, doc_type),
         }
 
         logger.info(f"Retrieved context for document type: {doc_type}")
         return context
 
+    def retrieve_clauses(
+        self,
+        prompt: str,
+        doc_type: str,
+        k: int = CLAUSE_TOP_K,
+        budget_ms: float = CLAUSE_RETRIEVAL_BUDGET_MS,
+    ) -> Dict[str, List[Dict]]:
+        """
+        Retrieve the best vetted clauses for each section of a document type
+        
+        Sections are searched in template order; once the latency budget is
+        spent, the remaining sections get no clauses.
+        
+        Args:
+            prompt: User prompt (the BM25 query)
+            doc_type: Document type
+            k: Clauses per section
+            budget_ms: Total retrieval budget in milliseconds
+            
+        Returns:
+            Mapping of section key to clause dictionaries with scores
+        """
+        template = self.template_db.get_template(doc_type)
+        if not template or not len(self.clause_index):
+            return {}
+
+        started = time.perf_counter()
+        deadline = started + budget_ms / 1000
+        clauses: Dict[str, List[Dict]] = {}
+        for section in template.get("sections", []):
+            if time.perf_counter() > deadline:
+                logger.warning(f"Clause retrieval budget spent before section: {section}")
+                break
+            results = self.clause_index.search(
+                prompt, k=k, doc_type=doc_type, section=section, deadline=deadline
+            )
+            if results:
+                clauses[section] = [
+                    {**clause.to_dict(), "score": score} for clause, score in results
+                ]
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"Retrieved {sum(map(len, clauses.values()))} clauses for {doc_type} "
+            f"in {elapsed_ms:.2f}ms"
+        )
+        return clauses
+
+    def find_similar_clauses(
+        self, texts: List[str], k: int = 5, doc_type: Optional[str] = None
+    ) -> List[List[Tuple[Clause, float]]]:
+        """
+        Embedding similarity search over the clause library
+        
+        Args:
+            texts: Query texts, searched as one batch
+            k: Clauses per text
+            doc_type: Only clauses applicable to this document type
+            
+        Returns:
+            Per text, a list of (clause, cosine score), best first
+        """
+        return self.clause_vectors.search(texts, k=k, doc_type=doc_type)
+
     def prepare_rag_context(self, prompt: str) -> Dict[str, any]:
         """
         Full RAG pipeline: identify type and retrieve context
@@ -0,0 +1,430 @@
+"""
+LLM Resilience Module
+Retry with jittered backoff, hedged requests and circuit breaking for LLM calls
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, fields, replace
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple, Type
+
+from src.admission import AdmissionController
+from src.llm_config import LLMBackend, LLMResponse, LLMTransientError
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(LLMTransientError):
+    """Raised when the circuit breaker rejects a call without trying upstream"""
+
+    def __init__(self, doc_type: str, retry_after: float):
+        super().__init__(
+            f"LLM circuit open for {doc_type}; retry in {retry_after:.0f}s"
+        )
+        self.retry_after = retry_after
+
+
+def _retryable_exceptions() -> Tuple[Type[BaseException], ...]:
+    """Exception types that are worth retrying"""
+    retryable = [LLMTransientError, asyncio.TimeoutError, ConnectionError]
+    try:
+        from google.api_core import exceptions as google_exceptions
+
+        retryable.extend(
+            [
+                google_exceptions.TooManyRequests,
+                google_exceptions.ResourceExhausted,
+                google_exceptions.ServiceUnavailable,
+                google_exceptions.DeadlineExceeded,
+                google_exceptions.InternalServerError,
+            ]
+        )
+    except ImportError:
+        pass
+    return tuple(retryable)
+
+
+RETRYABLE_EXCEPTIONS = _retryable_exceptions()
+
+
+@dataclass(frozen=True)
+class ResiliencePolicy:
+    """Retry, hedging and circuit breaker settings for one document type"""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    attempt_timeout: Optional[float] = None
+    hedge: bool = False
+    hedge_quantile: float = 0.95
+    hedge_initial_delay: float = 5.0
+    hedge_min_samples: int = 20
+    breaker_failure_threshold: int = 5
+    breaker_reset_seconds: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "ResiliencePolicy":
+        """Build the default policy from LLM_* environment variables"""
+        timeout = os.getenv("LLM_ATTEMPT_TIMEOUT_SECONDS")
+        return cls(
+            max_attempts=int(os.getenv("LLM_RETRY_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5")),
+            max_delay=float(os.getenv("LLM_RETRY_MAX_DELAY", "8")),
+            attempt_timeout=float(timeout) if timeout else None,
+            hedge=os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true",
+            hedge_quantile=float(os.getenv("LLM_HEDGE_QUANTILE", "0.95")),
+            hedge_initial_delay=float(os.getenv("LLM_HEDGE_INITIAL_DELAY", "5")),
+            breaker_failure_threshold=int(
+                os.getenv("LLM_BREAKER_FAILURE_THRESHOLD", "5")
+            ),
+            breaker_reset_seconds=float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30")),
+        )
+
+    def with_overrides(self, overrides: Dict) -> "ResiliencePolicy":
+        """
+        Copy the policy with some fields replaced
+
+        Args:
+            overrides: Mapping of field name to value
+
+        Returns:
+            New policy instance
+        """
+        known = {f.name for f in fields(self)}
+        unknown = set(overrides) - known
+        if unknown:
+            raise ValueError(f"Unknown resilience settings: {', '.join(sorted(unknown))}")
+        return replace(self, **overrides)
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker with a half-open probe"""
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        """
+        Initialize circuit breaker
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_seconds: Time the circuit stays open before a probe is allowed
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now"""
+        if self.state == "closed":
+            return True
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.reset_seconds:
+                return False
+            self.state = "half_open"
+        if self._probe_in_flight:
+            return False
+        self._probe_in_flight = True
+        return True
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit may accept a probe"""
+        return max(1.0, self.reset_seconds - (time.monotonic() - self.opened_at))
+
+    def release(self) -> None:
+        """
+        End a call that proved nothing about upstream health
+
+        Used for non-retryable errors, cancellation and abandoned streams:
+        the half-open probe slot is freed without closing or reopening the
+        circuit, so the next call can probe.
+        """
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = "closed"
+        self.failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._probe_in_flight = False
+        if self.state == "half_open" or self.failures >= self.failure_threshold:
+            if self.state != "open":
+                self.opens += 1
+                logger.warning(f"LLM circuit opened after {self.failures} failures")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+
+class _TypeState:
+    """Per-document-type breaker, latency window and counters"""
+
+    def __init__(self, policy: ResiliencePolicy):
+        self.policy = policy
+        self.breaker = CircuitBreaker(
+            policy.breaker_failure_threshold, policy.breaker_reset_seconds
+        )
+        self.latencies: Deque[float] = deque(maxlen=200)
+        self.counters = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "retries": 0,
+            "hedges": 0,
+            "hedge_wins": 0,
+            "hedges_skipped": 0,
+            "short_circuits": 0,
+        }
+
+    def latency_quantile(self, quantile: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+
+class ResilientLLM:
+    """Wraps LLM backend calls with retry, hedging and circuit breaking"""
+
+    def __init__(
+        self,
+        default_policy: Optional[ResiliencePolicy] = None,
+        overrides: Optional[Dict[str, Dict]] = None,
+        admission: Optional[AdmissionController] = None,
+    ):
+        """
+        Initialize resilience layer
+
+        Args:
+            default_policy: Policy applied to every document type
+            overrides: Per-document-type field overrides of the default policy
+            admission: Controller a hedge must take its own free slot from
+        """
+        self.default_policy = default_policy or ResiliencePolicy()
+        self.policies = {
+            doc_type: self.default_policy.with_overrides(values)
+            for doc_type, values in (overrides or {}).items()
+        }
+        self._admission = admission
+        self._states: Dict[str, _TypeState] = {}
+        self._rng = random.Random()
+
+    @classmethod
+    def from_env(
+        cls, admission: Optional[AdmissionController] = None
+    ) -> "ResilientLLM":
+        """Create the resilience layer from environment configuration"""
+        overrides = os.getenv("LLM_RESILIENCE_OVERRIDES")
+        return cls(
+            ResiliencePolicy.from_env(),
+            json.loads(overrides) if overrides else None,
+            admission,
+        )
+
+    def policy_for(self, doc_type: str) -> ResiliencePolicy:
+        """Resolve the policy for a document type"""
+        return self.policies.get(doc_type, self.default_policy)
+
+    def _state(self, doc_type: str) -> _TypeState:
+        state = self._states.get(doc_type)
+        if state is None:
+            state = self._states[doc_type] = _TypeState(self.policy_for(doc_type))
+        return state
+
+    async def ainvoke(self, llm: LLMBackend, prompt: str, doc_type: str) -> LLMResponse:
+        """
+        Invoke the LLM with the document type's resilience policy
+
+        Args:
+            llm: LLM backend
+            prompt: Formatted prompt
+            doc_type: Document type selecting the policy
+
+        Returns:
+            LLM response
+        """
+        state = self._state(doc_type)
+        policy = state.policy
+        state.counters["calls"] += 1
+
+        for attempt in range(1, policy.max_attempts + 1):
+            self._check_breaker(state, doc_type)
+            started = time.monotonic()
+            try:
+                if policy.hedge:
+                    response = await self._hedged_call(llm, prompt, state)
+                else:
+                    response = await self._attempt(llm, prompt, policy)
+            except RETRYABLE_EXCEPTIONS as e:
+                state.breaker.record_failure()
+                if attempt == policy.max_attempts:
+                    state.counters["failures"] += 1
+                    raise
+                delay = self._backoff(policy, attempt)
+                state.counters["retries"] += 1
+                logger.warning(
+                    f"LLM attempt {attempt} for {doc_type} failed ({e}); "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                state.breaker.release()
+                state.counters["failures"] += 1
+                raise
+            except BaseException:
+                # Cancelled: free the probe slot, or the circuit never closes
+                state.breaker.release()
+                raise
+
+            state.breaker.record_success()
+            state.latencies.append(time.monotonic() - started)
+            state.counters["successes"] += 1
+            return response
+
+    async def astream(
+        self, llm: LLMBackend, prompt: str, doc_type: str
+    ) -> AsyncIterator[str]:
+        """
+        Stream LLM output, retrying only failures before the first chunk
+
+        Args:
+            llm: LLM backend
+            prompt: Formatted prompt
+            doc_type: Document type selecting the policy
+
+        Yields:
+            Text chunks
+        """
+        state = self._state(doc_type)
+        policy = state.policy
+        state.counters["calls"] += 1
+
+        for attempt in range(1, policy.max_attempts + 1):
+            self._check_breaker(state, doc_type)
+            started = time.monotonic()
+            emitted = False
+            try:
+                async for text in llm.astream(prompt):
+                    emitted = True
+                    yield text
+            except RETRYABLE_EXCEPTIONS as e:
+                state.breaker.record_failure()
+                if emitted or attempt == policy.max_attempts:
+                    state.counters["failures"] += 1
+                    raise
+                delay = self._backoff(policy, attempt)
+                state.counters["retries"] += 1
+                logger.warning(
+                    f"LLM stream attempt {attempt} for {doc_type} failed ({e}); "
+                    f"retrying in {delay:.2f}s"
+                )
+                await asyncio.sleep(delay)
+                continue
+            except Exception:
+                state.breaker.release()
+                state.counters["failures"] += 1
+                raise
+            except BaseException:
+                # Cancelled or closed by a disconnected client (GeneratorExit)
+                state.breaker.release()
+                raise
+
+            state.breaker.record_success()
+            state.latencies.append(time.monotonic() - started)
+            state.counters["successes"] += 1
+            return
+
+    def _check_breaker(self, state: _TypeState, doc_type: str) -> None:
+        if not state.breaker.allow():
+            state.counters["short_circuits"] += 1
+            raise CircuitOpenError(doc_type, state.breaker.retry_after())
+
+    async def _attempt(
+        self, llm: LLMBackend, prompt: str, policy: ResiliencePolicy
+    ) -> LLMResponse:
+        if policy.attempt_timeout:
+            return await asyncio.wait_for(llm.ainvoke(prompt), policy.attempt_timeout)
+        return await llm.ainvoke(prompt)
+
+    async def _hedged_call(
+        self, llm: LLMBackend, prompt: str, state: _TypeState
+    ) -> LLMResponse:
+        """
+        Fire a backup request once the primary exceeds the hedge delay
+
+        The caller's admission slot covers the primary only. The hedge is a
+        second upstream request, so it takes a free admission slot of its own
+        and is skipped rather than queued when none is available.
+        """
+        policy = state.policy
+        primary = asyncio.ensure_future(self._attempt(llm, prompt, policy))
+        pending = {primary}
+        hedge = None
+        error: Optional[BaseException] = None
+        try:
+            done, pending = await asyncio.wait(
+                pending, timeout=self._hedge_delay(state)
+            )
+            if not done:
+                if self._admission is None or self._admission.try_acquire():
+                    state.counters["hedges"] += 1
+                    hedge = asyncio.ensure_future(self._attempt(llm, prompt, policy))
+                    if self._admission is not None:
+                        hedge.add_done_callback(lambda _: self._admission.release())
+                    pending.add(hedge)
+                else:
+                    state.counters["hedges_skipped"] += 1
+
+            while True:
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            state.counters["hedge_wins"] += 1
+                        return task.result()
+                    error = task.exception()
+                if not pending:
+                    raise error
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _hedge_delay(self, state: _TypeState) -> float:
+        policy = state.policy
+        if len(state.latencies) < policy.hedge_min_samples:
+            return policy.hedge_initial_delay
+        return state.latency_quantile(policy.hedge_quantile)
+
+    def _backoff(self, policy: ResiliencePolicy, attempt: int) -> float:
+        """Full-jitter exponential backoff"""
+        ceiling = min(policy.max_delay, policy.base_delay * (2 ** (attempt - 1)))
+        return self._rng.uniform(0, ceiling)
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        Get per-document-type resilience metrics
+
+        Returns:
+            Dictionary keyed by document type
+        """
+        stats = {}
+        for doc_type, state in self._states.items():
+            p95 = state.latency_quantile(0.95)
+            stats[doc_type] = {
+                **state.counters,
+                "breaker_state": state.breaker.state,
+                "breaker_opens": state.breaker.opens,
+                "latency_p95_seconds": round(p95, 4) if p95 is not None else None,
+            }
+        return stats
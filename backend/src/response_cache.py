@@ -0,0 +1,251 @@
+"""
+LLM Response Cache Module
+Caches generated content keyed on the rendered prompt and model settings
+"""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Two-tier LLM response cache: in-memory LRU plus optional SQLite store"""
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        db_path: Optional[str] = None,
+        ttl_seconds: int = 86400,
+    ):
+        """
+        Initialize response cache
+
+        Args:
+            max_entries: Maximum entries kept in the in-memory LRU
+            db_path: Path of the SQLite file for the persistent tier (disabled if None)
+            ttl_seconds: Time-to-live for cached entries in both tiers
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        # Guards the LRU and counters; taken inline on the event loop, so it
+        # is never held across SQLite calls, which use their own lock
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0,
+        }
+
+        self._db: Optional[sqlite3.Connection] = None
+        if db_path:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+        logger.info(
+            f"ResponseCache initialized (max_entries={max_entries}, "
+            f"persistent={'yes' if db_path else 'no'}, ttl={ttl_seconds}s)"
+        )
+
+    @staticmethod
+    def make_key(prompt: str, model: str, temperature: float, max_tokens: int) -> str:
+        """
+        Build a cache key for a rendered prompt and generation settings
+
+        Args:
+            prompt: Fully formatted prompt sent to the LLM
+            model: Model name
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens in response
+
+        Returns:
+            Hex digest identifying the request
+        """
+        payload = json.dumps(
+            [prompt, model, float(temperature), int(max_tokens)], ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up cached content
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached content or None on miss/expiry
+        """
+        content = self._get_memory(key)
+        return content if content is not None else self._get_disk(key)
+
+    async def aget(self, key: str) -> Optional[str]:
+        """
+        Look up cached content without blocking the event loop
+
+        The in-memory tier is checked inline; the SQLite tier is read in a
+        worker thread.
+
+        Args:
+            key: Cache key from make_key
+
+        Returns:
+            Cached content or None on miss/expiry
+        """
+        content = self._get_memory(key)
+        if content is not None or self._db is None:
+            return content if content is not None else self._get_disk(key)
+        return await asyncio.to_thread(self._get_disk, key)
+
+    def set(self, key: str, content: str) -> None:
+        """
+        Store content in the cache
+
+        Args:
+            key: Cache key from make_key
+            content: Generated content
+        """
+        created_at = self._set_memory(key, content)
+        self._set_disk(key, content, created_at)
+
+    async def aset(self, key: str, content: str) -> None:
+        """
+        Store content in the cache, writing the SQLite tier in a worker thread
+
+        Args:
+            key: Cache key from make_key
+            content: Generated content
+        """
+        created_at = self._set_memory(key, content)
+        if self._db is not None:
+            await asyncio.to_thread(self._set_disk, key, content, created_at)
+
+    def _get_memory(self, key: str) -> Optional[str]:
+        """Look up the LRU tier, dropping an expired entry"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            content, created_at = entry
+            if now - created_at <= self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return content
+            del self._memory[key]
+            return None
+
+    def _get_disk(self, key: str) -> Optional[str]:
+        """Look up the SQLite tier after a memory miss, counting the miss"""
+        now = time.time()
+        if self._db is not None:
+            with self._db_lock:
+                row = self._db.execute(
+                    "SELECT content, created_at FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] > self.ttl_seconds:
+                    self._db.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._db.commit()
+                    row = None
+            if row is not None:
+                content, created_at = row
+                with self._lock:
+                    self._store_memory(key, content, created_at)
+                    self._counters["disk_hits"] += 1
+                return content
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def _set_memory(self, key: str, content: str) -> float:
+        """Insert into the LRU tier and count the write; returns the entry time"""
+        created_at = time.time()
+        with self._lock:
+            self._store_memory(key, content, created_at)
+            self._counters["writes"] += 1
+        return created_at
+
+    def _set_disk(self, key: str, content: str, created_at: float) -> None:
+        """Write an entry to the SQLite tier, if enabled"""
+        if self._db is None:
+            return
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, content, created_at) "
+                "VALUES (?, ?, ?)",
+                (key, content, created_at),
+            )
+            self._db.commit()
+
+    def _store_memory(self, key: str, content: str, created_at: float) -> None:
+        """Insert into the LRU tier, evicting the oldest entries (lock held)"""
+        self._memory[key] = (content, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def clear(self) -> None:
+        """Remove all entries from both tiers"""
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM llm_cache")
+                self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary of hit/miss counters and sizes
+        """
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+            stats["persistent"] = self._db is not None
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (
+            round((stats["memory_hits"] + stats["disk_hits"]) / lookups, 4)
+            if lookups
+            else 0.0
+        )
+        return stats
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache configured from the environment"""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                _response_cache = ResponseCache(
+                    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")),
+                    db_path=os.getenv("LLM_CACHE_DB") or None,
+                    ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", "86400")),
+                )
+    return _response_cache
@@ -0,0 +1,181 @@
+"""
+Output Retention Module
+Background eviction keeping the document store within a size and age budget
+"""
+
+import os
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from src.document_store import DocumentStore
+
+logger = logging.getLogger(__name__)
+
+# Blobs examined per index query while sweeping
+EVICTION_BATCH = 256
+
+
+class RetentionManager:
+    """Evicts least-recently-downloaded blobs over quota and blobs past max age"""
+
+    def __init__(
+        self,
+        store: DocumentStore,
+        max_bytes: int = 0,
+        max_age_seconds: float = 0,
+        interval_seconds: float = 60,
+    ):
+        """
+        Initialize the manager
+
+        Args:
+            store: Document store to keep within budget
+            max_bytes: Maximum total blob size (0 disables the quota)
+            max_age_seconds: Maximum time since a blob was last stored (0 disables it)
+            interval_seconds: Time between sweeps; a write over quota wakes
+                the sweeper early
+        """
+        if max_bytes < 0 or max_age_seconds < 0:
+            raise ValueError("max_bytes and max_age_seconds cannot be negative")
+        if interval_seconds <= 0:
+            raise ValueError("interval_seconds must be positive")
+        self.store = store
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_seconds
+        self.interval_seconds = interval_seconds
+        self._bytes_used = store.bytes_used()
+        self._sweep_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._sweeper: Optional[threading.Thread] = None
+        self._counters = {
+            "sweeps": 0,
+            "evicted_quota": 0,
+            "evicted_age": 0,
+            "evicted_bytes": 0,
+        }
+        self._last_sweep: Optional[str] = None
+        store.on_write = self._on_write
+
+    @classmethod
+    def from_env(cls, store: DocumentStore) -> "RetentionManager":
+        """Create a manager from OUTPUT_* environment variables"""
+        return cls(
+            store,
+            max_bytes=int(float(os.getenv("OUTPUT_MAX_MB", "1024")) * 1024 * 1024),
+            max_age_seconds=float(os.getenv("OUTPUT_MAX_AGE_DAYS", "30")) * 86400,
+            interval_seconds=float(os.getenv("OUTPUT_RETENTION_INTERVAL_SECONDS", "60")),
+        )
+
+    def start(self) -> None:
+        """Start the background sweeper thread"""
+        if self._sweeper is not None or not (self.max_bytes or self.max_age_seconds):
+            return
+        self._stopping = False
+        self._sweeper = threading.Thread(
+            target=self._run, name="output-retention", daemon=True
+        )
+        self._sweeper.start()
+        logger.info(
+            f"Output retention started (max {self.max_bytes} bytes, "
+            f"max age {self.max_age_seconds}s, every {self.interval_seconds}s)"
+        )
+
+    def stop(self) -> None:
+        """Stop the sweeper thread"""
+        if self._sweeper is None:
+            return
+        self._stopping = True
+        self._wake.set()
+        self._sweeper.join()
+        self._sweeper = None
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval_seconds)
+            self._wake.clear()
+            if self._stopping:
+                return
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.error(f"Output retention error: {str(e)}", exc_info=True)
+
+    def _on_write(self, size: int) -> None:
+        """Track a new blob and wake the sweeper once over quota"""
+        self._bytes_used += size
+        if self.max_bytes and self._bytes_used > self.max_bytes:
+            self._wake.set()
+
+    def sweep(self) -> int:
+        """
+        Evict expired blobs, then least recently used ones until under quota
+
+        Candidates come from the store index, never a directory listing.
+
+        Returns:
+            Number of blobs evicted
+        """
+        with self._sweep_lock:
+            evicted = 0
+            # Blobs stored or downloaded from here on are no longer candidates
+            started = time.time()
+            if self.max_age_seconds:
+                cutoff = datetime.now() - timedelta(seconds=self.max_age_seconds)
+                while True:
+                    expired = self.store.created_before(cutoff, EVICTION_BATCH)
+                    count, freed = self.store.evict(
+                        (digest for digest, _ in expired), stale_before=started
+                    )
+                    self._counters["evicted_age"] += count
+                    self._counters["evicted_bytes"] += freed
+                    evicted += count
+                    # Candidates reused mid-sweep stay indexed; stop instead of re-reading them
+                    if len(expired) < EVICTION_BATCH or not count:
+                        break
+
+            # Re-read the total: worker processes write through their own stores
+            used = self.store.bytes_used()
+            while self.max_bytes and used > self.max_bytes:
+                victims = []
+                for digest, size in self.store.least_recently_used(EVICTION_BATCH):
+                    if used <= self.max_bytes:
+                        break
+                    victims.append(digest)
+                    used -= size
+                if not victims:
+                    break
+                count, freed = self.store.evict(victims, stale_before=started)
+                self._counters["evicted_quota"] += count
+                self._counters["evicted_bytes"] += freed
+                evicted += count
+                if not count:
+                    break
+
+            self._bytes_used = self.store.bytes_used()
+            self._counters["sweeps"] += 1
+            self._last_sweep = datetime.now().isoformat()
+            if evicted:
+                logger.info(
+                    f"Output retention evicted {evicted} blobs, "
+                    f"{self._bytes_used} bytes in use"
+                )
+            return evicted
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get retention metrics
+
+        Returns:
+            Dictionary with limits, bytes in use, eviction counters and last sweep time
+        """
+        return {
+            "max_bytes": self.max_bytes,
+            "max_age_seconds": self.max_age_seconds,
+            "bytes_used": self._bytes_used,
+            **self._counters,
+            "last_sweep": self._last_sweep,
+        }
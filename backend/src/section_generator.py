@@ -0,0 +1,159 @@
+"""
+Section-Parallel Generation Module
+Drafts groups of template sections concurrently and stitches them in order
+"""
+
+import os
+import re
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Tuple
+
+from src.rag_pipeline import LegalTemplateDatabase
+
+logger = logging.getLogger(__name__)
+
+_TITLE_LINE_RE = re.compile(r"^#\s+.*$", re.MULTILINE)
+
+DEFAULT_GROUP_SIZE = int(os.getenv("SECTION_GROUP_SIZE", "3"))
+
+
+class SectionParallelGenerator:
+    """Split a document into section groups drafted by concurrent LLM calls"""
+
+    def __init__(self, template_db: LegalTemplateDatabase):
+        """
+        Initialize section-parallel generator
+
+        Args:
+            template_db: Template database providing ordered section lists
+        """
+        self.template_db = template_db
+
+    def plan(self, doc_type: str, group_size: int = DEFAULT_GROUP_SIZE) -> List[List[str]]:
+        """
+        Split a document type's sections into ordered groups
+
+        Args:
+            doc_type: Document type
+            group_size: Sections per LLM call
+
+        Returns:
+            List of section groups in template order
+        """
+        template = self.template_db.get_template(doc_type)
+        if not template:
+            raise ValueError(f"Template not found for document type: {doc_type}")
+        if group_size < 1:
+            raise ValueError("section_group_size must be at least 1")
+
+        sections = template.get("sections", [])
+        return [sections[i : i + group_size] for i in range(0, len(sections), group_size)]
+
+    def build_section_prompt(
+        self, base_prompt: str, group: List[str], part: int, total: int, first_number: int
+    ) -> str:
+        """
+        Scope the shared document prompt to one group of sections
+
+        The base prompt carries the shared context (parties, amounts and
+        other details), so every part uses the same defined terms.
+
+        Args:
+            base_prompt: Fully formatted document prompt
+            group: Section keys to draft in this part
+            part: 1-based part index
+            total: Number of parts
+            first_number: Number of the first section in this part
+
+        Returns:
+            Prompt for this part
+        """
+        titles = ", ".join(_section_title(section) for section in group)
+        instructions = [
+            "",
+            "**Drafting Scope:**",
+            f"This document is being drafted in {total} parts. Draft ONLY part {part} of {total}, "
+            f"covering these sections in this order: {titles}.",
+            f"Number the `##` section headings starting from {first_number}.",
+            "Use the party names, amounts and defined terms exactly as given above.",
+        ]
+        if part == 1:
+            instructions.append("Begin with the `# Title` and the preamble naming the parties.")
+        else:
+            instructions.append("Do NOT repeat the document title or the preamble.")
+        if part == total:
+            instructions.append("End with `[SIGNATURE_BLOCK]` where signatures should go.")
+        else:
+            instructions.append("Do NOT include signature blocks or closing clauses.")
+
+        return base_prompt + "\n" + "\n".join(instructions)
+
+    async def generate(
+        self,
+        doc_type: str,
+        base_prompt: str,
+        invoke: Callable[[str], Awaitable[Tuple[str, bool]]],
+        group_size: int = DEFAULT_GROUP_SIZE,
+    ) -> Tuple[str, bool]:
+        """
+        Draft all section groups concurrently and stitch them in template order
+
+        Args:
+            doc_type: Document type
+            base_prompt: Fully formatted document prompt
+            invoke: Coroutine generating (content, cached) for a prompt
+            group_size: Sections per LLM call
+
+        Returns:
+            Tuple of (stitched content, whether every part came from cache)
+        """
+        groups = self.plan(doc_type, group_size)
+        prompts = []
+        number = 1
+        for part, group in enumerate(groups, start=1):
+            prompts.append(
+                self.build_section_prompt(base_prompt, group, part, len(groups), number)
+            )
+            number += len(group)
+
+        logger.info(f"Drafting {doc_type} in {len(groups)} parallel section groups")
+        # Unlike gather, stop the other parts as soon as one fails instead of
+        # letting them run on and hold admission slots for a discarded draft
+        tasks = [asyncio.ensure_future(invoke(prompt)) for prompt in prompts]
+        try:
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+        finally:
+            for task in tasks:
+                task.cancel()
+        errors = [
+            task.exception() for task in tasks if task.done() and not task.cancelled()
+        ]
+        for error in errors:
+            if error is not None:
+                raise error
+        results = [task.result() for task in tasks]
+
+        content = self.stitch([text for text, _ in results])
+        return content, all(cached for _, cached in results)
+
+    @staticmethod
+    def stitch(parts: List[str]) -> str:
+        """
+        Join drafted parts, dropping repeated titles after the first part
+
+        Args:
+            parts: Part contents in template order
+
+        Returns:
+            Combined markdown document
+        """
+        stitched = [parts[0].strip()] if parts else []
+        for part in parts[1:]:
+            stitched.append(_TITLE_LINE_RE.sub("", part).strip())
+        return "\n\n".join(p for p in stitched if p)
+
+
+def _section_title(section: str) -> str:
+    """Human-readable title for a section key"""
+    return section.replace("_", " ").title()
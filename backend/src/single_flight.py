@@ -0,0 +1,81 @@
+"""
+Single-Flight Module
+Coalesces concurrent identical work into one shared in-flight task
+"""
+
+import json
+import asyncio
+import hashlib
+import logging
+from typing import Any, Awaitable, Callable, Dict, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Run at most one task per key; concurrent callers share its result"""
+
+    def __init__(self):
+        """Initialize single-flight group"""
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._counters = {"executed": 0, "coalesced": 0}
+
+    @staticmethod
+    def make_key(*parts: Any) -> str:
+        """
+        Build a canonical key from JSON-serializable parts
+
+        Dict keys are sorted so equivalent payloads map to the same key.
+
+        Args:
+            *parts: Values identifying the work
+
+        Returns:
+            Hex digest key
+        """
+        payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run ``fn`` once for ``key`` and share the outcome with concurrent callers
+
+        The work runs in its own task, so a caller that is cancelled (e.g. a
+        disconnected client) does not cancel it for the others.
+
+        Args:
+            key: Work key from make_key
+            fn: Zero-argument coroutine function producing the result
+
+        Returns:
+            Result of the shared task (exceptions propagate to every caller)
+        """
+        task = self._inflight.get(key)
+        if task is not None:
+            self._counters["coalesced"] += 1
+            logger.info(f"Joining in-flight generation {key[:12]}")
+        else:
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            self._counters["executed"] += 1
+            task.add_done_callback(lambda t, k=key: self._finish(k, t))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Forget a completed task and mark its exception as retrieved"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get single-flight counters
+
+        Returns:
+            Dictionary with in-flight, executed and coalesced counts
+        """
+        return {"inflight": len(self._inflight), **self._counters}
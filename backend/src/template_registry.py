@@ -0,0 +1,389 @@
+"""
+Template Registry Module
+Loads per-document-type templates from disk and hot-reloads them on change
+"""
+
+import os
+import re
+import json
+import logging
+import time
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from src.doc_classifier import DocumentTypeClassifier
+from src.prompt_templates import PromptTemplate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TEMPLATE_DIR = os.getenv("TEMPLATE_DIR", "./templates")
+DEFAULT_RELOAD_SECONDS = float(os.getenv("TEMPLATE_RELOAD_SECONDS", "2"))
+
+# Default values equal to this placeholder are replaced with today's date
+TODAY_PLACEHOLDER = "$today"
+
+_DOC_TYPE_RE = re.compile(r"^[a-z0-9_]+$")
+_SPEC_FILE = "document.json"
+_PROMPT_FILE = "prompt.md"
+
+
+@dataclass(frozen=True)
+class DocumentTypeSpec:
+    """Immutable definition of one document type"""
+
+    doc_type: str
+    name: str
+    sections: Tuple[str, ...]
+    key_elements: Tuple[str, ...]
+    variables: Tuple[str, ...]
+    defaults: Mapping[str, str]
+    keywords: Mapping[str, float]
+    prompt: str
+
+
+class RegistrySnapshot:
+    """One compiled, read-only version of the registry
+
+    Every lookup structure derived from the files (template views, prompt
+    templates, defaults, classifier tables) is built once per snapshot, and a reload
+    swaps the whole snapshot at once.
+    """
+
+    __slots__ = (
+        "version",
+        "loaded_at",
+        "signature",
+        "specs",
+        "templates",
+        "prompts",
+        "defaults",
+        "classifier",
+    )
+
+    def __init__(self, version: int, signature: Tuple, specs: Dict[str, DocumentTypeSpec]):
+        self.version = version
+        self.loaded_at = datetime.now().isoformat()
+        self.signature = signature
+        self.specs: Mapping[str, DocumentTypeSpec] = MappingProxyType(dict(specs))
+        self.templates: Mapping[str, Mapping[str, Any]] = MappingProxyType(
+            {
+                doc_type: MappingProxyType(
+                    {
+                        "type": spec.name,
+                        "sections": spec.sections,
+                        "key_elements": spec.key_elements,
+                    }
+                )
+                for doc_type, spec in specs.items()
+            }
+        )
+        self.prompts: Mapping[str, PromptTemplate] = MappingProxyType(
+            {
+                doc_type: PromptTemplate(spec.name, spec.prompt, list(spec.variables))
+                for doc_type, spec in specs.items()
+            }
+        )
+        self.defaults: Mapping[str, TypeDefaults] = MappingProxyType(
+            {doc_type: TypeDefaults(spec.defaults) for doc_type, spec in specs.items()}
+        )
+        self.classifier = DocumentTypeClassifier(
+            {doc_type: spec.keywords for doc_type, spec in specs.items() if spec.keywords}
+        )
+
+
+_today_cache: Tuple[str, float] = ("", 0.0)
+
+
+def today() -> str:
+    """Today's date as YYYY-MM-DD, formatted once per day"""
+    global _today_cache
+    value, expires_at = _today_cache
+    if time.time() >= expires_at:
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        value = now.strftime("%Y-%m-%d")
+        _today_cache = (value, midnight.timestamp())
+    return value
+
+
+def coerce_details(details: Mapping[str, Any]) -> Dict[str, str]:
+    """
+    Convert user-provided details to template strings
+
+    ``None`` values are dropped so the default applies; lists are joined
+    with commas; everything else goes through ``str``.
+
+    Args:
+        details: User-provided details
+
+    Returns:
+        New dictionary of string values
+    """
+    coerced = {}
+    for name, value in details.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = ", ".join(str(item) for item in value)
+        coerced[str(name)] = value if isinstance(value, str) else str(value)
+    return coerced
+
+
+class TypeDefaults:
+    """Frozen default variables of one document type
+
+    Static values are fixed when the snapshot is compiled; date placeholders
+    are filled in at most once per day.
+    """
+
+    __slots__ = ("static", "date_fields", "_resolved")
+
+    def __init__(self, defaults: Mapping[str, str]):
+        self.static: Mapping[str, str] = MappingProxyType(
+            {name: value for name, value in defaults.items() if value != TODAY_PLACEHOLDER}
+        )
+        self.date_fields: Tuple[str, ...] = tuple(
+            name for name, value in defaults.items() if value == TODAY_PLACEHOLDER
+        )
+        self._resolved: Tuple[str, Mapping[str, str]] = ("", self.static)
+
+    def resolved(self) -> Mapping[str, str]:
+        """Read-only defaults with today's date filled in"""
+        if not self.date_fields:
+            return self.static
+        date, resolved = self._resolved
+        current = today()
+        if date != current:
+            resolved = MappingProxyType(
+                {**self.static, **{name: current for name in self.date_fields}}
+            )
+            self._resolved = (current, resolved)
+        return resolved
+
+    def merge(self, details: Mapping[str, Any]) -> Dict[str, str]:
+        """
+        Fresh variables for one request: defaults overridden by user details
+
+        Args:
+            details: User-provided details
+
+        Returns:
+            New dictionary of string values
+        """
+        merged = dict(self.resolved())
+        merged.update(coerce_details(details))
+        return merged
+
+
+class TemplateRegistry:
+    """Disk-backed registry of document types with polling hot reload"""
+
+    def __init__(
+        self,
+        root: str = DEFAULT_TEMPLATE_DIR,
+        reload_seconds: float = DEFAULT_RELOAD_SECONDS,
+    ):
+        """
+        Load the registry
+
+        Args:
+            root: Directory holding one sub-directory per document type
+            reload_seconds: Poll interval of the watcher (0 disables it)
+
+        Raises:
+            ValueError: If the templates on disk are invalid
+        """
+        self.root = Path(root)
+        self.reload_seconds = reload_seconds
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._counters = {"reloads": 0, "reload_failures": 0}
+        self._last_error: Optional[str] = None
+        self._failed_signature: Optional[Tuple] = None
+
+        signature = self._signature()
+        self._snapshot = RegistrySnapshot(1, signature, self._load_specs())
+        logger.info(f"Template registry loaded {len(self._snapshot.specs)} types from {root}")
+
+    @property
+    def snapshot(self) -> RegistrySnapshot:
+        """The current compiled registry"""
+        return self._snapshot
+
+    def get(self, doc_type: str) -> Optional[DocumentTypeSpec]:
+        """
+        Look up a document type
+
+        Args:
+            doc_type: Document type key
+
+        Returns:
+            DocumentTypeSpec or None
+        """
+        return self._snapshot.specs.get(doc_type.lower())
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Rebuild the registry if files changed
+
+        A registry that fails to load is logged and the previous snapshot
+        keeps serving.
+
+        Args:
+            force: Rebuild even if nothing changed
+
+        Returns:
+            True if a new snapshot was installed
+        """
+        with self._reload_lock:
+            try:
+                signature = self._signature()
+                if not force and signature in (self._snapshot.signature, self._failed_signature):
+                    return False
+                snapshot = RegistrySnapshot(
+                    self._snapshot.version + 1, signature, self._load_specs()
+                )
+            except (OSError, ValueError) as e:
+                # Not retried until the files change again
+                self._failed_signature = signature
+                self._counters["reload_failures"] += 1
+                self._last_error = str(e)
+                logger.error(
+                    f"Template reload failed, keeping version "
+                    f"{self._snapshot.version}: {str(e)}"
+                )
+                return False
+
+            self._snapshot = snapshot
+            self._counters["reloads"] += 1
+            self._last_error = None
+            logger.info(
+                f"Template registry reloaded: version {snapshot.version}, "
+                f"{len(snapshot.specs)} types"
+            )
+            return True
+
+    def start_watching(self) -> None:
+        """Start the background thread polling for template changes"""
+        if self.reload_seconds <= 0 or self._watcher is not None:
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, name="template-registry-watcher", daemon=True
+        )
+        self._watcher.start()
+        logger.info(f"Watching {self.root} for template changes every {self.reload_seconds}s")
+
+    def stop_watching(self) -> None:
+        """Stop the watcher thread"""
+        if self._watcher is None:
+            return
+        self._stop.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.reload_seconds):
+            try:
+                self.reload()
+            except Exception as e:
+                logger.error(f"Template watcher error: {str(e)}", exc_info=True)
+
+    def _signature(self) -> Tuple:
+        """Names, sizes and modification times of every registry file"""
+        if not self.root.is_dir():
+            raise ValueError(f"Template directory not found: {self.root}")
+        entries = []
+        for path in sorted(self.root.rglob("*")):
+            if path.is_file():
+                stat = path.stat()
+                entries.append((str(path.relative_to(self.root)), stat.st_size, stat.st_mtime_ns))
+        return tuple(entries)
+
+    def _load_specs(self) -> Dict[str, DocumentTypeSpec]:
+        specs = {}
+        for directory in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            if directory.name.startswith("."):
+                continue
+            specs[directory.name] = _load_spec(directory)
+        if not specs:
+            raise ValueError(f"No document types found in {self.root}")
+        return specs
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get registry metrics
+
+        Returns:
+            Dictionary with version, type count, reload counters and last error
+        """
+        return {
+            "version": self._snapshot.version,
+            "loaded_at": self._snapshot.loaded_at,
+            "document_types": len(self._snapshot.specs),
+            "watching": self._watcher is not None,
+            **self._counters,
+            "last_error": self._last_error,
+        }
+
+
+def _load_spec(directory: Path) -> DocumentTypeSpec:
+    """Read and validate one document type directory"""
+    doc_type = directory.name
+    if not _DOC_TYPE_RE.match(doc_type):
+        raise ValueError(f"Invalid document type directory name: {doc_type}")
+
+    try:
+        data = json.loads((directory / _SPEC_FILE).read_text(encoding="utf-8"))
+    except json.JSONDecodeError as e:
+        raise ValueError(f"{doc_type}/{_SPEC_FILE} is not valid JSON: {str(e)}")
+    prompt = (directory / _PROMPT_FILE).read_text(encoding="utf-8").rstrip("\n")
+
+    if not isinstance(data.get("name"), str) or not data["name"]:
+        raise ValueError(f"{doc_type}: 'name' is required")
+    if not prompt.strip():
+        raise ValueError(f"{doc_type}: {_PROMPT_FILE} is empty")
+    for field in ("sections", "key_elements", "variables"):
+        value = data.get(field, [])
+        if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+            raise ValueError(f"{doc_type}: '{field}' must be a list of strings")
+    if not data.get("sections"):
+        raise ValueError(f"{doc_type}: 'sections' must not be empty")
+
+    defaults = data.get("defaults", {})
+    unknown = sorted(set(defaults) - set(data.get("variables", [])))
+    if unknown:
+        raise ValueError(f"{doc_type}: defaults for undeclared variables: {', '.join(unknown)}")
+    keywords = data.get("keywords", {})
+    if not all(isinstance(w, (int, float)) for w in keywords.values()):
+        raise ValueError(f"{doc_type}: keyword weights must be numbers")
+
+    return DocumentTypeSpec(
+        doc_type=doc_type,
+        name=data["name"],
+        sections=tuple(data["sections"]),
+        key_elements=tuple(data.get("key_elements", [])),
+        variables=tuple(data.get("variables", [])),
+        defaults=MappingProxyType({k: str(v) for k, v in defaults.items()}),
+        keywords=MappingProxyType({k: float(w) for k, w in keywords.items()}),
+        prompt=prompt,
+    )
+
+
+_registry: Optional[TemplateRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_template_registry() -> TemplateRegistry:
+    """Get the shared template registry"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TemplateRegistry()
+    return _registry
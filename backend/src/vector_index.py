@@ -0,0 +1,558 @@
+"""
+Dense Vector Index Module
+Offline clause embeddings in memory-mapped files with batched similarity search
+"""
+
+import os
+import json
+import math
+import shutil
+import zlib
+import hashlib
+import logging
+import argparse
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Protocol, Sequence, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process development only
+    fcntl = None
+
+import numpy as np
+
+from src.clause_index import Clause, analyze, load_corpus, DEFAULT_CORPUS_DIR
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_DIR = os.getenv("CLAUSE_VECTOR_INDEX_DIR", "./indexes/clauses")
+DEFAULT_DIMENSIONS = int(os.getenv("CLAUSE_VECTOR_DIMENSIONS", "1024"))
+QUANTIZATION_MODES = ("float32", "int8")
+SCORE_BLOCK_ROWS = 65536
+
+_META_FILE = "meta.json"
+_EMBEDDER_FILE = "embedder.json"
+_VECTORS_FILE = "vectors.npy"
+_SCALES_FILE = "scales.npy"
+_ROWS_FILE = "rows.npy"
+_CENTROIDS_FILE = "centroids.npy"
+_OFFSETS_FILE = "offsets.npy"
+
+
+class Embedder(Protocol):
+    """Local text embedder producing L2-normalized float32 vectors"""
+
+    name: str
+    dimensions: int
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray: ...
+
+
+class HashingEmbedder:
+    """Signed feature-hashing embedder with IDF term weights
+
+    Terms are hashed straight into vector buckets (CRC32, so vectors are
+    identical across processes), so only the IDF table is learned. It needs
+    no model download or network access.
+    """
+
+    def __init__(
+        self,
+        dimensions: int = DEFAULT_DIMENSIONS,
+        idf: Optional[Dict[str, float]] = None,
+        default_idf: float = 1.0,
+    ):
+        """
+        Initialize embedder
+
+        Args:
+            dimensions: Output vector size
+            idf: Term weights; unweighted hashing when omitted
+            default_idf: Weight of terms missing from ``idf``
+        """
+        if dimensions < 8:
+            raise ValueError("dimensions must be at least 8")
+        self.dimensions = dimensions
+        self.idf = idf or {}
+        self.default_idf = default_idf
+        self.name = f"hashing-tfidf-v1-{dimensions}"
+
+    @classmethod
+    def fit(cls, texts: Sequence[str], dimensions: int = DEFAULT_DIMENSIONS) -> "HashingEmbedder":
+        """
+        Learn IDF weights from a corpus
+
+        Args:
+            texts: Corpus texts
+            dimensions: Output vector size
+
+        Returns:
+            Fitted embedder
+        """
+        document_frequency: Dict[str, int] = {}
+        for text in texts:
+            for term in set(analyze(text)):
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        count = len(texts)
+        idf = {
+            term: math.log((1 + count) / (1 + df)) + 1.0
+            for term, df in document_frequency.items()
+        }
+        # Unseen query terms are treated as rarer than anything in the corpus
+        return cls(dimensions, idf, math.log(1 + count) + 1.0)
+
+    @classmethod
+    def load(cls, index_dir: str) -> "HashingEmbedder":
+        """Load the embedder saved alongside an index"""
+        data = json.loads((Path(index_dir) / _EMBEDDER_FILE).read_text(encoding="utf-8"))
+        return cls(data["dimensions"], data["idf"], data["default_idf"])
+
+    def save(self, index_dir: Path) -> None:
+        """Save the embedder alongside an index"""
+        data = {
+            "dimensions": self.dimensions,
+            "idf": self.idf,
+            "default_idf": self.default_idf,
+        }
+        (Path(index_dir) / _EMBEDDER_FILE).write_text(json.dumps(data), encoding="utf-8")
+
+    def embed(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Embed a batch of texts
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            Array of shape (len(texts), dimensions), rows L2-normalized
+        """
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        idf, default_idf = self.idf, self.default_idf
+        for row, text in enumerate(texts):
+            counts: Dict[str, int] = {}
+            for term in analyze(text):
+                counts[term] = counts.get(term, 0) + 1
+            for term, count in counts.items():
+                digest = zlib.crc32(term.encode("utf-8"))
+                sign = 1.0 if digest & 0x80000000 else -1.0
+                weight = (1.0 + math.log(count)) * idf.get(term, default_idf)
+                vectors[row, digest % self.dimensions] += sign * weight
+
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.divide(vectors, norms, out=vectors, where=norms > 0)
+        return vectors
+
+
+def corpus_fingerprint(clauses: Iterable[Clause]) -> str:
+    """Hash of clause ids and texts, used to detect a stale index"""
+    digest = hashlib.sha256()
+    for clause in clauses:
+        digest.update(clause.clause_id.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(f"{clause.title}\n{clause.text}".encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@contextmanager
+def index_lock(index_dir: str) -> Iterator[None]:
+    """
+    Hold an exclusive cross-process lock on an index directory
+
+    Every uvicorn worker checks (and may rebuild) the index at startup, and
+    the directory swap in ``build_vector_index`` is two renames. Holding this
+    lock around check, build and open keeps workers and the CLI from
+    swapping the directory under each other.
+
+    Args:
+        index_dir: Index directory
+    """
+    target = Path(index_dir)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with open(target.with_name(f".{target.name}.lock"), "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def build_vector_index(
+    clauses: List[Clause],
+    index_dir: str,
+    embedder: Optional[Embedder] = None,
+    quantization: str = "float32",
+    nlist: int = 0,
+    batch_size: int = 1024,
+) -> Path:
+    """
+    Embed clauses and write a memory-mappable index directory
+
+    The directory is written next to ``index_dir`` and renamed into place,
+    so running workers never observe a half-written index. Callers that may
+    race with other processes hold ``index_lock`` around the build.
+
+    Args:
+        clauses: Clause corpus
+        index_dir: Output directory
+        embedder: Embedder; a HashingEmbedder is fitted to the clauses by default
+        quantization: ``float32`` or ``int8`` (per-row scale)
+        nlist: Number of IVF coarse partitions; 0 disables partitioning
+        batch_size: Clauses embedded per batch
+
+    Returns:
+        Path to the index directory
+    """
+    if quantization not in QUANTIZATION_MODES:
+        raise ValueError(f"quantization must be one of {', '.join(QUANTIZATION_MODES)}")
+    texts = [f"{clause.title} {clause.text}" for clause in clauses]
+    embedder = embedder or HashingEmbedder.fit(texts)
+    target = Path(index_dir)
+    staging = target.with_name(f".{target.name}.tmp-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+
+    count, dimensions = len(clauses), embedder.dimensions
+    vectors = np.empty((count, dimensions), dtype=np.float32)
+    for start in range(0, count, batch_size):
+        batch = texts[start : start + batch_size]
+        vectors[start : start + len(batch)] = embedder.embed(batch)
+
+    # IVF: store rows grouped by coarse partition so a probe is a slice
+    requested_nlist, nlist = nlist, min(nlist, count)
+    rows = np.arange(count, dtype=np.int32)
+    if nlist > 1:
+        centroids = _train_centroids(vectors, nlist)
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        rows = np.argsort(assignments, kind="stable").astype(np.int32)
+        offsets = np.searchsorted(assignments[rows], np.arange(nlist + 1)).astype(np.int64)
+        np.save(staging / _CENTROIDS_FILE, centroids)
+        np.save(staging / _OFFSETS_FILE, offsets)
+        vectors = vectors[rows]
+    np.save(staging / _ROWS_FILE, rows)
+
+    if quantization == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        stored = np.rint(vectors / scales[:, None]).astype(np.int8)
+        np.save(staging / _SCALES_FILE, scales.astype(np.float32))
+    else:
+        stored = vectors
+    np.save(staging / _VECTORS_FILE, stored)
+
+    meta = {
+        "embedder": embedder.name,
+        "dimensions": dimensions,
+        "count": count,
+        "quantization": quantization,
+        "nlist": nlist if nlist > 1 else 0,
+        # As requested, so a rebuild for a grown corpus keeps the same shape
+        "build": {
+            "dimensions": dimensions,
+            "quantization": quantization,
+            "nlist": requested_nlist,
+        },
+        "fingerprint": corpus_fingerprint(clauses),
+        "clause_ids": [clause.clause_id for clause in clauses],
+    }
+    (staging / _META_FILE).write_text(json.dumps(meta), encoding="utf-8")
+    if hasattr(embedder, "save"):
+        embedder.save(staging)
+
+    if target.exists():
+        retired = target.with_name(f".{target.name}.old-{os.getpid()}")
+        target.rename(retired)
+        staging.rename(target)
+        shutil.rmtree(retired, ignore_errors=True)
+    else:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        staging.rename(target)
+
+    logger.info(
+        f"Vector index built at {target}: {count} x {dimensions} {quantization}, "
+        f"{meta['nlist']} partitions"
+    )
+    return target
+
+
+def _train_centroids(vectors: np.ndarray, nlist: int, iterations: int = 10) -> np.ndarray:
+    """Spherical k-means on a sample of the vectors"""
+    rng = np.random.default_rng(0)
+    sample_size = min(len(vectors), max(nlist * 64, 10000))
+    sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+    centroids = sample[rng.choice(sample_size, nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assignments = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assignments, sample)
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        # Empty partitions keep their previous centroid
+        centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+    return centroids.astype(np.float32)
+
+
+class DenseVectorIndex:
+    """Read-only nearest-neighbour index over memory-mapped clause vectors
+
+    Vector files are opened with ``mmap_mode="r"``, so every worker process
+    maps the same page-cache pages instead of loading a private copy.
+    """
+
+    def __init__(self, index_dir: str):
+        """
+        Open an index directory written by ``build_vector_index``
+
+        Args:
+            index_dir: Index directory
+        """
+        root = Path(index_dir)
+        self.index_dir = root
+        self.meta = json.loads((root / _META_FILE).read_text(encoding="utf-8"))
+        self.clause_ids: List[str] = self.meta["clause_ids"]
+        self.quantization: str = self.meta["quantization"]
+        self._vectors = np.load(root / _VECTORS_FILE, mmap_mode="r")
+        self._rows = np.load(root / _ROWS_FILE, mmap_mode="r")
+        self._scales = (
+            np.load(root / _SCALES_FILE, mmap_mode="r")
+            if self.quantization == "int8"
+            else None
+        )
+        if self.meta["nlist"]:
+            self._centroids = np.load(root / _CENTROIDS_FILE)
+            self._offsets = np.load(root / _OFFSETS_FILE)
+        else:
+            self._centroids = None
+            self._offsets = None
+        logger.info(
+            f"Vector index opened: {len(self)} x {self.dimensions} "
+            f"{self.quantization}, {self.meta['nlist']} partitions"
+        )
+
+    def __len__(self) -> int:
+        return int(self.meta["count"])
+
+    @property
+    def dimensions(self) -> int:
+        return int(self.meta["dimensions"])
+
+    def search(
+        self, queries: np.ndarray, k: int = 5, nprobe: int = 8
+    ) -> List[List[Tuple[int, float]]]:
+        """
+        Find the nearest clauses for a batch of query vectors
+
+        Args:
+            queries: Array of shape (batch, dimensions), rows L2-normalized
+            k: Neighbours per query
+            nprobe: IVF partitions scanned per query (ignored without IVF)
+
+        Returns:
+            Per query, a list of (corpus position, cosine score), best first
+        """
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        if queries.shape[1] != self.dimensions:
+            raise ValueError(
+                f"Query dimensions {queries.shape[1]} do not match index {self.dimensions}"
+            )
+        if not len(self) or k < 1:
+            return [[] for _ in range(len(queries))]
+
+        if self._centroids is None:
+            scores = self._score_rows(queries, 0, len(self))
+            return [self._top_k(row_scores, None, k) for row_scores in scores]
+
+        nprobe = min(nprobe, len(self._centroids))
+        coarse = queries @ self._centroids.T
+        probes = np.argpartition(-coarse, nprobe - 1, axis=1)[:, :nprobe]
+        results = []
+        for query, lists in zip(queries, probes):
+            ranges = [
+                (int(self._offsets[n]), int(self._offsets[n + 1])) for n in lists
+            ]
+            ranges = [(lo, hi) for lo, hi in ranges if hi > lo]
+            if not ranges:
+                results.append([])
+                continue
+            positions = np.concatenate([np.arange(lo, hi) for lo, hi in ranges])
+            scores = np.concatenate(
+                [self._score_rows(query[None, :], lo, hi)[0] for lo, hi in ranges]
+            )
+            results.append(self._top_k(scores, positions, k))
+        return results
+
+    def _score_rows(self, queries: np.ndarray, start: int, stop: int) -> np.ndarray:
+        """Dot products of queries with stored rows [start, stop), in blocks"""
+        blocks = []
+        for lo in range(start, stop, SCORE_BLOCK_ROWS):
+            hi = min(lo + SCORE_BLOCK_ROWS, stop)
+            block = np.asarray(self._vectors[lo:hi], dtype=np.float32)
+            scores = queries @ block.T
+            if self._scales is not None:
+                scores *= self._scales[lo:hi]
+            blocks.append(scores)
+        return np.concatenate(blocks, axis=1)
+
+    def _top_k(
+        self, scores: np.ndarray, positions: Optional[np.ndarray], k: int
+    ) -> List[Tuple[int, float]]:
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        stored = best if positions is None else positions[best]
+        return [
+            (int(self._rows[row]), round(float(scores[i]), 4))
+            for row, i in zip(stored, best)
+        ]
+
+    def stats(self) -> Dict[str, object]:
+        """Index shape and storage"""
+        return {
+            "vectors": len(self),
+            "dimensions": self.dimensions,
+            "quantization": self.quantization,
+            "partitions": self.meta["nlist"],
+            "embedder": self.meta["embedder"],
+            "bytes": int(self._vectors.nbytes),
+        }
+
+
+class ClauseVectorSearch:
+    """Embed queries and map dense search hits back to clauses"""
+
+    def __init__(self, index: DenseVectorIndex, clauses: List[Clause], embedder: Embedder):
+        """
+        Initialize clause vector search
+
+        Args:
+            index: Opened dense index
+            clauses: Clause corpus the index was built from
+            embedder: Embedder matching the one used to build the index
+        """
+        if embedder.name != index.meta["embedder"]:
+            raise ValueError(
+                f"Embedder {embedder.name} does not match index {index.meta['embedder']}"
+            )
+        by_id = {clause.clause_id: clause for clause in clauses}
+        self.index = index
+        self.embedder = embedder
+        self.clauses = [by_id[clause_id] for clause_id in index.clause_ids]
+
+    @classmethod
+    def load(
+        cls,
+        clauses: List[Clause],
+        index_dir: str = DEFAULT_INDEX_DIR,
+        embedder: Optional[Embedder] = None,
+    ) -> "ClauseVectorSearch":
+        """
+        Open the index for a corpus, rebuilding it when missing or stale
+
+        Args:
+            clauses: Clause corpus
+            index_dir: Index directory
+            embedder: Embedder; by default the HashingEmbedder saved with the
+                index (or fitted to the corpus on rebuild, keeping the saved
+                dimensions, quantization and partition count)
+
+        Returns:
+            ClauseVectorSearch
+        """
+        with index_lock(index_dir):
+            meta_path = Path(index_dir) / _META_FILE
+            meta = (
+                json.loads(meta_path.read_text(encoding="utf-8"))
+                if meta_path.exists()
+                else None
+            )
+            # The saved embedder and build parameters are reused unless the
+            # caller supplies a different embedder
+            stale = (
+                meta is None
+                or meta.get("fingerprint") != corpus_fingerprint(clauses)
+                or (embedder is not None and meta.get("embedder") != embedder.name)
+            )
+            if stale:
+                logger.info(f"Vector index at {index_dir} is missing or stale; rebuilding")
+                # Indexes written before "build" was recorded keep their shape
+                previous = meta or {}
+                build = previous.get("build", previous)
+                if embedder is None:
+                    embedder = HashingEmbedder.fit(
+                        [f"{clause.title} {clause.text}" for clause in clauses],
+                        build.get("dimensions", DEFAULT_DIMENSIONS),
+                    )
+                build_vector_index(
+                    clauses,
+                    index_dir,
+                    embedder,
+                    quantization=build.get("quantization", "float32"),
+                    nlist=build.get("nlist", 0),
+                )
+            return cls(
+                DenseVectorIndex(index_dir), clauses, embedder or HashingEmbedder.load(index_dir)
+            )
+
+    def search(
+        self,
+        texts: Sequence[str],
+        k: int = 5,
+        doc_type: Optional[str] = None,
+        nprobe: int = 8,
+    ) -> List[List[Tuple[Clause, float]]]:
+        """
+        Nearest clauses for a batch of texts
+
+        Args:
+            texts: Query texts
+            k: Clauses per query
+            doc_type: Only clauses applicable to this document type
+            nprobe: IVF partitions scanned per query
+
+        Returns:
+            Per text, a list of (clause, cosine score), best first
+        """
+        if not texts:
+            return []
+        # Over-fetch when filtering so k applicable clauses usually remain
+        fetch = k if doc_type is None else k * 4
+        hits = self.index.search(self.embedder.embed(texts), fetch, nprobe)
+        results = []
+        for query_hits in hits:
+            matched = [
+                (self.clauses[position], score)
+                for position, score in query_hits
+                if doc_type is None or self.clauses[position].applies_to(doc_type)
+            ]
+            results.append(matched[:k])
+        return results
+
+
+def main() -> None:
+    """Build the clause vector index from the command line"""
+    parser = argparse.ArgumentParser(description="Build the clause vector index")
+    parser.add_argument("--corpus", default=DEFAULT_CORPUS_DIR, help="Clause corpus directory")
+    parser.add_argument("--out", default=DEFAULT_INDEX_DIR, help="Index output directory")
+    parser.add_argument("--dimensions", type=int, default=DEFAULT_DIMENSIONS)
+    parser.add_argument("--quantization", choices=QUANTIZATION_MODES, default="float32")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF partitions (0 = exact)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    clauses = load_corpus(args.corpus)
+    with index_lock(args.out):
+        build_vector_index(
+            clauses,
+            args.out,
+            HashingEmbedder.fit(
+                [f"{clause.title} {clause.text}" for clause in clauses], args.dimensions
+            ),
+            quantization=args.quantization,
+            nlist=args.nlist,
+        )
+
+
+if __name__ == "__main__":
+    main()
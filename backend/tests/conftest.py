@@ -0,0 +1,41 @@
+"""
+Shared test fixtures
+Tests run from the backend directory against the offline fake LLM backend
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+# Read when main is first imported; keep the app offline and out of ./jobs
+os.environ.setdefault("LLM_BACKEND", "fake")
+os.environ.setdefault("FAKE_LLM_LATENCY_MS", "0")
+os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", "0")
+os.environ.setdefault("JOB_DB_PATH", os.path.join(tempfile.mkdtemp(), "jobs.sqlite"))
+
+from src.document_generator import DocumentGenerator  # noqa: E402
+from src.fake_llm import FakeLLMBackend  # noqa: E402
+from src.response_cache import ResponseCache  # noqa: E402
+from src.single_flight import SingleFlight  # noqa: E402
+
+
+@pytest.fixture
+def fake_llm() -> FakeLLMBackend:
+    """Instant, deterministic fake backend"""
+    return FakeLLMBackend(latency_ms=0, latency_distribution="fixed", tokens_per_second=0, seed=1)
+
+
+@pytest.fixture
+def app_main(tmp_path, monkeypatch):
+    """The API module with a fresh cache, single-flight group and output directory"""
+    import main
+
+    monkeypatch.setattr(main, "doc_generator", DocumentGenerator(str(tmp_path / "outputs")))
+    monkeypatch.setattr(main, "response_cache", ResponseCache())
+    monkeypatch.setattr(main, "single_flight", SingleFlight())
+    return main
@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from src.admission import AdmissionController, AdmissionRejected
+from src.fake_llm import FakeLLMBackend
+
+
+def test_queue_full_is_rejected_with_429():
+    admission = AdmissionController(max_concurrency=1, max_queue=1, max_queue_seconds=1)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def hold():
+            async with admission.slot():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold())
+        waiter = asyncio.ensure_future(hold())
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(AdmissionRejected) as rejected:
+                await admission.acquire()
+        finally:
+            release.set()
+            await asyncio.gather(holder, waiter)
+        return rejected.value
+
+    rejected = asyncio.run(main())
+    assert rejected.status_code == 429
+    assert rejected.retry_after >= 1
+    stats = admission.stats()
+    assert (stats["admitted"], stats["rejected_queue_full"]) == (2, 1)
+
+
+def test_queue_timeout_is_rejected_with_503():
+    admission = AdmissionController(max_concurrency=1, max_queue=1, max_queue_seconds=0.01)
+
+    async def main():
+        await admission.acquire()
+        try:
+            with pytest.raises(AdmissionRejected) as rejected:
+                await admission.acquire()
+        finally:
+            admission.release()
+        return rejected.value
+
+    assert asyncio.run(main()).status_code == 503
+
+
+def _batch(app_main, count: int, max_parallel: int):
+    items = [
+        app_main.DocumentRequest(
+            prompt="Draft a Loan Agreement", details={"lender_name": f"Lender {index}"}
+        )
+        for index in range(count)
+    ]
+    return app_main.BatchDocumentRequest(items=items, max_parallel=max_parallel)
+
+
+def test_batch_parallelism_is_capped_at_admission_capacity(app_main, monkeypatch):
+    monkeypatch.setattr(
+        app_main, "llm_admission", AdmissionController(max_concurrency=1, max_queue=1)
+    )
+    llm = FakeLLMBackend(latency_ms=20, latency_distribution="fixed", tokens_per_second=0)
+
+    response = asyncio.run(app_main.draft_documents(_batch(app_main, 6, 64), llm))
+
+    assert (response.succeeded, response.failed) == (6, 0)
+    assert app_main.llm_admission.stats()["rejected_queue_full"] == 0
+
+
+def test_batch_item_waits_out_a_full_admission_queue(app_main, monkeypatch):
+    monkeypatch.setattr(app_main, "BATCH_ADMISSION_RETRIES", 2)
+    calls = []
+    draft = app_main._draft
+
+    async def rejected_once(item, llm, *args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise HTTPException(
+                status_code=429, detail="queue full", headers={"Retry-After": "0"}
+            )
+        return await draft(item, llm, *args, **kwargs)
+
+    monkeypatch.setattr(app_main, "_draft", rejected_once)
+    llm = FakeLLMBackend(latency_ms=0, latency_distribution="fixed", tokens_per_second=0)
+
+    response = asyncio.run(app_main.draft_documents(_batch(app_main, 1, 1), llm))
+
+    assert response.succeeded == 1
+    assert len(calls) == 2
@@ -0,0 +1,104 @@
+"""Document type classification, including prompts the original scan accepted"""
+
+from pathlib import Path
+
+import pytest
+
+from src.doc_classifier import DocumentTypeClassifier, normalize
+from src.template_registry import TemplateRegistry
+
+TEMPLATE_DIR = Path(__file__).resolve().parent.parent / "templates"
+
+# The first-match keyword scan the classifier replaced
+BASELINE_KEYWORDS = {
+    "loan_agreement": ["loan", "lender", "borrower"],
+    "rental_agreement": ["rental", "lease", "tenant", "landlord"],
+    "nda": ["confidential", "nda", "non-disclosure"],
+    "service_agreement": ["service", "provider", "client"],
+    "employment_contract": ["employment", "employee", "hired", "job"],
+    "partnership_deed": ["partnership", "partner", "business"],
+    "affidavit": ["affidavit", "sworn", "statement"],
+}
+
+BASELINE_PROMPTS = [
+    ("Agreement between landlords and tenants for a flat in Pune", "rental_agreement"),
+    ("Contract for two new employees at Acme", "employment_contract"),
+    ("Loans from Rohit to Akash of 5 lakh", "loan_agreement"),
+    ("Keep our discussions under strict confidentiality", "nda"),
+    ("Affidavits for name change", "affidavit"),
+    ("Draft a loan agreement for 5 lakh", "loan_agreement"),
+    ("Lease of office premises for 11 months", "rental_agreement"),
+    ("NDA between TechCorp and John Doe", "nda"),
+    ("Mutual non-disclosure for a product pilot", "nda"),
+    ("Agreement for services rendered to our clients", "service_agreement"),
+    ("Hiring letter with employment terms", "employment_contract"),
+    ("Deed for three partners starting a firm", "partnership_deed"),
+    ("Sworn statement of residence", "affidavit"),
+    ("Borrowers must repay within a year", "loan_agreement"),
+]
+
+
+def baseline_identify(prompt: str):
+    prompt_lower = prompt.lower()
+    for doc_type, keywords in BASELINE_KEYWORDS.items():
+        if any(keyword in prompt_lower for keyword in keywords):
+            return doc_type
+    return None
+
+
+@pytest.fixture(scope="module")
+def classifier() -> DocumentTypeClassifier:
+    return TemplateRegistry(str(TEMPLATE_DIR), reload_seconds=0).snapshot.classifier
+
+
+@pytest.mark.parametrize("prompt,expected", BASELINE_PROMPTS)
+def test_baseline_prompts_still_classify(classifier, prompt, expected):
+    assert baseline_identify(prompt) is not None
+    prediction = classifier.predict(prompt)
+    assert prediction is not None
+    assert prediction[0] == expected
+
+
+def test_hyphen_variants_classify(classifier):
+    assert classifier.predict("nondisclosure")[0] == "nda"
+
+
+def test_unrelated_prompt_is_not_classified(classifier):
+    assert classifier.predict("What is the weather today?") is None
+
+
+def test_distinctive_terms_outweigh_generic_ones(classifier):
+    assert classifier.predict("Loan from a service company to a borrower")[0] == "loan_agreement"
+
+
+@pytest.mark.parametrize(
+    "token,key",
+    [
+        ("tenants", "tenant"),
+        ("parties", "party"),
+        ("businesses", "business"),
+        ("business", "business"),
+        ("non-disclosure", "nondisclosure"),
+        ("emi", "emi"),
+    ],
+)
+def test_normalize(token, key):
+    assert normalize(token) == key
+
+
+def test_prefix_fallback_matches_word_starts(classifier):
+    # No exact token: "confidentiality" and "lenders'" only match as prefixes
+    assert classifier.predict("Keep this under strict confidentiality")[0] == "nda"
+    assert classifier.top_k("tenancy for the leaseholder") == [("rental_agreement", 1.0)]
+    # Mid-word text never matches ("emi" in "premium", "rent" in "parent")
+    assert classifier.predict("premium parental leave") is None
+
+
+def test_prefix_fallback_prefers_the_longest_phrase():
+    classifier = DocumentTypeClassifier(
+        {"short": {"work": 1.0}, "long": {"scope of work": 1.0}}
+    )
+
+    # "workflows" only matches "work" as a prefix; the phrase consumes it
+    assert classifier.top_k("scope of workflows") == [("long", 1.0)]
+    assert classifier.top_k("scopes of workflows") == [("short", 1.0)]
@@ -0,0 +1,98 @@
+import asyncio
+import zipfile
+
+import pytest
+
+from src.document_export import (
+    DocumentExportCache,
+    RenderedDocument,
+    to_html,
+    to_markdown,
+    to_text,
+)
+from src.document_generator import DocumentGenerator
+from src.markdown_ast import parse_markdown
+
+CONTENT = (
+    "# LOAN AGREEMENT\n"
+    "The **Lender** lends <script>alert(1)</script> & more.\n"
+    "- first\n"
+    "  - nested\n"
+    "1. numbered\n"
+    "| Party | Role |\n"
+    "|---|---|\n"
+    "| Rohit | *Lender* |\n"
+    "[SIGNATURE_BLOCK]"
+)
+
+
+def test_html_escapes_text_and_nests_lists():
+    html = to_html(parse_markdown(CONTENT), title="Loan <1>", footer="Generated")
+
+    assert "<script>" not in html
+    assert "&lt;script&gt;" in html
+    assert "<title>Loan &lt;1&gt;</title>" in html
+    assert "<strong>Lender</strong>" in html
+    assert "<ul><li>first<ul><li>nested</li></ul></li></ul><ol><li>numbered</li></ol>" in html
+    assert 'class="signature-block"' in html
+    assert "<footer>Generated</footer>" in html
+
+
+def test_markdown_is_normalized_and_sanitized():
+    markdown = to_markdown(parse_markdown(CONTENT))
+
+    assert markdown.startswith("# LOAN AGREEMENT\n\nThe **Lender** lends &lt;script&gt;")
+    assert "- first\n  - nested\n1. numbered" in markdown
+    assert "| Party | Role |\n|---|---|\n| Rohit | *Lender* |" in markdown
+    assert markdown.endswith("[SIGNATURE_BLOCK]\n")
+
+
+def test_text_flattens_formatting():
+    text = to_text(parse_markdown(CONTENT), footer="Generated")
+
+    assert text.startswith("LOAN AGREEMENT\n\nThe Lender lends <script>")
+    assert "Rohit | Lender" in text
+    assert "Signed by (Party B)" in text
+    assert text.endswith("Generated\n")
+
+
+def test_exports_render_once_and_reject_unknown_formats():
+    document = RenderedDocument("doc_1", "loan_agreement", CONTENT)
+
+    assert document.export("html") is document.export("html")
+    with pytest.raises(ValueError):
+        document.export("pdf")
+
+
+def test_cache_evicts_least_recently_used():
+    cache = DocumentExportCache(max_documents=2)
+    for document_id in ("a", "b"):
+        cache.put(RenderedDocument(document_id, "nda", "text"))
+    cache.get("a")
+    cache.put(RenderedDocument("c", "nda", "text"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_process_workers_render_and_the_parent_stores(tmp_path):
+    generator = DocumentGenerator(str(tmp_path), workers=1, executor="process")
+    writes = []
+    generator.store.on_write = writes.append
+    metadata = {"document_type": "loan_agreement"}
+    try:
+        stored = asyncio.run(generator.agenerate_document(CONTENT, "loan_agreement", metadata))
+    finally:
+        generator.shutdown()
+
+    assert writes == [stored.size]
+    document = generator.get_document(stored.document_id)
+    assert document.file_path == stored.path
+    with zipfile.ZipFile(stored.path) as package:
+        footer_xml = b"".join(
+            package.read(name) for name in package.namelist() if name.startswith("word/footer")
+        )
+    assert document.footer.startswith("Generated on: ")
+    assert document.footer.encode("utf-8") in footer_xml
+    assert document.export("text").endswith(document.footer + "\n")
@@ -0,0 +1,235 @@
+import io
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from src.document_store import DocumentStore, package_digest
+from src.retention import RetentionManager
+
+
+def make_package(text: str, member_time=(2024, 1, 1, 0, 0, 0)) -> bytes:
+    """Minimal zip package standing in for a DOCX"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        package.writestr(zipfile.ZipInfo("word/document.xml", member_time), text)
+    return buffer.getvalue()
+
+
+def age_blobs(store: DocumentStore, days: int) -> None:
+    """Backdate every blob as if it was stored long ago"""
+    old = (datetime.now() - timedelta(days=days)).isoformat()
+    with store._lock:
+        store._db.execute("UPDATE blobs SET created_at = ?, last_access = 0", (old,))
+        store._db.commit()
+
+
+def test_digest_ignores_zip_timestamps():
+    assert package_digest(make_package("a")) == package_digest(
+        make_package("a", (2025, 6, 1, 12, 0, 0))
+    )
+
+
+def test_identical_documents_share_one_blob(tmp_path):
+    store = DocumentStore(str(tmp_path))
+
+    first = store.put("nda_a.docx", make_package("same"), "nda")
+    second = store.put("nda_b.docx", make_package("same"), "nda")
+
+    assert first.digest == second.digest
+    assert store.get("nda_a").path == store.get("nda_b").path
+    stats = store.stats()
+    assert (stats["documents"], stats["blobs"], stats["stored"], stats["deduplicated"]) == (
+        2,
+        1,
+        1,
+        1,
+    )
+
+
+def test_deduplicated_document_refreshes_blob_age(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    store.put("old.docx", make_package("same"))
+    age_blobs(store, days=40)
+
+    store.put("new.docx", make_package("same"))
+    retention = RetentionManager(store, max_age_seconds=30 * 86400)
+
+    assert retention.sweep() == 0
+    assert Path(store.get("new").path).exists()
+
+
+def test_age_eviction_removes_blob_and_ids(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    stored = store.put("old.docx", make_package("old"))
+    store.put("fresh.docx", make_package("fresh"))
+    age_blobs(store, days=40)
+    store.put("fresh2.docx", make_package("fresh"))
+
+    assert RetentionManager(store, max_age_seconds=30 * 86400).sweep() == 1
+    assert store.get("old") is None
+    assert not Path(stored.path).exists()
+    assert store.get("fresh") is not None
+
+
+def test_quota_evicts_least_recently_downloaded(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    first = store.put("first.docx", make_package("a" * 1000))
+    time.sleep(0.01)
+    second = store.put("second.docx", make_package("b" * 1000))
+    time.sleep(0.01)
+    store.touch(first.digest)
+
+    retention = RetentionManager(store, max_bytes=first.size + 1)
+
+    assert retention.sweep() == 1
+    assert store.get("first") is not None
+    assert store.get("second") is None
+    assert not Path(second.path).exists()
+
+
+def test_evict_skips_blobs_reused_since_the_sweep_started(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    stored = store.put("a.docx", make_package("a"))
+    started = time.time()
+    time.sleep(0.01)
+    store.put("b.docx", make_package("a"))
+
+    assert store.evict([stored.digest], stale_before=started) == (0, 0)
+    assert Path(store.get("b").path).exists()
+
+
+def test_put_after_evict_rewrites_the_blob(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    stored = store.put("a.docx", make_package("a"))
+    store.evict([stored.digest])
+
+    store.put("b.docx", make_package("a"))
+
+    assert Path(store.get("b").path).exists()
+
+
+def test_concurrent_put_and_evict_never_index_a_missing_blob(tmp_path):
+    store = DocumentStore(str(tmp_path))
+    data = make_package("contended")
+    digest = package_digest(data)
+    stop = threading.Event()
+
+    def evict_forever():
+        while not stop.is_set():
+            store.evict([digest])
+
+    evictor = threading.Thread(target=evict_forever)
+    evictor.start()
+    try:
+        for index in range(200):
+            stored = store.put(f"doc_{index}.docx", data)
+            # Evicted already is fine; resolving to a missing file is not
+            with store._lock:
+                row = store._db.execute(
+                    "SELECT 1 FROM documents WHERE id = ?", (stored.document_id,)
+                ).fetchone()
+                assert row is None or Path(stored.path).exists()
+    finally:
+        stop.set()
+        evictor.join()
+
+
+def test_put_and_evict_from_separate_connections_never_lose_a_blob(tmp_path):
+    # Two stores share nothing but the files, like two worker processes
+    writer, sweeper = DocumentStore(str(tmp_path)), DocumentStore(str(tmp_path))
+    data = make_package("contended")
+    digest = package_digest(data)
+    stop = threading.Event()
+    blob_path = sweeper.blob_path
+
+    def slow_blob_path(*args):
+        # Widen the window between deleting the rows and unlinking the file
+        time.sleep(0.002)
+        return blob_path(*args)
+
+    sweeper.blob_path = slow_blob_path
+
+    def evict_forever():
+        while not stop.is_set():
+            sweeper.evict([digest])
+
+    evictor = threading.Thread(target=evict_forever)
+    evictor.start()
+    try:
+        for index in range(200):
+            stored = writer.put(f"doc_{index}.docx", data)
+            with writer._lock:
+                writer._db.execute("BEGIN IMMEDIATE")
+                row = writer._db.execute(
+                    "SELECT 1 FROM documents WHERE id = ?", (stored.document_id,)
+                ).fetchone()
+                exists = Path(stored.path).exists()
+                writer._db.rollback()
+            assert row is None or exists
+    finally:
+        stop.set()
+        evictor.join()
+
+
+def test_failed_index_write_rolls_back_the_transaction(tmp_path, monkeypatch):
+    store = DocumentStore(str(tmp_path))
+    store.put("a.docx", make_package("same"))
+
+    def broken(*args):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(store, "_index", broken)
+    with pytest.raises(sqlite3.OperationalError):
+        store.put("b.docx", make_package("same"))
+
+    assert not store._db.in_transaction
+    DocumentStore(str(tmp_path)).touch(package_digest(make_package("same")))
+
+
+def test_generation_stamp_in_footer_does_not_defeat_dedup(tmp_path, monkeypatch):
+    from src.document_generator import DocumentGenerator
+
+    generator = DocumentGenerator(str(tmp_path / "outputs"))
+    content = "# LOAN AGREEMENT\n\nThe Borrower shall repay the loan."
+    metadata = {"document_type": "loan_agreement"}
+
+    def render(renderer, stamp, footer_metadata=metadata):
+        monkeypatch.setattr(
+            generator,
+            "_footer_text",
+            lambda meta: f"Generated on: {stamp} | Type: {meta['document_type']}",
+        )
+        return generator.render_document(content, "loan_agreement", footer_metadata, renderer)[1]
+
+    for renderer in ("python-docx", "ooxml"):
+        first = render(renderer, "2024-01-01 12:00:00")
+        second = render(renderer, "2024-01-01 12:00:01")
+        plain = render(renderer, "2024-01-01 12:00:02", None)
+
+        assert first != second
+        assert package_digest(first) == package_digest(second)
+        assert package_digest(first) != package_digest(plain)
+
+
+def test_legacy_flat_files_are_imported(tmp_path):
+    legacy = tmp_path / "Loan-Agreement_20240101_120000.docx"
+    legacy.write_bytes(make_package("legacy"))
+    old = time.time() - 40 * 86400
+    os.utime(legacy, (old, old))
+    (tmp_path / "notes.docx").write_bytes(b"not a zip")
+    store = DocumentStore(str(tmp_path))
+
+    assert store.import_legacy() == 1
+    stored = store.get("Loan-Agreement_20240101_120000")
+    assert stored is not None and Path(stored.path).exists()
+    assert not legacy.exists()
+    assert (tmp_path / "notes.docx").exists()
+
+    # Aged from the file's modification time
+    assert RetentionManager(store, max_age_seconds=30 * 86400).sweep() == 1
@@ -0,0 +1,179 @@
+import asyncio
+import sqlite3
+import time
+
+import pytest
+
+from src.admission import AdmissionRejected
+from src.job_queue import JobFailed, JobQueue, JobRetry, JobStore
+from src.llm_config import LLMTransientError
+from src.resilience import CircuitOpenError
+
+PROMPT = "Draft a Loan Agreement between Rohit Gupta and Akash Mehta for 5 lakh"
+
+
+def run_jobs(queue: JobQueue, handler, payloads, timeout: float = 5.0):
+    """Start the queue, submit payloads and wait until every job is finished"""
+
+    async def main():
+        await queue.start(handler)
+        try:
+            job_ids = [await queue.submit(payload) for payload in payloads]
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                jobs = [queue.store.get(job_id) for job_id in job_ids]
+                if all(job["status"] in ("succeeded", "failed") for job in jobs):
+                    return jobs
+                await asyncio.sleep(0.01)
+            raise AssertionError("jobs did not finish")
+        finally:
+            await queue.stop()
+
+    return asyncio.run(main())
+
+
+def test_job_succeeds(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite")), workers=2)
+
+    async def handler(payload, timings):
+        timings["llm_seconds"] = 0.1
+        return {"echo": payload["n"]}
+
+    jobs = run_jobs(queue, handler, [{"n": 1}, {"n": 2}])
+
+    assert [job["result"] for job in jobs] == [{"echo": 1}, {"echo": 2}]
+    assert all(job["attempts"] == 0 for job in jobs)
+    assert "total_seconds" in jobs[0]["timings"]
+
+
+def test_retryable_failure_requeues_until_success(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite")), retry_base_delay=0)
+    calls = []
+
+    async def handler(payload, timings):
+        calls.append(1)
+        if len(calls) < 3:
+            raise JobRetry(429, "LLM queue is full", retry_after=0)
+        return {"ok": True}
+
+    (job,) = run_jobs(queue, handler, [{}])
+
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+    assert queue.stats()["retried"] == 2
+
+
+def test_retry_waits_for_retry_after(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite")), retry_base_delay=0)
+    starts = []
+
+    async def handler(payload, timings):
+        starts.append(time.monotonic())
+        if len(starts) == 1:
+            raise JobRetry(503, "circuit open", retry_after=0.2)
+        return {}
+
+    run_jobs(queue, handler, [{}])
+
+    assert starts[1] - starts[0] >= 0.2
+
+
+def test_retryable_failure_becomes_final_after_max_attempts(tmp_path):
+    queue = JobQueue(
+        JobStore(str(tmp_path / "jobs.sqlite")), max_attempts=3, retry_base_delay=0
+    )
+
+    async def handler(payload, timings):
+        raise JobRetry(503, "circuit open", retry_after=0)
+
+    (job,) = run_jobs(queue, handler, [{}])
+
+    assert (job["status"], job["status_code"], job["error"]) == ("failed", 503, "circuit open")
+    assert job["attempts"] == 3
+
+
+def test_validation_failure_is_terminal(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite")), retry_base_delay=0)
+
+    async def handler(payload, timings):
+        raise JobFailed(400, "Prompt cannot be empty")
+
+    (job,) = run_jobs(queue, handler, [{}])
+
+    assert (job["status"], job["status_code"], job["attempts"]) == ("failed", 400, 0)
+
+
+def test_worker_survives_a_store_error(tmp_path):
+    queue = JobQueue(JobStore(str(tmp_path / "jobs.sqlite")), workers=1)
+    complete = queue.store.complete
+    calls = []
+
+    def broken_once(*args):
+        calls.append(1)
+        if len(calls) == 1:
+            raise sqlite3.OperationalError("database is locked")
+        return complete(*args)
+
+    queue.store.complete = broken_once
+
+    async def handler(payload, timings):
+        return {"n": payload["n"]}
+
+    first, second = run_jobs(queue, handler, [{"n": 1}, {"n": 2}])
+
+    assert (first["status"], first["status_code"]) == ("failed", 500)
+    assert (second["status"], second["result"]) == ("succeeded", {"n": 2})
+
+
+def test_recover_requeues_interrupted_jobs(tmp_path):
+    store = JobStore(str(tmp_path / "jobs.sqlite"))
+    job_id = store.create({})
+    store.mark_running(job_id)
+
+    assert JobStore(str(tmp_path / "jobs.sqlite")).recover() == [job_id]
+
+
+@pytest.mark.parametrize(
+    "error, status_code, retry_after",
+    [
+        (AdmissionRejected(429, "LLM queue is full", retry_after=2), 429, 2),
+        (AdmissionRejected(503, "LLM wait too long", retry_after=3), 503, 3),
+        (CircuitOpenError("loan_agreement", retry_after=7), 503, 7),
+        (LLMTransientError("upstream overloaded"), 503, 0),
+        (asyncio.TimeoutError(), 504, 0),
+    ],
+)
+def test_run_job_retries_admission_and_open_circuit(
+    app_main, monkeypatch, error, status_code, retry_after
+):
+    async def rejected(*args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(app_main, "_generate_content", rejected)
+
+    with pytest.raises(JobRetry) as raised:
+        asyncio.run(app_main._run_job({"prompt": PROMPT}, {}))
+
+    assert raised.value.status_code == status_code
+    assert raised.value.retry_after == retry_after
+
+
+def test_run_job_fails_on_other_server_errors(app_main, monkeypatch):
+    async def broken(*args, **kwargs):
+        raise KeyError("template")
+
+    monkeypatch.setattr(app_main, "_generate_content", broken)
+
+    with pytest.raises(JobFailed) as raised:
+        asyncio.run(app_main._run_job({"prompt": PROMPT}, {}))
+
+    assert not isinstance(raised.value, JobRetry)
+    assert raised.value.status_code == 500
+
+
+def test_run_job_fails_on_validation_error(app_main):
+    with pytest.raises(JobFailed) as raised:
+        asyncio.run(app_main._run_job({"prompt": "   "}, {}))
+
+    assert not isinstance(raised.value, JobRetry)
+    assert raised.value.status_code == 400
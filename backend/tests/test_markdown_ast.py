@@ -0,0 +1,112 @@
+import io
+import zipfile
+
+import pytest
+
+from src.document_export import to_html, to_markdown, to_text
+from src.document_generator import DocumentGenerator
+from src.markdown_ast import (
+    BOLD,
+    ITALIC,
+    Heading,
+    ListItem,
+    Paragraph,
+    SignatureBlock,
+    Span,
+    Table,
+    parse_inlines,
+    parse_markdown,
+    plain_text,
+)
+from src.ooxml_writer import get_ooxml_writer
+
+RULE_ONLY_TABLE = "# T\n\n|---|---|\n\ntext"
+
+
+def test_rule_only_table_is_dropped():
+    blocks = parse_markdown(RULE_ONLY_TABLE)
+
+    assert [type(block) for block in blocks] == [Heading, Paragraph]
+    assert plain_text(blocks[1].inlines) == "text"
+
+
+def test_table_with_rows_is_kept():
+    blocks = parse_markdown("| a | b |\n|---|---|\n| 1 | 2 |")
+
+    assert len(blocks) == 1
+    table = blocks[0]
+    assert isinstance(table, Table)
+    assert [plain_text(cell) for cell in table.header] == ["a", "b"]
+    assert [[plain_text(cell) for cell in row] for row in table.rows] == [["1", "2"]]
+
+
+@pytest.mark.parametrize("renderer", ["python-docx", "ooxml"])
+def test_renderers_accept_rule_only_table(tmp_path, renderer):
+    generator = DocumentGenerator(str(tmp_path), renderer=renderer)
+
+    filename, data = generator.render_document(RULE_ONLY_TABLE, "general_legal")
+
+    assert filename.endswith(".docx")
+    with zipfile.ZipFile(io.BytesIO(data)) as package:
+        assert "text" in package.read("word/document.xml").decode("utf-8")
+
+
+def test_ooxml_writer_skips_empty_table():
+    buffer = io.BytesIO()
+    get_ooxml_writer().write([Table(None, ())], buffer, None)
+
+    with zipfile.ZipFile(io.BytesIO(buffer.getvalue())) as package:
+        assert "<w:tbl>" not in package.read("word/document.xml").decode("utf-8")
+
+
+def test_exports_accept_empty_table():
+    blocks = [Table(None, ())]
+
+    assert "<article" in to_html(blocks)
+    assert to_markdown(blocks) == "\n"
+    assert to_text(blocks) == "\n"
+
+
+def test_block_kinds():
+    blocks = parse_markdown(
+        "# Title\n"
+        "#### Deep heading\n"
+        "1.1 The Borrower shall repay.\n"
+        "- first\n"
+        "  - nested\n"
+        "1. numbered\n"
+        "[SIGNATURE_BLOCK]"
+    )
+
+    assert blocks[0] == Heading(1, (Span("Title"),))
+    assert blocks[1] == Heading(3, (Span("Deep heading"),))
+    assert blocks[2] == Paragraph((Span("1.1 The Borrower shall repay."),))
+    assert blocks[3] == ListItem(False, 1, (Span("first"),))
+    assert blocks[4] == ListItem(False, 2, (Span("nested"),))
+    assert blocks[5] == ListItem(True, 1, (Span("numbered"),))
+    assert blocks[6] == SignatureBlock()
+
+
+@pytest.mark.parametrize(
+    "text, spans",
+    [
+        ("plain", (Span("plain"),)),
+        ("a **bold** b", (Span("a "), Span("bold", BOLD), Span(" b"))),
+        ("*italic* end", (Span("italic", ITALIC), Span(" end"))),
+        ("***both***", (Span("both", BOLD | ITALIC),)),
+        ("**bold *inner* bold**", (
+            Span("bold ", BOLD), Span("inner", BOLD | ITALIC), Span(" bold", BOLD)
+        )),
+        ("2 * 3 * 4", (Span("2 * 3 * 4"),)),
+        ("a*b*c", (Span("a*b*c"),)),
+    ],
+)
+def test_inline_emphasis(text, spans):
+    assert parse_inlines(text) == spans
+    assert parse_markdown(text) == [Paragraph(spans)]
+
+
+def test_table_cells_keep_escaped_pipes():
+    (table,) = parse_markdown("| a \\| b | **c** |\n|---|---|\n| 1 | 2 |")
+
+    assert table.header == ((Span("a | b"),), (Span("c", BOLD),))
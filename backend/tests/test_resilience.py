@@ -0,0 +1,164 @@
+"""Circuit breaker probe handling in ResilientLLM"""
+
+import asyncio
+
+import pytest
+
+from src.admission import AdmissionController
+from src.llm_config import LLMResponse, LLMTransientError
+from src.resilience import CircuitOpenError, ResiliencePolicy, ResilientLLM
+
+POLICY = ResiliencePolicy(
+    max_attempts=1, base_delay=0, breaker_failure_threshold=1, breaker_reset_seconds=0
+)
+
+
+def _open_circuit(resilient: ResilientLLM, fake_llm) -> None:
+    fake_llm.error_rate = 1.0
+    with pytest.raises(Exception):
+        asyncio.run(resilient.ainvoke(fake_llm, "prompt", "nda"))
+    fake_llm.error_rate = 0.0
+    assert resilient._state("nda").breaker.state == "open"
+
+
+def test_abandoned_stream_probe_releases_breaker(fake_llm):
+    resilient = ResilientLLM(POLICY)
+    _open_circuit(resilient, fake_llm)
+
+    async def abandon_probe():
+        stream = resilient.astream(fake_llm, "prompt", "nda")
+        await stream.__anext__()
+        await stream.aclose()
+
+    asyncio.run(abandon_probe())
+    response = asyncio.run(resilient.ainvoke(fake_llm, "prompt", "nda"))
+    assert response.content
+    assert resilient._state("nda").breaker.state == "closed"
+
+
+def test_cancelled_probe_releases_breaker(fake_llm):
+    resilient = ResilientLLM(POLICY)
+    _open_circuit(resilient, fake_llm)
+    fake_llm.latency_ms = 10_000
+
+    async def cancel_probe():
+        task = asyncio.ensure_future(resilient.ainvoke(fake_llm, "prompt", "nda"))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_probe())
+    fake_llm.latency_ms = 0
+    assert asyncio.run(resilient.ainvoke(fake_llm, "prompt", "nda")).content
+
+
+def test_non_retryable_error_does_not_close_circuit(fake_llm):
+    resilient = ResilientLLM(POLICY)
+    _open_circuit(resilient, fake_llm)
+
+    class Broken:
+        async def ainvoke(self, prompt):
+            raise KeyError("bad request")
+
+    with pytest.raises(KeyError):
+        asyncio.run(resilient.ainvoke(Broken(), "prompt", "nda"))
+    breaker = resilient._state("nda").breaker
+    assert breaker.state == "half_open"
+    assert breaker.allow()
+
+
+def test_open_circuit_short_circuits(fake_llm):
+    resilient = ResilientLLM(POLICY.with_overrides({"breaker_reset_seconds": 60}))
+    _open_circuit(resilient, fake_llm)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(resilient.ainvoke(fake_llm, "prompt", "nda"))
+
+
+class _Scripted:
+    """Backend that plays one scripted behaviour per call"""
+
+    def __init__(self, *steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self.cancelled = []
+
+    async def ainvoke(self, prompt):
+        step = self.steps[min(self.calls, len(self.steps) - 1)]
+        call = self.calls
+        self.calls += 1
+        if isinstance(step, BaseException):
+            raise step
+        try:
+            await asyncio.sleep(step)
+        except asyncio.CancelledError:
+            self.cancelled.append(call)
+            raise
+        return LLMResponse(f"call {call}")
+
+
+HEDGE_POLICY = ResiliencePolicy(
+    max_attempts=1, hedge=True, hedge_initial_delay=0.02, hedge_min_samples=1000
+)
+
+
+def test_retryable_errors_are_retried_with_backoff():
+    resilient = ResilientLLM(ResiliencePolicy(max_attempts=3, base_delay=0))
+    llm = _Scripted(LLMTransientError("busy"), LLMTransientError("busy"), 0)
+
+    response = asyncio.run(resilient.ainvoke(llm, "prompt", "nda"))
+
+    assert response.content == "call 2"
+    stats = resilient.stats()["nda"]
+    assert (stats["retries"], stats["successes"], stats["failures"]) == (2, 1, 0)
+
+
+def test_non_retryable_errors_are_not_retried():
+    resilient = ResilientLLM(ResiliencePolicy(max_attempts=3, base_delay=0))
+    llm = _Scripted(KeyError("bad request"), 0)
+
+    with pytest.raises(KeyError):
+        asyncio.run(resilient.ainvoke(llm, "prompt", "nda"))
+
+    assert llm.calls == 1
+    assert resilient.stats()["nda"]["retries"] == 0
+
+
+def test_hedge_fires_after_delay_and_cancels_the_loser():
+    resilient = ResilientLLM(HEDGE_POLICY)
+    llm = _Scripted(10, 0)
+
+    response = asyncio.run(resilient.ainvoke(llm, "prompt", "nda"))
+
+    assert response.content == "call 1"
+    assert llm.cancelled == [0]
+    stats = resilient.stats()["nda"]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_hedge_takes_its_own_admission_slot():
+    admission = AdmissionController(max_concurrency=2, max_queue=1)
+    resilient = ResilientLLM(HEDGE_POLICY, admission=admission)
+    llm = _Scripted(10, 0)
+
+    async def main():
+        async with admission.slot():
+            return await resilient.ainvoke(llm, "prompt", "nda")
+
+    assert asyncio.run(main()).content == "call 1"
+    stats = admission.stats()
+    assert (stats["admitted"], stats["active"]) == (2, 0)
+
+
+def test_hedge_is_skipped_without_a_free_slot():
+    admission = AdmissionController(max_concurrency=1, max_queue=1)
+    resilient = ResilientLLM(HEDGE_POLICY, admission=admission)
+    llm = _Scripted(0.05)
+
+    async def main():
+        async with admission.slot():
+            return await resilient.ainvoke(llm, "prompt", "nda")
+
+    assert asyncio.run(main()).content == "call 0"
+    assert llm.calls == 1
+    assert resilient.stats()["nda"]["hedges_skipped"] == 1
@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+
+from src.response_cache import ResponseCache
+
+
+def test_memory_hit_and_miss():
+    cache = ResponseCache(max_entries=2)
+    key = cache.make_key("prompt", "model", 0.3, 100)
+
+    assert cache.get(key) is None
+    cache.set(key, "content")
+
+    assert cache.get(key) == "content"
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["misses"], stats["writes"]) == (1, 1, 1)
+
+
+def test_key_depends_on_generation_settings():
+    assert ResponseCache.make_key("p", "m", 0.3, 100) != ResponseCache.make_key(
+        "p", "m", 0.7, 100
+    )
+
+
+def test_lru_evicts_oldest_entry():
+    cache = ResponseCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "cache.sqlite"), ttl_seconds=1)
+    cache.set("a", "1")
+    created = time.time() - 10
+    cache._memory["a"] = ("1", created)
+    cache._db.execute("UPDATE llm_cache SET created_at = ?", (created,))
+
+    assert cache.get("a") is None
+
+
+def test_persistent_tier_survives_restart(tmp_path):
+    db_path = str(tmp_path / "cache.sqlite")
+    ResponseCache(db_path=db_path).set("a", "1")
+
+    cache = ResponseCache(db_path=db_path)
+
+    assert cache.get("a") == "1"
+    assert cache.stats()["disk_hits"] == 1
+
+
+def test_async_access_runs_sqlite_off_the_event_loop(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "cache.sqlite"))
+    threads = []
+    get_disk, set_disk = cache._get_disk, cache._set_disk
+
+    def record(fn):
+        def wrapper(*args):
+            threads.append(threading.get_ident())
+            return fn(*args)
+
+        return wrapper
+
+    cache._get_disk, cache._set_disk = record(get_disk), record(set_disk)
+
+    async def main():
+        loop_thread = threading.get_ident()
+        await cache.aset("a", "1")
+        cache._memory.clear()
+        content = await cache.aget("a")
+        return loop_thread, content
+
+    loop_thread, content = asyncio.run(main())
+
+    assert content == "1"
+    assert len(threads) == 2
+    assert loop_thread not in threads
+
+
+def test_async_memory_hit_stays_inline(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "cache.sqlite"))
+    cache.set("a", "1")
+    cache._get_disk = lambda key: (_ for _ in ()).throw(AssertionError("disk read"))
+
+    assert asyncio.run(cache.aget("a")) == "1"
+
+
+def test_metrics_report_sqlite_backed_stats(app_main):
+    metrics = asyncio.run(app_main.metrics())
+
+    assert "queue_depth" in metrics["jobs"]
+    assert metrics["docx"]["storage"]["documents"] == 0
+
+
+class _SlowConnection:
+    """SQLite connection whose writes wait until released"""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def execute(self, sql, *args):
+        if sql.startswith("INSERT"):
+            self.writing.set()
+            self.release.wait(5)
+        return self.connection.execute(sql, *args)
+
+    def commit(self):
+        self.connection.commit()
+
+
+def test_memory_hits_do_not_wait_for_disk_writes(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "cache.sqlite"))
+    cache.set("hot", "1")
+    slow = cache._db = _SlowConnection(cache._db)
+
+    writer = threading.Thread(target=cache.set, args=("cold", "2"))
+    writer.start()
+    try:
+        assert slow.writing.wait(5)
+        started = time.perf_counter()
+        assert cache.get("hot") == "1"
+        assert cache.stats()["memory_entries"] == 2
+        assert time.perf_counter() - started < 1
+    finally:
+        slow.release.set()
+        writer.join()
+    assert ResponseCache(db_path=str(tmp_path / "cache.sqlite")).get("cold") == "2"
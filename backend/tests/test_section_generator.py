@@ -0,0 +1,61 @@
+import asyncio
+import re
+
+import pytest
+
+from src.llm_config import LLMTransientError
+from src.rag_pipeline import LegalTemplateDatabase
+from src.section_generator import SectionParallelGenerator
+
+BASE_PROMPT = "You are drafting a professional Loan Agreement.\n"
+_PART_RE = re.compile(r"Draft ONLY part (\d+) of (\d+)")
+
+
+def _part(prompt: str):
+    part, total = _PART_RE.search(prompt).groups()
+    return int(part), int(total)
+
+
+def test_parts_are_stitched_in_template_order(fake_llm):
+    generator = SectionParallelGenerator(LegalTemplateDatabase())
+
+    async def invoke(prompt):
+        part, total = _part(prompt)
+        # Later parts finish first
+        await asyncio.sleep((total - part) * 0.01)
+        return (await fake_llm.ainvoke(prompt)).content, part != 1
+
+    content, cached = asyncio.run(generator.generate("loan_agreement", BASE_PROMPT, invoke))
+
+    headings = re.findall(r"^#.*$", content, re.MULTILINE)
+    assert headings[0] == "# LOAN AGREEMENT"
+    assert [heading.split(".")[0] for heading in headings[1:]] == [
+        f"## {number}" for number in range(1, 9)
+    ]
+    assert "## 8. Signatures" in headings
+    assert cached is False
+
+
+def test_failed_part_cancels_the_others(fake_llm):
+    generator = SectionParallelGenerator(LegalTemplateDatabase())
+    cancelled = []
+
+    async def invoke(prompt):
+        part, _ = _part(prompt)
+        if part == 2:
+            raise LLMTransientError("upstream unavailable")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(part)
+            raise
+        return (await fake_llm.ainvoke(prompt)).content, False
+
+    async def main():
+        with pytest.raises(LLMTransientError):
+            await generator.generate("loan_agreement", BASE_PROMPT, invoke)
+        # Let the cancellations run, well before the other parts would finish
+        await asyncio.sleep(0)
+        return sorted(cancelled)
+
+    assert asyncio.run(main()) == [1, 3]
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from src.fake_llm import FakeLLMBackend
+from src.single_flight import SingleFlight
+
+PROMPT = "Draft a Loan Agreement between Rohit Gupta and Akash Mehta for 5 lakh"
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        key = flight.make_key("a", {"x": 1, "y": 2})
+        return await asyncio.gather(*(flight.do(key, work) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["done"] * 5
+    assert len(calls) == 1
+    assert flight.stats() == {"inflight": 0, "executed": 1, "coalesced": 4}
+
+
+def test_make_key_ignores_dict_order():
+    assert SingleFlight.make_key({"a": 1, "b": 2}) == SingleFlight.make_key({"b": 2, "a": 1})
+    assert SingleFlight.make_key("a", True) != SingleFlight.make_key("a", False)
+
+
+def test_exception_reaches_every_caller():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("boom")
+
+    async def main():
+        return await asyncio.gather(
+            flight.do("k", work), flight.do("k", work), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_cancelled_caller_does_not_cancel_the_flight():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", work))
+        second = asyncio.ensure_future(flight.do("k", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def _slow_llm() -> FakeLLMBackend:
+    return FakeLLMBackend(
+        latency_ms=50, latency_distribution="fixed", tokens_per_second=0, seed=1
+    )
+
+
+def test_joined_drafts_copy_the_flight_timings(app_main):
+    llm = _slow_llm()
+    request = app_main.DocumentRequest(prompt=PROMPT)
+    timings = [{}, {}]
+
+    async def main():
+        return await asyncio.gather(
+            *(app_main._draft(request, llm, stage_timings) for stage_timings in timings)
+        )
+
+    first, second = asyncio.run(main())
+
+    assert first.document_id == second.document_id
+    assert app_main.single_flight.stats()["coalesced"] == 1
+    for stage_timings in timings:
+        assert {"retrieval_seconds", "prompt_seconds", "llm_seconds", "docx_seconds"} <= set(
+            stage_timings
+        )
+    assert timings[0]["llm_seconds"] == timings[1]["llm_seconds"]
+
+
+@pytest.mark.parametrize("bypass_cache", [True, False])
+def test_bypass_cache_does_not_join_a_cached_flight(app_main, bypass_cache):
+    llm = _slow_llm()
+    cached = app_main.DocumentRequest(prompt=PROMPT)
+    other = app_main.DocumentRequest(prompt=PROMPT, bypass_cache=bypass_cache)
+
+    async def main():
+        return await asyncio.gather(app_main._draft(cached, llm), app_main._draft(other, llm))
+
+    asyncio.run(main())
+
+    stats = app_main.single_flight.stats()
+    assert stats["executed"] == (2 if bypass_cache else 1)
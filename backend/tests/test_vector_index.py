@@ -0,0 +1,48 @@
+import json
+
+from src.clause_index import Clause
+from src.vector_index import (
+    ClauseVectorSearch,
+    HashingEmbedder,
+    build_vector_index,
+)
+
+CLAUSES = [
+    Clause(f"c{index}", f"Clause {index}", f"The party shall pay {word} promptly.", "terms", ())
+    for index, word in enumerate(["rent", "interest", "fees", "damages", "costs", "wages"])
+]
+
+
+def _meta(index_dir) -> dict:
+    return json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+
+
+def _build(index_dir, clauses):
+    texts = [f"{clause.title} {clause.text}" for clause in clauses]
+    build_vector_index(
+        clauses, str(index_dir), HashingEmbedder.fit(texts, 64), quantization="int8", nlist=2
+    )
+
+
+def test_unchanged_corpus_reuses_a_custom_built_index(tmp_path):
+    index_dir = tmp_path / "clauses"
+    _build(index_dir, CLAUSES)
+    vectors = (index_dir / "vectors.npy").stat().st_mtime_ns
+
+    search = ClauseVectorSearch.load(CLAUSES, str(index_dir))
+
+    assert search.index.dimensions == 64
+    assert (index_dir / "vectors.npy").stat().st_mtime_ns == vectors
+    assert search.search(["rent"], k=1)[0][0][0].clause_id == "c0"
+
+
+def test_changed_corpus_rebuilds_with_the_saved_parameters(tmp_path):
+    index_dir = tmp_path / "clauses"
+    _build(index_dir, CLAUSES)
+    grown = CLAUSES + [Clause("c9", "Clause 9", "Notice in writing.", "notices", ())]
+
+    search = ClauseVectorSearch.load(grown, str(index_dir))
+
+    meta = _meta(index_dir)
+    assert (meta["dimensions"], meta["quantization"], meta["nlist"]) == (64, "int8", 2)
+    assert len(search.index) == len(grown)
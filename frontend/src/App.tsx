@@ -5,14 +5,16 @@ import { motion, AnimatePresence } from 'framer-motion';
 import './App.css';
 
 interface GenerateResponse {
-  success: boolean;
-  message: string;
+  document_id: string;
   document_type: string;
-  file_path: string;
-  download_url: string;
-  metadata: any;
+  filename: string;
+  blob: Blob;
 }
 
+// The DOCX comes back as the response body; its details are in headers
+const filenameFromDisposition = (disposition?: string) =>
+  disposition?.match(/filename="?([^";]+)"?/)?.[1] || 'document.docx';
+
 function App() {
   const [prompt, setPrompt] = useState('');
   const [loading, setLoading] = useState(false);
@@ -30,41 +32,46 @@ function App() {
       const payload = {
         prompt: prompt,
         include_metadata: true,
-        details: {}
+        details: {},
+        response_format: 'docx'
       };
 
-      const response = await axios.post('http://localhost:8000/draft-document', payload);
-      // const response = await axios.post('https://llm-project-backend.vercel.app/draft-document', payload);
-      setResult(response.data);
+      const response = await axios.post('http://localhost:8000/draft-document', payload, {
+      // const response = await axios.post('https://llm-project-backend.vercel.app/draft-document', payload, {
+        responseType: 'blob'
+      });
+      setResult({
+        document_id: response.headers['x-document-id'],
+        document_type: response.headers['x-document-type'] || 'document',
+        filename: filenameFromDisposition(response.headers['content-disposition']),
+        blob: response.data
+      });
     } catch (err: any) {
       console.error(err);
-      setError(err.response?.data?.detail || 'Failed to generate document. Please try again.');
+      // Error bodies arrive as a blob too
+      let detail: string | undefined;
+      try {
+        detail = JSON.parse(await err.response?.data?.text())?.detail;
+      } catch {
+        detail = undefined;
+      }
+      setError(detail || 'Failed to generate document. Please try again.');
     } finally {
       setLoading(false);
     }
   };
 
-  const handleDownload = async () => {
+  const handleDownload = () => {
     if (!result) return;
-    try {
-      const response = await axios.get(`http://localhost:8000${result.download_url}`, {
-      // const response = await axios.get(`https://llm-project-backend.vercel.app${result.download_url}`, {
-        responseType: 'blob'
-      });
-
-      const url = window.URL.createObjectURL(new Blob([response.data]));
-      const link = document.createElement('a');
-      link.href = url;
-      link.setAttribute('download', result.file_path.split(/[\\/]/).pop() || 'document.docx');
-      document.body.appendChild(link);
-      link.click();
-      link.remove();
-    } catch (err) {
-      console.error("Download failed", err);
-      // Fallback: open in new tab if blob fails
-      window.open(`http://localhost:8000${result.download_url}`, '_blank');
-      // window.open(`https://llm-project-backend.vercel.app${result.download_url}`, '_blank');
-    }
+    // The document is already in memory; no second request
+    const url = window.URL.createObjectURL(result.blob);
+    const link = document.createElement('a');
+    link.href = url;
+    link.setAttribute('download', result.filename);
+    document.body.appendChild(link);
+    link.click();
+    link.remove();
+    window.URL.revokeObjectURL(url);
   };
 
   return (